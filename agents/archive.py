@@ -0,0 +1,162 @@
+# agents/archive.py
+"""
+Searchable archive of every processed meeting.
+
+Transcript segments are grouped into short passages (a few consecutive
+Whisper segments, about PASSAGE_WORDS words, with their time range) and
+stored in a SQLite FTS5 table with Porter stemming. search() ranks passages
+by BM25 across all meetings or a chosen few and returns only the top k, so a
+question about months of meetings still sends a prompt of a few hundred words
+to the LLM. Re-adding a meeting replaces its passages.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from agents.highlighter import split_sentences
+
+PASSAGE_WORDS = 80
+TOP_K = 6
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    created_at REAL NOT NULL,
+    duration REAL,
+    passage_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+    text,
+    meeting_id UNINDEXED,
+    start_s UNINDEXED,
+    end_s UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+"""
+_COLUMNS = "passages.text, passages.meeting_id, start_s AS start, end_s AS end, m.title"
+
+# words that match nearly every passage and only slow the ranking down
+STOPWORDS = frozenset(
+    "a an and are as at be but by did do does for from had has have how i if in is it its me my of on or "
+    "our so than that the their them then there these they this to was we were what when where which who "
+    "why will with would you your about any can could should".split()
+)
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_passages(segments: Sequence[Dict], text: str = "", max_words: int = PASSAGE_WORDS) -> List[Dict]:
+    """
+    Consecutive segments merged into passages of about `max_words` words
+    ({"text", "start", "end"}). Without segments the text is split on sentences
+    (times unknown, None).
+    """
+    units = [(s.get("text", "").strip(), s.get("start"), s.get("end")) for s in segments]
+    if not units:
+        units = [(text[s:e].strip(), None, None) for s, e in split_sentences(text)]
+    passages, words, start, end = [], [], None, None
+    for unit, s, e in units:
+        if not unit:
+            continue
+        if words and len(words) + len(unit.split()) > max_words:
+            passages.append({"text": " ".join(words), "start": start, "end": end})
+            words = []
+        if not words:
+            start = s
+        words.extend(unit.split())
+        end = e
+    if words:
+        passages.append({"text": " ".join(words), "start": start, "end": end})
+    return passages
+
+
+def match_expression(question: str) -> Optional[str]:
+    """FTS5 query for a free-text question: its content words, OR-ed (None if it has none)."""
+    terms = [t for t in _TOKEN.findall(question.lower()) if t not in STOPWORDS]
+    if not terms:
+        return None
+    # quoted, so words such as NOT/OR/NEAR are searched for rather than parsed
+    return " OR ".join(f'"{t}"' for t in dict.fromkeys(terms))
+
+
+def _clock(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "?"
+    m, s = divmod(int(seconds), 60)
+    return f"{m // 60}:{m % 60:02d}:{s:02d}" if m >= 60 else f"{m}:{s:02d}"
+
+
+def format_context(hits: Iterable[Dict]) -> str:
+    """Numbered excerpts with meeting and time, for an LLM prompt."""
+    return "\n".join(
+        f"[{i}] {h['title'] or h['meeting_id']} @ {_clock(h['start'])}-{_clock(h['end'])}: {h['text']}"
+        for i, h in enumerate(hits, 1)
+    )
+
+
+class MeetingArchive:
+    def __init__(self, db_path: str = "outputs/archive.sqlite3"):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._db_lock, self._db:
+            self._db.executescript(SCHEMA)
+
+    def add_meeting(self, meeting_id: str, segments: Sequence[Dict], text: str = "",
+                    title: Optional[str] = None) -> int:
+        """Index (or re-index) a meeting's transcript; returns the number of passages stored."""
+        passages = build_passages(segments, text)
+        duration = max((p["end"] for p in passages if p["end"] is not None), default=None)
+        with self._db_lock, self._db:
+            self._db.execute("DELETE FROM passages WHERE meeting_id = ?", (meeting_id,))
+            self._db.executemany(
+                "INSERT INTO passages (text, meeting_id, start_s, end_s) VALUES (?, ?, ?, ?)",
+                [(p["text"], meeting_id, p["start"], p["end"]) for p in passages],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO meetings (id, title, created_at, duration, passage_count) VALUES (?, ?, ?, ?, ?)",
+                (meeting_id, title, time.time(), duration, len(passages)),
+            )
+        return len(passages)
+
+    def search(self, question: str, k: int = TOP_K, meeting_ids: Optional[Sequence[str]] = None) -> List[Dict]:
+        """The `k` passages that best match `question` (BM25), optionally within some meetings."""
+        expression = match_expression(question)
+        if expression is None:
+            return []
+        sql = (f"SELECT {_COLUMNS}, bm25(passages) AS score FROM passages "
+               "JOIN meetings m ON m.id = passages.meeting_id WHERE passages MATCH ?")
+        params: list = [expression]
+        if meeting_ids:
+            sql += f" AND passages.meeting_id IN ({','.join('?' * len(meeting_ids))})"
+            params.extend(meeting_ids)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(k)
+        with self._db_lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [dict(r) for r in rows]
+
+    def opening(self, meeting_id: str, k: int = TOP_K) -> List[Dict]:
+        """The first `k` passages of a meeting (context when a question matches nothing)."""
+        with self._db_lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM passages JOIN meetings m ON m.id = passages.meeting_id "
+                "WHERE passages.meeting_id = ? ORDER BY passages.rowid LIMIT ?",
+                (meeting_id, k),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def meetings(self) -> List[Dict]:
+        with self._db_lock:
+            rows = self._db.execute("SELECT * FROM meetings ORDER BY created_at DESC").fetchall()
+        return [dict(r) for r in rows]
+
+    def count(self) -> int:
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM meetings").fetchone()[0]
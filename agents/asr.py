@@ -0,0 +1,84 @@
+# agents/asr.py
+"""
+ASR engines: how TranscriberAgent gets its model.
+
+An engine turns a Whisper model name ("tiny" ... "large") into a model object
+with the Whisper interface (embed_audio/logits/decode), which TranscriberAgent
+then drives. Engines are pluggable (ASR_BACKEND):
+
+- "whisper": the reference fp32 model from whisper.load_model (GPU if available).
+- "whisper-int8": CPU model whose Linear layers (attention projections and
+  MLPs, most of the FLOPs) are dynamically quantised to int8. Weights are
+  quantised once at load time; activations are quantised on the fly. Conv
+  front-end, layer norms and the output projection stay fp32. Typically
+  2-4x faster on CPU at a small accuracy cost; measure it on your data with
+  benchmarks/bench_asr.py.
+
+ASR_THREADS sets the torch intra-op thread count for in-process transcription.
+Register more engines with register_engine(). torch/whisper are imported only
+when a model is loaded, here and in agents/transcriber.py alike.
+"""
+import os
+from typing import Dict, Optional
+
+
+class WhisperEngine:
+    name = "whisper"
+
+    def load(self, model_name: str, device: Optional[str] = None):
+        import whisper
+        return whisper.load_model(model_name, device=device)
+
+
+class QuantizedWhisperEngine:
+    name = "whisper-int8"
+
+    def load(self, model_name: str, device: Optional[str] = None):
+        import torch
+        import whisper
+
+        model = whisper.load_model(model_name, device="cpu")
+        _use_plain_linear(model)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        model.eval()
+        return model
+
+
+def _use_plain_linear(module) -> None:
+    """
+    Swap whisper.model.Linear (an nn.Linear subclass that casts weights to the
+    input dtype) for plain nn.Linear sharing the same parameters: quantize_dynamic
+    matches exact module types, so the subclass would otherwise stay fp32.
+    On CPU both compute the same fp32 result.
+    """
+    import torch
+
+    for name, child in module.named_children():
+        if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+            plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+            plain.weight = child.weight
+            plain.bias = child.bias
+            setattr(module, name, plain)
+        else:
+            _use_plain_linear(child)
+
+
+ENGINES: Dict[str, object] = {"whisper": WhisperEngine(), "whisper-int8": QuantizedWhisperEngine()}
+
+
+def register_engine(engine) -> None:
+    """Add an engine object with `name` and load(model_name, device=None) -> Whisper-compatible model."""
+    ENGINES[engine.name] = engine
+
+
+def get_engine(name: Optional[str] = None):
+    name = name or os.getenv("ASR_BACKEND", "whisper")
+    if name not in ENGINES:
+        raise ValueError(f"Unknown ASR backend: {name}")
+    return ENGINES[name]
+
+
+def asr_threads() -> Optional[int]:
+    """ASR_THREADS as an int, or None to leave torch's default."""
+    value = os.getenv("ASR_THREADS")
+    return int(value) if value else None
@@ -0,0 +1,107 @@
+# agents/audio.py
+import hashlib
+import re
+import subprocess
+from typing import Iterator, Optional
+
+import numpy as np
+
+# Whisper works on 16 kHz mono float32 audio
+SAMPLE_RATE = 16000
+
+
+def _ffmpeg_cmd(audio_path: str, sr: int = SAMPLE_RATE, start: float = None, seconds: float = None) -> list:
+    """
+    ffmpeg command that decodes any input to mono 16-bit PCM on stdout,
+    optionally only `seconds` of it from `start` (input seeking: nothing before is decoded).
+    """
+    seek = ["-ss", f"{start:.3f}"] if start else []
+    limit = ["-t", f"{seconds:.3f}"] if seconds else []
+    return [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        *seek, "-i", audio_path, *limit,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr),
+        "-",
+    ]
+
+
+def probe_duration(audio_path: str) -> Optional[float]:
+    """Container duration in seconds from ffmpeg's header probe, or None if unknown."""
+    proc = subprocess.run(["ffmpeg", "-nostdin", "-hide_banner", "-i", audio_path],
+                          capture_output=True, text=True, errors="ignore")
+    m = re.search(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", proc.stderr)
+    if not m:
+        return None
+    h, mnt, sec = m.groups()
+    return int(h) * 3600 + int(mnt) * 60 + float(sec)
+
+
+def decode_window(audio_path: str, start: float, seconds: float, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode only [start, start + seconds) of a file."""
+    try:
+        out = subprocess.run(_ffmpeg_cmd(audio_path, sr, start=start, seconds=seconds),
+                             capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')}") from e
+    return np.frombuffer(out[:len(out) - len(out) % 2], np.int16).astype(np.float32) / 32768.0
+
+
+def decode_audio(audio_path: str, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode an audio file once into a mono float32 buffer in [-1, 1].
+    Every later stage (language detection, chunking, transcription) works on
+    views of this buffer, so ffmpeg only runs once per upload.
+    """
+    try:
+        out = subprocess.run(_ffmpeg_cmd(audio_path, sr), capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')}") from e
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def iter_chunks(audio: np.ndarray, chunk_length_ms: int = 60_000, sr: int = SAMPLE_RATE) -> Iterator[np.ndarray]:
+    """Yield fixed-length slices of `audio`. Slices are numpy views, nothing is copied."""
+    step = int(sr * chunk_length_ms / 1000)
+    for i in range(0, len(audio), step):
+        yield audio[i:i + step]
+
+
+def stream_audio(audio_path: str, window_seconds: float = 60.0, sr: int = SAMPLE_RATE) -> Iterator[np.ndarray]:
+    """
+    Stream fixed-size float32 windows straight from an ffmpeg pipe.
+    Only one window is held at a time, so peak memory does not depend on the
+    length of the recording (unlike decode_audio, which materialises it all).
+    The last window may be shorter than `window_seconds`.
+    """
+    window_bytes = int(sr * window_seconds) * 2  # s16le -> 2 bytes per sample
+    proc = subprocess.Popen(_ffmpeg_cmd(audio_path, sr), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            # buffered read blocks until the window is full or ffmpeg hits EOF
+            buf = proc.stdout.read(window_bytes)
+            if not buf:
+                break
+            usable = len(buf) - len(buf) % 2
+            yield np.frombuffer(buf[:usable], np.int16).astype(np.float32) / 32768.0
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to decode {audio_path} (exit code {proc.returncode})")
+    finally:
+        # generator closed early (or errored): do not leave ffmpeg running
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+
+
+def file_digest(audio_path: str, block_size: int = 1 << 20) -> str:
+    """
+    sha256 of the file's bytes, used as the transcript cache key. Hashing the
+    file costs a read instead of a full ffmpeg decode, so a cache miss no longer
+    decodes the recording twice; the same sound re-encoded or re-muxed (new
+    container, new tags) is a miss.
+    """
+    h = hashlib.sha256()
+    with open(audio_path, "rb") as f:
+        while block := f.read(block_size):
+            h.update(block)
+    return h.hexdigest()
@@ -0,0 +1,88 @@
+# agents/cache.py
+"""
+Persistent, content-addressed cache for transcriber results.
+
+Entries are JSON files named by sha256(file digest + model + forced language),
+so re-uploading the same recording (even under a different file name) skips
+language detection and transcription entirely. The directory is kept under a
+byte budget by evicting least-recently-used entries (mtime is bumped on hits).
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+
+class TranscriptCache:
+    def __init__(self, cache_dir: str = "outputs/cache/transcripts", max_bytes: int = 500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(audio_digest: str, model_name: str, language: Optional[str] = None) -> str:
+        raw = f"{audio_digest}|{model_name}|{language or 'auto'}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached {"text", "language", "segments"} dict, or None."""
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    value = json.load(f)
+                os.utime(path)  # mark as recently used
+            except (OSError, json.JSONDecodeError):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Dict) -> None:
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False, default=float)
+            os.replace(tmp, path)  # atomic: readers never see a half-written entry
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            files = [f for f in os.listdir(self.cache_dir) if f.endswith(".json")]
+            size = sum(os.path.getsize(os.path.join(self.cache_dir, f)) for f in files)
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(files),
+            "bytes": size,
+        }
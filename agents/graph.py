@@ -0,0 +1,95 @@
+# agents/graph.py
+"""
+Tiny dependency-graph runner for pipeline stages.
+
+Stages are added with the names of the stages they depend on; every stage
+whose dependencies are finished is started on a thread pool, so independent
+network-bound stages (LLM calls, TTS, Slack, email) overlap and the total
+latency approaches the critical path instead of the sum of all stages.
+A failing stage is isolated: its error is recorded, its `default` value is
+passed on to dependents, and the rest of the graph keeps running.
+Every stage is recorded as a telemetry span under the caller's job trace.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+from telemetry import propagate, record_span
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[..., Any]
+    deps: Sequence[str]
+    default: Any = None
+
+
+@dataclass
+class StageResult:
+    name: str
+    value: Any
+    error: Optional[BaseException]
+    seconds: float
+
+
+class StageGraph:
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.stages: Dict[str, Stage] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Sequence[str] = (), default: Any = None) -> None:
+        """
+        Register a stage. `fn` is called with the dependency results as keyword
+        arguments (fn(**{dep: result})). Dependencies must already be added,
+        which keeps the graph acyclic.
+        """
+        missing = [d for d in deps if d not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name!r} depends on unknown stage(s): {', '.join(missing)}")
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage name: {name!r}")
+        self.stages[name] = Stage(name, fn, tuple(deps), default)
+
+    @staticmethod
+    def _timed(name: str, fn: Callable[..., Any], kwargs: Dict[str, Any]):
+        t0 = time.perf_counter()
+        try:
+            value, error = fn(**kwargs), None
+        except Exception as e:
+            value, error = None, e
+        seconds = time.perf_counter() - t0
+        record_span(name, seconds, start=t0, **({"error": type(error).__name__} if error else {}))
+        return value, error, seconds
+
+    def run_iter(self) -> Iterator[StageResult]:
+        """Run the graph, yielding each StageResult as soon as that stage finishes."""
+        pending = dict(self.stages)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if all(d in self.results for d in stage.deps):
+                        kwargs = {d: self.results[d] for d in stage.deps}
+                        running[pool.submit(propagate(self._timed), name, stage.fn, kwargs)] = stage
+                        del pending[name]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    stage = running.pop(fut)
+                    value, error, seconds = fut.result()
+                    if error is not None:
+                        value = stage.default
+                        self.errors[stage.name] = error
+                    self.results[stage.name] = value
+                    self.timings[stage.name] = seconds
+                    yield StageResult(stage.name, value, error, seconds)
+
+    def run(self) -> Dict[str, Any]:
+        """Run the whole graph and return {stage name: result (or default on error)}."""
+        for _ in self.run_iter():
+            pass
+        return self.results
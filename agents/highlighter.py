@@ -1,5 +1,129 @@
+# agents/highlighter.py
+"""
+Extractive pre-condensation of transcripts before they reach an LLM.
+
+One compiled regex with a named group per category (action, decision, risk,
+key topic, time reference) scans the whole transcript in a single pass; each
+match is mapped to its sentence by binary search over the sentence offsets,
+so the cost is linear in the text and independent of the keyword count.
+Sentences are ranked by their strongest category (action items first), then
+by how many cues they hold. condense() keeps the best sentences, plus the
+sentence before each one for context, within a token budget, and returns
+them in meeting order with "…" where text was left out. Transcripts already
+within the budget are returned unchanged.
+"""
+import bisect
+import re
+from typing import List, Tuple
+
+from telemetry import estimate_tokens
+
+# category -> (weight, pattern); "when" (dates, deadlines, numbers) only adds to a sentence's cue count
+CATEGORIES = {
+    "action": (4, r"will|going to|needs? to|has to|action(?: items?)?|assign\w*|to-?do|follow[- ]up|"
+                  r"take care of|owner|deadline|due|deliverables?|next steps?"),
+    "decision": (3, r"decid\w*|decision\w*|agree\w*|approv\w*|conclu\w*|settled|go with|sign(?:ed)? off"),
+    "risk": (2, r"risk\w*|blocker\w*|blocked|delay\w*|issues?|concerns?|problems?|slip(?:s|ped|ping|page)?"),
+    "key": (1, r"plan(?:s|ned|ning)?|important|priorit\w*|budget\w*|goals?|milestones?|launch\w*|release\w*"),
+    "when": (0, r"monday|tuesday|wednesday|thursday|friday|saturday|sunday|today|tomorrow|tonight|"
+                r"next (?:week|month|quarter)|end of (?:the )?(?:day|week|month|quarter)|eod|q[1-4]|"
+                r"january|february|march|april|may|june|july|august|september|october|november|december|"
+                r"\d+(?:[.:]\d+)?%?"),
+}
+WEIGHTS = {name: weight for name, (weight, _) in CATEGORIES.items()}
+_MATCHER = re.compile(
+    r"\b(?:" + "|".join(f"(?P<{name}>{pattern})" for name, (_, pattern) in CATEGORIES.items()) + r")\b",
+    re.IGNORECASE,
+)
+
+# sentence end: terminal punctuation (plus closing quotes/brackets) and whitespace, or a line break
+_BOUNDARY = re.compile(r"[.!?…]+[\"')\]]*\s+|\n+")
+_ABBREVIATIONS = frozenset("mr mrs ms dr prof sr jr st vs etc e.g i.e approx dept est inc ltd no fig".split())
+MAX_SENTENCE_WORDS = 40
+GAP = "…"
+
+
+def split_sentences(text: str, max_words: int = MAX_SENTENCE_WORDS) -> List[Tuple[int, int]]:
+    """
+    (start, end) character spans of the sentences in `text`. Abbreviations
+    ("Dr.", "e.g.") and decimals do not end a sentence; unpunctuated runs are
+    cut every `max_words` words.
+    """
+    spans, start = [], 0
+    for m in _BOUNDARY.finditer(text):
+        word = (text[start:m.start()].rsplit(None, 1) or [""])[-1].lower()
+        if "\n" not in m.group() and (word in _ABBREVIATIONS or text[m.end():m.end() + 1].islower()):
+            continue
+        spans.append((start, m.end()))
+        start = m.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+
+    out = []
+    for s, e in spans:
+        words = [w.start() + s for w in re.finditer(r"\S+", text[s:e])]
+        if not words:
+            continue
+        for i in range(0, len(words), max_words):
+            out.append((words[i], words[i + max_words] if i + max_words < len(words) else e))
+    return out
+
+
 class HighlightAgent:
-    def extract(self, text: str):
-        keywords = ["decide", "plan", "deadline", "assign", "action", "important", "deliverable", "risk"]
-        sentences = [s.strip() for s in text.split('.')]
-        return [s for s in sentences if any(k in s.lower() for k in keywords) and len(s) > 0]
+    def score(self, text: str, spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """(strongest category weight, number of cues) per sentence span, from one scan of `text`."""
+        starts = [s for s, _ in spans]
+        top = [0] * len(spans)
+        cues = [0] * len(spans)
+        for m in _MATCHER.finditer(text):
+            i = bisect.bisect_right(starts, m.start()) - 1
+            if i < 0:
+                continue
+            top[i] = max(top[i], WEIGHTS[m.lastgroup])
+            cues[i] += 1
+        return list(zip(top, cues))
+
+    def extract(self, text: str) -> List[str]:
+        """Sentences holding an action, decision, risk or key-topic cue, in order."""
+        spans = split_sentences(text)
+        return [text[s:e].strip() for (s, e), (top, _) in zip(spans, self.score(text, spans)) if top > 0]
+
+    def condense(self, text: str, token_budget: int) -> str:
+        """
+        The most informative sentences of `text` within `token_budget` (estimated)
+        tokens, in their original order. Action items are kept before decisions,
+        risks and key topics; each kept sentence brings the one before it if
+        there is room. Text within the budget is returned as is.
+        """
+        if estimate_tokens(text) <= token_budget:
+            return text
+        spans = split_sentences(text)
+        scores = self.score(text, spans)
+        ranked = sorted((i for i, (top, _) in enumerate(scores) if top > 0),
+                        key=lambda i: (-scores[i][0], -scores[i][1], i))
+        # every kept sentence may bring a gap marker; one more closes the text
+        chars = token_budget * 4 - len(GAP) - 1
+        chosen = set()
+
+        def take(i: int) -> None:
+            nonlocal chars
+            cost = spans[i][1] - spans[i][0] + len(GAP) + 2
+            if i >= 0 and i not in chosen and cost <= chars:
+                chosen.add(i)
+                chars -= cost
+
+        for i in ranked:
+            take(i)
+        for i in ranked:
+            if i in chosen:
+                take(i - 1)
+
+        parts, prev = [], -1
+        for i in sorted(chosen):
+            if i != prev + 1:
+                parts.append(GAP)
+            parts.append(text[spans[i][0]:spans[i][1]].strip())
+            prev = i
+        if prev != len(spans) - 1:
+            parts.append(GAP)
+        return " ".join(parts)
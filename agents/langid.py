@@ -0,0 +1,89 @@
+# agents/langid.py
+"""
+Language detection from a few speech windows sampled across the recording.
+
+Only the opening 30 s is not enough: meetings often start with silence,
+hold music or small talk. Instead, candidate windows are decoded at evenly
+spaced offsets (ffmpeg seeks, so the rest of the file is never decoded), the
+energy VAD keeps the speech inside each one, and the `count` windows with the
+most speech go through Whisper's language head in one batch. Their
+probability distributions are averaged, weighted by speech length, and the
+top language wins. The cost is fixed (a few encoder passes) whatever the
+length of the recording, and there is no fallback to full transcription.
+"""
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.audio import SAMPLE_RATE, decode_window, probe_duration, stream_audio
+from agents.vad import speech_regions
+
+# speech windows that vote, and how many evenly spaced candidates they are picked from
+LANGID_WINDOWS = int(os.getenv("LANGID_WINDOWS", "3"))
+LANGID_CANDIDATES = int(os.getenv("LANGID_CANDIDATES", "6"))
+WINDOW_SECONDS = 30.0
+MIN_SPEECH_SECONDS = 2.0
+
+
+def candidate_offsets(duration: float, candidates: int, window_s: float = WINDOW_SECONDS) -> List[float]:
+    """Start times of `candidates` windows centred on evenly spaced points of the recording."""
+    if duration <= window_s:
+        return [0.0]
+    last = duration - window_s
+    return sorted({round(min(last, max(0.0, duration * (i + 0.5) / candidates - window_s / 2)), 2)
+                   for i in range(candidates)})
+
+
+def _speech_only(audio: np.ndarray) -> np.ndarray:
+    regions = speech_regions(audio)
+    if not regions:
+        return audio[:0]
+    return np.concatenate([audio[s:e] for s, e in regions])
+
+
+def sample_speech_windows(audio_path: str, count: int = LANGID_WINDOWS, candidates: int = LANGID_CANDIDATES,
+                          window_s: float = WINDOW_SECONDS) -> List[np.ndarray]:
+    """Up to `count` speech-only buffers (at most `window_s` each), the most speech-rich first."""
+    duration = probe_duration(audio_path)
+    if duration is None:
+        # no duration in the header (e.g. some live-recorded webm): take the first few windows
+        windows = []
+        for w in stream_audio(audio_path, window_seconds=window_s):
+            windows.append(w)
+            if len(windows) >= candidates:
+                break
+    else:
+        windows = [decode_window(audio_path, start, window_s)
+                   for start in candidate_offsets(duration, candidates, window_s)]
+    speech = [_speech_only(w) for w in windows]
+    speech = [s for s in speech if len(s) >= MIN_SPEECH_SECONDS * SAMPLE_RATE]
+    speech.sort(key=len, reverse=True)
+    return speech[:count]
+
+
+def vote(probs: Sequence[Dict[str, float]], weights: Optional[Sequence[float]] = None) -> Tuple[str, float]:
+    """(language, averaged probability) from per-window language distributions."""
+    weights = list(weights) if weights is not None else [1.0] * len(probs)
+    total = sum(weights) or 1.0
+    scores: Dict[str, float] = {}
+    for p, w in zip(probs, weights):
+        for lang, prob in p.items():
+            scores[lang] = scores.get(lang, 0.0) + w * prob / total
+    lang = max(scores, key=scores.get)
+    return lang, scores[lang]
+
+
+def detect_language(audio_path: str, transcriber, count: int = LANGID_WINDOWS,
+                    default: str = "en") -> str:
+    """
+    Language of a recording from sampled speech windows. `transcriber` needs
+    language_probs(buffers) -> [distribution] (TranscriberAgent or TranscriptionPool).
+    Without any usable speech the transcriber's last language (or `default`) is returned.
+    """
+    windows = sample_speech_windows(audio_path, count=count)
+    if not windows:
+        return getattr(transcriber, "detected_lang", None) or default
+    lang, _ = vote(transcriber.language_probs(windows), weights=[len(w) for w in windows])
+    transcriber.detected_lang = lang
+    return lang
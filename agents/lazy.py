@@ -0,0 +1,33 @@
+# agents/lazy.py
+"""
+Build-once holders for heavy objects (Whisper model, LLM agent).
+
+Nothing is constructed at import time. The factory runs on the first get(),
+exactly once even when several threads ask at the same moment, and a factory
+that raises is retried on the next call instead of caching the failure.
+"""
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    def __init__(self, factory: Callable[[], T], name: Optional[str] = None):
+        self.factory = factory
+        self.name = name or getattr(factory, "__name__", "object")
+        self._value: Optional[T] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self) -> T:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._value = self.factory()
+                    self._loaded = True
+        return self._value
@@ -0,0 +1,314 @@
+# agents/live.py
+"""
+Live transcription of a microphone stream, with a rolling summary.
+
+LiveSession.feed() takes audio as it arrives (any rate, int or float, mono or
+stereo; other rates are resampled to 16 kHz with a band-limited filter that
+carries its state across chunks) and returns at once: a single worker thread
+moves it into a rolling buffer of the part that is not transcribed yet and
+runs Whisper, so a slow transcription never stalls the microphone stream
+handler. As soon as the energy VAD sees a pause after speech, everything up
+to the pause is a finished utterance: it is transcribed once and committed,
+and the buffer is trimmed. A buffer that grows past `max_buffer_s` without a pause is
+cut at its quietest point instead, so Whisper never sees more than one window.
+Between commits the open utterance is re-transcribed every `partial_every_s`
+seconds as tentative text, which is replaced rather than accumulated.
+
+Every `summary_every_s` seconds of audio, the text committed since the last
+summary is sent to `summarizer(previous_summary, new_text)` in a background
+thread; the LLM only ever sees the new text plus the (short) running summary,
+never the whole transcript. replay() feeds a recording at real-time speed
+(or faster), for testing and benchmarking without a microphone.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from agents.audio import SAMPLE_RATE, stream_audio
+from agents.vad import _quietest_point, speech_regions
+from telemetry import metrics, span
+
+log = logging.getLogger(__name__)
+
+Summarizer = Callable[[Optional[Dict], str], Dict]
+
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    """float32 mono audio from a microphone chunk (int PCM or float, mono or interleaved stereo)."""
+    audio = np.asarray(samples)
+    if np.issubdtype(audio.dtype, np.integer):
+        audio = audio.astype(np.float32) / np.iinfo(audio.dtype).max
+    audio = audio.astype(np.float32, copy=False)
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1)
+    return audio
+
+
+class Resampler:
+    """
+    Streaming band-limited resampler: each output sample is a Hann-windowed
+    sinc over the input, low-passed below the output Nyquist when downsampling
+    so a 44.1/48 kHz microphone does not alias into the speech band. The
+    kernel's tail and the output phase carry over between chunks, so a stream
+    fed in pieces comes out as if resampled in one go, `zeros` input samples'
+    worth of latency behind.
+    """
+
+    def __init__(self, sr_in: int, sr_out: int = SAMPLE_RATE, zeros: int = 16, block: int = 8192):
+        self.step = sr_in / sr_out                  # input samples per output sample
+        self.cutoff = min(1.0, sr_out / sr_in)      # passband, as a fraction of the input Nyquist
+        self.width = int(np.ceil(zeros / self.cutoff))  # kernel half-width in input samples
+        self.block = block
+        self._taps = np.arange(1 - self.width, self.width + 1)
+        self._hist: Optional[np.ndarray] = None     # input not fully used yet
+        self._start = 0                             # stream index of _hist[0]
+        self._next = 0.0                            # stream position of the next output sample
+
+    def process(self, audio: np.ndarray, final: bool = False) -> np.ndarray:
+        """Resampled output for the next piece of the stream; `final` flushes the tail."""
+        audio = np.asarray(audio, dtype=np.float32)
+        if self._hist is None:
+            if not len(audio):
+                return np.zeros(0, dtype=np.float32)
+            # the stream edges are held at their first/last value, not faded in from silence
+            self._hist = np.full(self.width, audio[0], dtype=np.float32)
+            self._start = -self.width
+        buf = np.concatenate([self._hist, audio])
+        end = self._start + len(buf)
+        if final:
+            buf = np.concatenate([buf, np.full(self.width + 1, buf[-1], dtype=np.float32)])
+        # without the flush, an output sample waits until the kernel's right half has arrived
+        limit = end if final else end - self.width
+        n = max(0, int(np.ceil((limit - self._next) / self.step)))
+        out = np.empty(n, dtype=np.float32)
+        for i in range(0, n, self.block):
+            pos = self._next + self.step * np.arange(i, min(n, i + self.block))
+            idx = np.floor(pos).astype(np.int64)[:, None] + self._taps
+            d = pos[:, None] - idx
+            w = np.sinc(self.cutoff * d) * (0.5 + 0.5 * np.cos(np.pi * d / self.width))
+            w /= w.sum(axis=1, keepdims=True)
+            out[i:i + len(pos)] = (buf[idx - self._start] * w).sum(axis=1)
+        self._next += n * self.step
+        keep = max(self._start, int(np.floor(self._next)) + 1 - self.width)
+        self._hist = buf[keep - self._start:end - self._start]
+        self._start = keep
+        return out
+
+
+def to_mono_16k(samples: np.ndarray, sr: int) -> np.ndarray:
+    """float32 mono audio at SAMPLE_RATE from one self-contained microphone chunk."""
+    audio = to_mono(samples)
+    if sr != SAMPLE_RATE:
+        audio = Resampler(sr).process(audio, final=True)
+    return audio
+
+
+class LiveSession:
+    """
+    Incremental transcript of one live meeting. `transcriber` needs
+    transcribe_batch(buffers, language, batch_size=..) (TranscriberAgent or
+    TranscriptionPool); `summarizer` is optional.
+    """
+    def __init__(self, transcriber, summarizer: Optional[Summarizer] = None, language: Optional[str] = None,
+                 min_pause_s: float = 0.6, max_buffer_s: float = 25.0, partial_every_s: float = 3.0,
+                 summary_every_s: float = 60.0):
+        self.transcriber = transcriber
+        self.summarizer = summarizer
+        self.language = language
+        self.min_pause_s = min_pause_s
+        self.max_buffer_s = max_buffer_s
+        self.partial_every_s = partial_every_s
+        self.summary_every_s = summary_every_s
+
+        self.words: List[str] = []
+        self.segments: List[Dict] = []
+        self.tentative = ""
+        self.summary: Optional[Dict] = None
+        self.summary_error: Optional[str] = None
+        self.position = 0.0     # seconds of audio fed so far
+        self._buf = np.zeros(0, dtype=np.float32)
+        self._buf_start = 0.0   # position of _buf[0]
+        self._since_partial = 0.0
+        self._summarized = 0    # committed words already sent to the summarizer
+        self._last_summary_at = 0.0
+        self._summary_job = None
+        self._summary_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-summary")
+        # fed audio waiting for the ASR worker; one worker keeps the chunks in order
+        self._inbox: List[np.ndarray] = []
+        self._inbox_lock = threading.Lock()
+        self._resampler: Optional[Resampler] = None  # for the current input rate, if it is not 16 kHz
+        self._asr_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-asr")
+        self._lock = threading.Lock()
+
+    @property
+    def committed_text(self) -> str:
+        return " ".join(self.words)
+
+    @property
+    def text(self) -> str:
+        """Committed transcript followed by the tentative tail."""
+        return f"{self.committed_text} {self.tentative}".strip()
+
+    def feed(self, samples: np.ndarray, sr: int = SAMPLE_RATE) -> None:
+        """
+        Queue a chunk of microphone audio for the ASR worker, which commits
+        whatever utterances it completes. Returns without waiting for Whisper.
+        """
+        audio = to_mono(samples)
+        with self._inbox_lock:
+            if sr != SAMPLE_RATE:
+                if self._resampler is None or self._resampler.step != sr / SAMPLE_RATE:
+                    self._flush_resampler()
+                    self._resampler = Resampler(sr)
+                audio = self._resampler.process(audio)
+            else:
+                self._flush_resampler()
+            self._queue(audio)
+        self._asr_pool.submit(self._process)
+
+    def _queue(self, audio: np.ndarray) -> None:
+        self._inbox.append(audio)
+        self.position += len(audio) / SAMPLE_RATE
+
+    def _flush_resampler(self) -> None:
+        """Queue the resampler's held-back tail (the input rate changed or the stream ended)."""
+        if self._resampler is not None:
+            self._queue(self._resampler.process(np.zeros(0, dtype=np.float32), final=True))
+            self._resampler = None
+
+    def wait(self) -> None:
+        """Block until every chunk fed so far has been processed."""
+        self._asr_pool.submit(lambda: None).result()
+
+    def _process(self) -> None:
+        """ASR worker: move queued audio into the buffer, commit utterances, refresh the tentative text."""
+        with self._inbox_lock:
+            chunks, self._inbox = self._inbox, []
+        if not chunks:
+            return
+        with self._lock:
+            self._buf = np.concatenate([self._buf] + chunks)
+            self._since_partial += sum(len(c) for c in chunks) / SAMPLE_RATE
+            try:
+                self._commit_ready(final=False)
+                if self.partial_every_s and self._since_partial >= self.partial_every_s:
+                    self._update_tentative()
+            except Exception as e:
+                # the audio stays buffered and is transcribed with the next chunk
+                log.warning("live transcription failed: %s", e)
+            if self.position - self._last_summary_at >= self.summary_every_s:
+                self._submit_summary()
+
+    def finish(self) -> Dict:
+        """Commit the rest of the buffer, bring the summary up to date and return the result."""
+        with self._inbox_lock:
+            self._flush_resampler()
+        self._asr_pool.submit(self._process)
+        self.wait()
+        self._asr_pool.shutdown(wait=True)
+        with self._lock:
+            self._commit_ready(final=True)
+            self.tentative = ""
+            if self._summary_job is not None:
+                self._summary_job.result()
+            self._submit_summary()
+            if self._summary_job is not None:
+                self._summary_job.result()
+        self._summary_pool.shutdown(wait=False)
+        return {"text": self.committed_text, "segments": self.segments, "language": self.language,
+                "summary": self.summary, "duration": self.position}
+
+    def _commit_ready(self, final: bool) -> None:
+        regions = speech_regions(self._buf)
+        if not regions:
+            # silence only: keep a short tail so the onset of the next word is not lost
+            self._drop(max(0, len(self._buf) - int(0.3 * SAMPLE_RATE)))
+            return
+        pause = int(self.min_pause_s * SAMPLE_RATE)
+        closed = [e for _, e in regions if len(self._buf) - e >= pause]
+        if final:
+            cut = len(self._buf)
+        elif closed:
+            cut = closed[-1]
+        elif len(self._buf) > self.max_buffer_s * SAMPLE_RATE:
+            limit = int(self.max_buffer_s * SAMPLE_RATE)
+            cut = _quietest_point(self._buf, limit * 2 // 3, limit, SAMPLE_RATE)
+        else:
+            return
+        start = regions[0][0]
+        if cut > start:
+            with span("live_commit", audio_s=round((cut - start) / SAMPLE_RATE, 2)):
+                result = self._transcribe(self._buf[start:cut])
+            # utterances do not overlap, so unlike TranscriptStitcher nothing is de-duplicated
+            offset = self._buf_start + start / SAMPLE_RATE
+            self.words.extend(result.get("text", "").split())
+            self.segments.extend(dict(seg, start=seg["start"] + offset, end=seg["end"] + offset)
+                                 for seg in result.get("segments", []))
+            # how far behind the speaker committed text is (audio seconds)
+            metrics.observe("live_commit_lag_seconds", self.position - (self._buf_start + cut / SAMPLE_RATE))
+            self.tentative = ""
+        self._drop(cut)
+
+    def _update_tentative(self) -> None:
+        self._since_partial = 0.0
+        regions = speech_regions(self._buf)
+        if not regions:
+            self.tentative = ""
+            return
+        with span("live_partial"):
+            self.tentative = self._transcribe(self._buf[regions[0][0]:])["text"]
+
+    def _transcribe(self, audio: np.ndarray) -> Dict:
+        result = self.transcriber.transcribe_batch([audio], language=self.language, batch_size=1)[0]
+        # the first utterance fixes the language for the rest of the session
+        self.language = self.language or result.get("language")
+        return result
+
+    def _drop(self, n: int) -> None:
+        self._buf = self._buf[n:]
+        self._buf_start += n / SAMPLE_RATE
+
+    def _submit_summary(self) -> None:
+        """Send the words committed since the last summary, unless a summary is still running."""
+        if self.summarizer is None or (self._summary_job is not None and not self._summary_job.done()):
+            return
+        words = self.words
+        if len(words) <= self._summarized:
+            return
+        upto = len(words)
+        new_text = " ".join(words[self._summarized:upto])
+        self._last_summary_at = self.position
+        self._summary_job = self._summary_pool.submit(self._summarize, new_text, upto)
+
+    def _summarize(self, new_text: str, upto: int) -> None:
+        try:
+            with span("live_summary", chars=len(new_text)):
+                self.summary = self.summarizer(self.summary, new_text)
+            self._summarized = upto
+            self.summary_error = None
+        except Exception as e:
+            # the same words are retried with the next interval's
+            log.warning("live summary failed: %s", e)
+            self.summary_error = str(e)
+
+
+def replay(audio_path: str, session: LiveSession, chunk_s: float = 0.5, speed: float = 1.0) -> Dict:
+    """
+    Feed a recording to `session` in `chunk_s` pieces, paced like a microphone
+    at `speed` x real time (0 = as fast as possible), then finish it.
+    """
+    t0 = time.perf_counter()
+    fed = 0.0
+    for window in stream_audio(audio_path, window_seconds=chunk_s):
+        # a microphone delivers a chunk once it has been spoken
+        fed += len(window) / SAMPLE_RATE
+        if speed:
+            ahead = fed / speed - (time.perf_counter() - t0)
+            if ahead > 0:
+                time.sleep(ahead)
+        session.feed(window, SAMPLE_RATE)
+    return session.finish()
@@ -1,14 +1,16 @@
-import os
 import json
-from typing import Dict
-import google.generativeai as genai
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
 
-# OpenAI (optional fallback)
-try:
-    from openai import OpenAI
-    _has_openai = True
-except Exception:
-    _has_openai = False
+from integrations.llm_client import DEFAULT_MODELS, default_provider, generate
+from telemetry import propagate
+
+# transcripts longer than this (in characters) are analysed map-reduce style
+PROMPT_BUDGET_CHARS = int(os.getenv("LLM_PROMPT_BUDGET_CHARS", "25000"))
+# how many map calls run at once
+MAP_CONCURRENCY = int(os.getenv("LLM_MAP_CONCURRENCY", "4"))
 
 SYSTEM_PROMPT = (
     "You are an AI meeting summarizer.\n"
@@ -27,48 +29,167 @@ USER_TEMPLATE = (
     "Target language: {{LANG}}"
 )
 
+REDUCE_SYSTEM_PROMPT = (
+    "You are an AI meeting summarizer. You receive partial analyses of consecutive parts of one meeting.\n"
+    "1) Merge the partial summaries into 3–5 bullet points for the whole meeting.\n"
+    "2) Provide a fluent translation of that summary in the target language.\n"
+    "3) Give the overall sentiment (positive, neutral, negative).\n"
+    "Respond ONLY in valid JSON with keys: summary, translation, sentiment."
+)
+
+REDUCE_TEMPLATE = (
+    "Partial summaries:\n"
+    "{{PARTS}}\n\n"
+    "Partial sentiments: {{SENTIMENTS}}\n\n"
+    "Target language: {{LANG}}"
+)
+
+ROLLING_SYSTEM_PROMPT = (
+    "You are an AI meeting summarizer following a meeting while it happens.\n"
+    "You receive your notes so far and only the newest part of the transcript.\n"
+    "1) Update the summary to 3–5 bullet points covering the whole meeting so far.\n"
+    "2) Extract action items, decisions and risks from the new part only.\n"
+    "Respond ONLY in valid JSON with keys: summary, actions, decisions, risks."
+)
+
+ROLLING_TEMPLATE = (
+    "Notes so far:\n"
+    "{{NOTES}}\n\n"
+    "New transcript:\n"
+    "{{NEW}}"
+)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _parse_json(text: str) -> Dict:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        start = text.find('{')
+        end = text.rfind('}')
+        return json.loads(text[start:end+1])
+
+
+def _is_json(text: str) -> bool:
+    """Whether `text` parses with _parse_json; only such responses are cached."""
+    try:
+        _parse_json(text)
+    except ValueError:
+        return False
+    return True
+
+
+def split_transcript(transcript: str, segments: Optional[List[Dict]] = None, budget: int = PROMPT_BUDGET_CHARS) -> List[str]:
+    """
+    Split a transcript into pieces of at most `budget` characters, cutting only
+    between Whisper segments (or between sentences when no segments are given).
+    """
+    units = [s.get("text", "").strip() for s in segments] if segments else _SENTENCE_END.split(transcript)
+    pieces, current = [], ""
+    for unit in filter(None, units):
+        # a single unit over budget (no punctuation at all) is hard-split
+        while len(unit) > budget:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(unit[:budget])
+            unit = unit[budget:]
+        if current and len(current) + 1 + len(unit) > budget:
+            pieces.append(current)
+            current = unit
+        else:
+            current = f"{current} {unit}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _dedupe(items: List) -> List:
+    """Order-preserving de-duplication that ignores case, spacing and punctuation."""
+    seen, out = set(), []
+    for item in items:
+        raw = item if isinstance(item, str) else json.dumps(item, sort_keys=True)
+        key = re.sub(r"[\W_]+", " ", raw.lower()).strip()
+        if key and key not in seen:
+            seen.add(key)
+            out.append(item)
+    return out
+
+
+def _as_list(value) -> List:
+    if not value:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
 class LLMNLP:
     def __init__(self):
-        self.gemini_key = os.getenv("GEMINI_API_KEY")
-        self.openai_key = os.getenv("OPENAI_API_KEY")
-
-        if self.gemini_key:
-            genai.configure(api_key=self.gemini_key)
-            self.provider = "gemini"
-            self.gemini_model = genai.GenerativeModel("gemini-1.5-flash")
-        elif self.openai_key and _has_openai:
-            self.provider = "openai"
-            self.openai_client = OpenAI(api_key=self.openai_key)
-            self.openai_model = "gpt-4o-mini"
-        else:
-            raise RuntimeError("No LLM provider configured. Set GEMINI_API_KEY or OPENAI_API_KEY in .env")
-
-    def analyze(self, transcript: str, target_lang: str) -> Dict:
-        user = USER_TEMPLATE.replace("{{TRANSCRIPT}}", transcript[:25000]).replace("{{LANG}}", target_lang)
-
-        if self.provider == "gemini":
-            resp = self.gemini_model.generate_content([
-                {"role": "user", "parts": [SYSTEM_PROMPT]},
-                {"role": "user", "parts": [user]},
-            ])
-            text = resp.text
-        else:  # OpenAI
-            msg = [
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user},
-            ]
-            resp = self.openai_client.chat.completions.create(
-                model=self.openai_model,
-                messages=msg,
-                temperature=0.2,
-            )
-            text = resp.choices[0].message.content
-
-        # Parse JSON safely
-        try:
-            data = json.loads(text)
-        except json.JSONDecodeError:
-            start = text.find('{')
-            end = text.rfind('}')
-            data = json.loads(text[start:end+1])
-        return data
+        # raises if neither GEMINI_API_KEY nor OPENAI_API_KEY (nor LLM_PROVIDER) is set;
+        # this is the first choice, generate() fails over to the others (integrations/llm_router.py)
+        self.provider = default_provider()
+        self.model = DEFAULT_MODELS.get(self.provider, self.provider)
+
+    def analyze(self, transcript: str, target_lang: str, segments: Optional[List[Dict]] = None,
+                condense: Optional[Callable[[str], str]] = None) -> Dict:
+        """
+        Summary, actions, decisions, risks, translation and sentiment for a transcript.
+        Transcripts over PROMPT_BUDGET_CHARS are split on segment boundaries, the
+        parts are analysed concurrently (map) and merged with duplicates removed
+        (reduce), so nothing past the prompt budget is dropped.
+        `condense` (e.g. HighlightAgent.condense with a token budget) shrinks each
+        piece before it is sent. It runs after the split, so a long meeting is
+        still covered piece by piece instead of being condensed under the
+        map-reduce threshold as a whole.
+        """
+        condense = condense or (lambda text: text)
+        if len(transcript) <= PROMPT_BUDGET_CHARS:
+            return self._analyze_part(condense(transcript), target_lang)
+
+        pieces = split_transcript(transcript, segments, budget=PROMPT_BUDGET_CHARS)
+        with ThreadPoolExecutor(max_workers=max(1, MAP_CONCURRENCY)) as pool:
+            partials = list(pool.map(propagate(lambda p: self._analyze_part(condense(p), target_lang)), pieces))
+        return self._reduce(partials, target_lang)
+
+    def _analyze_part(self, transcript: str, target_lang: str) -> Dict:
+        user = USER_TEMPLATE.replace("{{TRANSCRIPT}}", transcript).replace("{{LANG}}", target_lang)
+        # identical transcript + language -> served from the shared response cache
+        text = generate(user, provider=self.provider, model=self.model, system=SYSTEM_PROMPT, validate=_is_json)
+        return _parse_json(text)
+
+    def _reduce(self, partials: List[Dict], target_lang: str) -> Dict:
+        merged = {
+            key: _dedupe([item for p in partials for item in _as_list(p.get(key))])
+            for key in ("actions", "decisions", "risks")
+        }
+        summaries = _dedupe([b for p in partials for b in _as_list(p.get("summary"))])
+        sentiments = [str(p.get("sentiment", "neutral")) for p in partials]
+
+        user = (REDUCE_TEMPLATE
+                .replace("{{PARTS}}", "\n".join(f"- {b}" for b in summaries))
+                .replace("{{SENTIMENTS}}", ", ".join(sentiments))
+                .replace("{{LANG}}", target_lang))
+        final = _parse_json(generate(user, provider=self.provider, model=self.model,
+                                     system=REDUCE_SYSTEM_PROMPT, validate=_is_json))
+        merged["summary"] = _as_list(final.get("summary")) or summaries
+        merged["translation"] = final.get("translation") or " ".join(map(str, merged["summary"]))
+        merged["sentiment"] = final.get("sentiment") or max(set(sentiments), key=sentiments.count)
+        return merged
+
+    def update_summary(self, previous: Optional[Dict], new_text: str) -> Dict:
+        """
+        Rolling summary for a live meeting: the previous summary plus only the
+        transcript added since, so each call costs the same however long the
+        meeting runs. Action items, decisions and risks accumulate locally.
+        """
+        previous = previous or {}
+        notes = "\n".join(f"- {b}" for b in _as_list(previous.get("summary"))) or "(none yet)"
+        user = ROLLING_TEMPLATE.replace("{{NOTES}}", notes).replace("{{NEW}}", new_text)
+        update = _parse_json(generate(user, provider=self.provider, model=self.model,
+                                      system=ROLLING_SYSTEM_PROMPT, validate=_is_json))
+        result = {
+            key: _dedupe(_as_list(previous.get(key)) + _as_list(update.get(key)))
+            for key in ("actions", "decisions", "risks")
+        }
+        result["summary"] = _as_list(update.get("summary")) or _as_list(previous.get("summary"))
+        return result
@@ -0,0 +1,112 @@
+# agents/pool.py
+"""
+Multi-process transcription engine.
+
+Each worker process loads its own Whisper model once (in the pool initializer)
+and then serves batches of decoded chunks. Torch intra-op threads are divided
+between workers so N workers x T threads never exceeds the core count.
+The pool is shared: chunks from one long recording and from concurrent jobs
+are all spread over the same workers.
+"""
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from agents.vad import SpeechChunk
+
+# per-process TranscriberAgent, created by _init_worker
+_agent = None
+
+
+def _init_worker(model_name: str, threads: int, backend: Optional[str] = None) -> None:
+    global _agent
+    import torch
+    torch.set_num_interop_threads(1)
+    from agents.transcriber import TranscriberAgent
+    _agent = TranscriberAgent(model_name=model_name, backend=backend, threads=threads)
+
+
+def _detect_language(audio: np.ndarray) -> str:
+    return _agent.detect_language(audio)
+
+
+def _language_probs(audios: List[np.ndarray]) -> List[Dict[str, float]]:
+    return _agent.language_probs(audios)
+
+
+def _transcribe_batch(audios: List[np.ndarray], language: Optional[str], task: str) -> List[Dict]:
+    return _agent.transcribe_batch(audios, language=language, task=task, batch_size=len(audios))
+
+
+class TranscriptionPool:
+    """
+    Same detect_language / transcribe_batch / transcribe_chunks interface as
+    TranscriberAgent, backed by a process pool.
+    """
+    def __init__(self, model_name: str = "base", workers: Optional[int] = None, threads_per_worker: Optional[int] = None,
+                 backend: Optional[str] = None):
+        cores = os.cpu_count() or 1
+        self.workers = workers or max(1, cores // 4)
+        self.threads_per_worker = threads_per_worker or max(1, cores // self.workers)
+        print(f"Starting transcription pool: {self.workers} workers x {self.threads_per_worker} threads ({model_name})")
+        # spawn, not fork: forking a process that already imported torch is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, self.threads_per_worker, backend),
+        )
+        self.detected_lang = "en"
+
+    def detect_language(self, audio: np.ndarray) -> str:
+        self.detected_lang = self._executor.submit(_detect_language, audio).result()
+        return self.detected_lang
+
+    def language_probs(self, audios: List[np.ndarray]) -> List[Dict[str, float]]:
+        return self._executor.submit(_language_probs, list(audios)).result()
+
+    def submit_batch(self, audios: List[np.ndarray], language: Optional[str] = None, task: str = "transcribe") -> Future:
+        return self._executor.submit(_transcribe_batch, list(audios), language, task)
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: Optional[str] = None,
+                         task: str = "transcribe", batch_size: int = 8) -> List[Dict]:
+        """Split the buffers into batches, run them on all workers and gather the results in order."""
+        futures = [self.submit_batch(audios[i:i + batch_size], language, task)
+                   for i in range(0, len(audios), batch_size)]
+        return [r for f in futures for r in f.result()]
+
+    def transcribe_chunks(self, chunks: Iterable[SpeechChunk], language: Optional[str] = None,
+                          task: str = "transcribe", batch_size: int = 8) -> Iterator[Tuple[float, Dict]]:
+        """
+        Pipelined version of TranscriberAgent.transcribe_chunks: batches are
+        submitted as soon as they fill up, while ingestion keeps producing
+        chunks. At most two batches per worker are in flight, so memory stays
+        bounded. Yields (chunk.start, result) in input order.
+        """
+        in_flight = deque()
+        max_in_flight = 2 * self.workers
+        pending: List[SpeechChunk] = []
+
+        def submit():
+            in_flight.append(([c.start for c in pending], self.submit_batch([c.audio for c in pending], language, task)))
+            pending.clear()
+
+        for chunk in chunks:
+            pending.append(chunk)
+            if len(pending) >= batch_size:
+                submit()
+            while len(in_flight) >= max_in_flight or (in_flight and in_flight[0][1].done()):
+                starts, fut = in_flight.popleft()
+                yield from zip(starts, fut.result())
+        if pending:
+            submit()
+        while in_flight:
+            starts, fut = in_flight.popleft()
+            yield from zip(starts, fut.result())
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -12,47 +12,78 @@
 
 
 # agents/transcriber.py
-import whisper
+# torch and whisper are imported inside the methods that use them, so importing this
+# module (e.g. for _segments_from_tokens, or to pick an engine) stays cheap
 import os
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from agents.asr import asr_threads, get_engine
+
+# A file path, or an already decoded 16 kHz mono float32 buffer (see agents/audio.py)
+AudioInput = Union[str, np.ndarray]
+
+# seconds per timestamp token (encoder stride 2 * HOP_LENGTH / SAMPLE_RATE)
+TIME_PRECISION = 0.02
+
 
 class TranscriberAgent:
     """
     Loads a Whisper model once. Provides:
-      - detect_language(audio_path) -> language code (e.g. 'en')
-      - transcribe(audio_path, language=None) -> dict with text, language, segments
+      - detect_language(audio) -> language code (e.g. 'en')
+      - language_probs(audios) -> one language distribution per buffer, batched
+      - transcribe(audio, language=None) -> dict with text, language, segments
+      - transcribe_batch(audios, language=None) -> one such dict per input buffer
+      - transcribe_chunks(chunks, language=None) -> (chunk.start, dict) pairs, batched
+    `audio` may be a file path or a decoded buffer; passing the buffer avoids
+    running ffmpeg again for every call.
     """
-    def __init__(self, model_name: str = "base"):
+    def __init__(self, model_name: str = "base", backend: Optional[str] = None, threads: Optional[int] = None):
         # choice: "tiny", "base", "small", "medium", "large"
         # use smaller models for faster startup during dev
-        print(f"Loading Whisper model: {model_name} ...")
-        self.model = whisper.load_model(model_name)
+        # backend: ASR engine (see agents/asr.py), default ASR_BACKEND or "whisper"
+        import torch
+
+        threads = threads or asr_threads()
+        if threads:
+            torch.set_num_threads(threads)
+        self.engine = get_engine(backend)
+        print(f"Loading Whisper model: {model_name} ({self.engine.name}) ...")
+        self.model = self.engine.load(model_name)
         self.detected_lang = "en"
 
-    def detect_language(self, audio_path: str) -> str:
+    def language_probs(self, audios: Sequence[np.ndarray]) -> List[Dict[str, float]]:
+        """
+        Whisper's language distribution for each buffer (first 30 s of each),
+        computed in one batched pass of the encoder and language head.
+        """
+        import torch
+        import whisper
+
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(a[:whisper.audio.N_SAMPLES]), n_mels=self.model.dims.n_mels)
+            for a in audios
+        ]).to(self.model.device)
+        result = self.model.detect_language(mel)
+        # (tokens, probs) in current versions, bare probs in some older ones
+        probs = result[1] if isinstance(result, tuple) and len(result) == 2 else result
+        return probs if isinstance(probs, list) else [probs]
+
+    def detect_language(self, audio: AudioInput) -> str:
         """
         Returns a language code (e.g. 'en', 'hi', 'es') using Whisper's detect_language.
+        A file path is sampled at a few speech windows across the recording
+        (see agents/langid.py); a buffer is judged on its first 30 s.
         """
-        audio = whisper.load_audio(audio_path)
-        audio = whisper.pad_or_trim(audio)
-        mel = whisper.log_mel_spectrogram(audio).to(self.model.device)
-        # model.detect_language returns (lang, probs) in some versions; handle both shapes.
-        try:
-            lang_probs = self.model.detect_language(mel)
-            # some versions return (lang, probs); some return probs dict
-            if isinstance(lang_probs, tuple) and len(lang_probs) == 2:
-                _, probs = lang_probs
-            else:
-                probs = lang_probs
-            detected = max(probs, key=probs.get)
-        except Exception:
-            # fallback: transcribe a short chunk and trust result language field
-            result = self.model.transcribe(audio_path, verbose=False)
-            detected = result.get("language", "en")
-        self.detected_lang = detected
-        return detected
-
-    def transcribe(self, audio_path: str, language: Optional[str] = None, task: str = "transcribe") -> Dict:
+        if isinstance(audio, str):
+            from agents.langid import detect_language
+            return detect_language(audio, self)
+        probs = self.language_probs([audio])[0]
+        self.detected_lang = max(probs, key=probs.get)
+        return self.detected_lang
+
+    def transcribe(self, audio: AudioInput, language: Optional[str] = None, task: str = "transcribe") -> Dict:
         """
         Transcribe the audio. If language is provided, pass it to Whisper to force that language.
         Returns: {"text": str, "language": str, "segments": list}
@@ -62,9 +93,110 @@ class TranscriberAgent:
             kwargs["language"] = language
             kwargs["task"] = task
 
-        result = self.model.transcribe(audio_path, **kwargs)
+        result = self.model.transcribe(audio, **kwargs)
         text = result.get("text", "").strip()
         lang = result.get("language", language or self.detected_lang or "en")
         segments = result.get("segments", [])
         self.detected_lang = lang
         return {"text": text, "language": lang, "segments": segments}
+
+    def transcribe_batch(
+        self,
+        audios: Sequence[np.ndarray],
+        language: Optional[str] = None,
+        task: str = "transcribe",
+        batch_size: int = 8,
+    ) -> List[Dict]:
+        """
+        Transcribe many decoded buffers with batched Whisper inference: every
+        buffer is cut into 30 s windows, their log-mel spectrograms are stacked
+        and encoded/decoded together `batch_size` windows at a time.
+        Returns one {"text", "language", "segments"} dict per input buffer, with
+        segment timestamps relative to the start of that buffer.
+        Unlike transcribe() this decodes greedily without temperature fallback.
+        """
+        import torch
+        import whisper
+
+        # (owner index, offset in seconds, 30 s window)
+        windows = []
+        for i, audio in enumerate(audios):
+            for off in range(0, max(len(audio), 1), whisper.audio.N_SAMPLES):
+                windows.append((i, off / whisper.audio.SAMPLE_RATE, audio[off:off + whisper.audio.N_SAMPLES]))
+
+        device = self.model.device
+        options = whisper.DecodingOptions(
+            task=task, language=language, without_timestamps=False, fp16=device.type != "cpu"
+        )
+        decoded = []
+        for b in range(0, len(windows), batch_size):
+            mel = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(w), n_mels=self.model.dims.n_mels)
+                for _, _, w in windows[b:b + batch_size]
+            ]).to(device)
+            decoded.extend(whisper.decode(self.model, mel, options))
+
+        results = [{"text": "", "language": language, "segments": []} for _ in audios]
+        for (owner, offset, window), res in zip(windows, decoded):
+            out = results[owner]
+            out["language"] = out["language"] or res.language
+            # same silence rule as whisper.transcribe
+            if res.no_speech_prob > 0.6 and res.avg_logprob < -1.0:
+                continue
+            tokenizer = whisper.tokenizer.get_tokenizer(
+                self.model.is_multilingual, num_languages=self.model.num_languages,
+                language=res.language, task=task,
+            )
+            duration = len(window) / whisper.audio.SAMPLE_RATE
+            out["segments"].extend(_segments_from_tokens(res.tokens, tokenizer, offset, duration))
+            out["text"] = (out["text"] + " " + res.text.strip()).strip()
+
+        for out in results:
+            out["language"] = out["language"] or self.detected_lang or "en"
+        if results:
+            self.detected_lang = results[-1]["language"]
+        return results
+
+    def transcribe_chunks(self, chunks: Iterable, language: Optional[str] = None,
+                          task: str = "transcribe", batch_size: int = 8) -> Iterator[Tuple[float, Dict]]:
+        """
+        Transcribe a stream of SpeechChunk objects (see agents/vad.py) `batch_size`
+        at a time. Yields (chunk.start, result) in input order without holding
+        more than one batch of audio.
+        """
+        pending = []
+        for chunk in chunks:
+            pending.append(chunk)
+            if len(pending) >= batch_size:
+                results = self.transcribe_batch([c.audio for c in pending], language, task, batch_size)
+                yield from zip([c.start for c in pending], results)
+                pending = []
+        if pending:
+            results = self.transcribe_batch([c.audio for c in pending], language, task, batch_size)
+            yield from zip([c.start for c in pending], results)
+
+
+def _segments_from_tokens(tokens: List[int], tokenizer, offset: float, duration: float = 30.0) -> List[Dict]:
+    """
+    Split decoded tokens into timestamped segments. Every timestamp token ends
+    the text before it and starts the next segment, so both the paired form
+    (<|t0|> text <|t1|><|t1|> text <|t2|>) and single timestamps between
+    segments (<|t0|> text <|t1|> text <|t2|>) work. Text with no closing
+    timestamp runs to the end of the window, `duration` seconds long.
+    """
+    ts_begin = tokenizer.timestamp_begin
+    segments, text_tokens, start = [], [], 0.0
+    for tok in tokens:
+        if tok >= ts_begin:
+            t = min((tok - ts_begin) * TIME_PRECISION, duration)
+            if text_tokens:
+                segments.append({"start": offset + start, "end": offset + t,
+                                 "text": tokenizer.decode(text_tokens).strip()})
+                text_tokens = []
+            start = t
+        elif tok < tokenizer.eot:
+            text_tokens.append(tok)
+    if text_tokens:
+        segments.append({"start": offset + start, "end": offset + max(start, duration),
+                         "text": tokenizer.decode(text_tokens).strip()})
+    return segments
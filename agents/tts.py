@@ -0,0 +1,177 @@
+# agents/tts.py
+"""
+Text-to-speech stage.
+
+Text is split on sentence boundaries, sentences are synthesised concurrently on
+a bounded thread pool (each one cached by backend/text/lang), and the parts are
+joined once in memory before a single write to the output file, so concurrent
+jobs never share temp files.
+
+Backends are pluggable (TTS_BACKEND): "gtts" calls Google TTS and produces
+MP3 frames; "local" is an offline synthesiser (tones, 16 kHz PCM -> WAV) for
+tests and benchmarks. Register more with register_backend().
+"""
+import functools
+import io
+import math
+import os
+import re
+import struct
+import threading
+import time
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from telemetry import count, propagate, span
+
+
+class GTTSBackend:
+    name = "gtts"
+    format = "mp3"  # MP3 frames can be concatenated byte-wise
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        from gtts import gTTS
+        fp = io.BytesIO()
+        gTTS(text, lang=lang).write_to_fp(fp)
+        return fp.getvalue()
+
+
+class LocalToneBackend:
+    """Offline stand-in: one short tone per word, optional fake latency (LOCAL_TTS_LATENCY_MS)."""
+    name = "local"
+    format = "pcm16"
+    sample_rate = 16000
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        delay = float(os.getenv("LOCAL_TTS_LATENCY_MS", "0")) / 1000
+        if delay:
+            time.sleep(delay)
+        out = bytearray()
+        for word in text.split():
+            out += self._tone(200 + 20 * (sum(map(ord, word)) % 20), min(8 * len(word), 60))
+            out += b"\0\0" * (self.sample_rate // 10)  # pause between words
+        return bytes(out)
+
+    @functools.lru_cache(maxsize=256)
+    def _tone(self, freq: int, centiseconds: int) -> bytes:
+        n = self.sample_rate * centiseconds // 100
+        return b"".join(
+            struct.pack("<h", int(6000 * math.sin(2 * math.pi * freq * i / self.sample_rate)))
+            for i in range(n)
+        )
+
+
+BACKENDS: Dict[str, object] = {"gtts": GTTSBackend(), "local": LocalToneBackend()}
+
+
+def register_backend(backend) -> None:
+    """Add a backend object with `name`, `format` ("mp3" or "pcm16") and synthesize(text, lang) -> bytes."""
+    BACKENDS[backend.name] = backend
+
+
+def get_backend(name: Optional[str] = None):
+    name = name or os.getenv("TTS_BACKEND", "gtts")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend: {name}")
+    return BACKENDS[name]
+
+
+def file_extension(backend=None) -> str:
+    backend = backend or get_backend()
+    return "mp3" if backend.format == "mp3" else "wav"
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+
+
+def split_sentences(text: str, max_chars: int = 500) -> List[str]:
+    """Sentences of `text`; a sentence longer than `max_chars` is split between words."""
+    parts = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            parts.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            parts.append(sentence)
+    return parts
+
+
+class SentenceCache:
+    """Thread-safe LRU of synthesised audio keyed by (backend, text, lang)."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[bytes]:
+        with self._lock:
+            audio = self._data.get(key)
+            if audio is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return audio
+
+    def put(self, key: Tuple[str, str, str], audio: bytes) -> None:
+        with self._lock:
+            self._data[key] = audio
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+sentence_cache = SentenceCache(max_entries=int(os.getenv("TTS_CACHE_ENTRIES", "2048")))
+
+
+def _join(parts: List[bytes], backend) -> bytes:
+    """Join synthesised parts in one pass."""
+    if backend.format == "mp3":
+        return b"".join(parts)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(getattr(backend, "sample_rate", 16000))
+        w.writeframes(b"".join(parts))
+    return buf.getvalue()
+
+
+def synthesize(text: str, lang: str = "en", backend=None, max_workers: int = 4,
+               max_chars: int = 500, cache: Optional[SentenceCache] = None) -> bytes:
+    """Synthesise `text` sentence by sentence (concurrently, cached) and return the joined audio bytes."""
+    backend = backend or get_backend()
+    cache = cache or sentence_cache
+
+    def one(sentence: str) -> bytes:
+        key = (backend.name, sentence, lang)
+        audio = cache.get(key)
+        if audio is None:
+            with span("tts_sentence", backend=backend.name, chars=len(sentence)):
+                audio = backend.synthesize(sentence, lang)
+            count("tts_chars_total", len(sentence), backend=backend.name)
+            cache.put(key, audio)
+        return audio
+
+    sentences = split_sentences(text, max_chars)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sentences) or 1))) as pool:
+        parts = list(pool.map(propagate(one), sentences))
+    return _join(parts, backend)
+
+
+def synthesize_to_file(text: str, out_path: str, lang: str = "en", backend=None, max_workers: int = 4) -> str:
+    """synthesize() + one write to `out_path` (a per-job path; no shared temp files)."""
+    backend = backend or get_backend()
+    audio = synthesize(text, lang=lang, backend=backend, max_workers=max_workers)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "wb") as f:
+        f.write(audio)
+    return out_path
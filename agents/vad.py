@@ -0,0 +1,219 @@
+# agents/vad.py
+"""
+Energy-based voice activity detection and speech chunking.
+
+segment_stream() turns the fixed windows produced by agents.audio.stream_audio
+into speech-only chunks whose boundaries fall in pauses, so Whisper never sees
+long silent stretches and words are not cut in half. Each chunk remembers its
+start time in the original recording; stitch_transcripts() shifts segment
+timestamps back and removes words repeated across the small chunk overlap.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from agents.audio import SAMPLE_RATE
+
+
+@dataclass
+class SpeechChunk:
+    audio: np.ndarray   # float32 samples (may be a view of the ingestion buffer)
+    start: float        # offset in seconds within the original recording
+
+    @property
+    def duration(self) -> float:
+        return len(self.audio) / SAMPLE_RATE
+
+
+def _frame_db(audio: np.ndarray, frame: int) -> np.ndarray:
+    n = len(audio) // frame
+    frames = audio[:n * frame].reshape(n, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+    return 20 * np.log10(rms)
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """[start, end) index pairs of the True runs in a boolean mask."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def speech_regions(
+    audio: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    frame_ms: int = 30,
+    min_pause_ms: int = 300,
+    min_speech_ms: int = 200,
+    pad_ms: int = 150,
+) -> List[Tuple[int, int]]:
+    """
+    Return (start_sample, end_sample) pairs of speech in `audio`.
+    The threshold adapts to the noise floor of the buffer (10th percentile of
+    frame energy + 12 dB), clamped so pure silence and constant signals behave.
+    """
+    frame = sr * frame_ms // 1000
+    if len(audio) < frame:
+        return []
+    db = _frame_db(audio, frame)
+    threshold = float(np.clip(np.percentile(db, 10) + 12, -55, -35))
+    mask = db > threshold
+
+    # close short pauses, then drop blips that are too short to be speech
+    gap = max(1, min_pause_ms // frame_ms)
+    for s, e in _runs(~mask):
+        if e - s < gap and s > 0 and e < len(mask):
+            mask[s:e] = True
+    min_len = max(1, min_speech_ms // frame_ms)
+    pad = pad_ms * sr // 1000
+
+    regions: List[Tuple[int, int]] = []
+    for s, e in _runs(mask):
+        if e - s < min_len:
+            continue
+        start, end = max(0, s * frame - pad), min(len(audio), e * frame + pad)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def _quietest_point(audio: np.ndarray, lo: int, hi: int, sr: int) -> int:
+    """Sample index of the quietest 30 ms frame in audio[lo:hi] (used for forced cuts)."""
+    frame = sr * 30 // 1000
+    db = _frame_db(audio[lo:hi], frame)
+    if not len(db):
+        return hi
+    return lo + int(np.argmin(db)) * frame + frame // 2
+
+
+def segment_stream(
+    windows: Iterable[np.ndarray],
+    sr: int = SAMPLE_RATE,
+    max_chunk_s: float = 30.0,
+    overlap_s: float = 0.5,
+) -> Iterator[SpeechChunk]:
+    """
+    Group speech regions from a stream of windows into chunks of at most
+    `max_chunk_s`, cutting in pauses. A region longer than the limit is cut at
+    its quietest frame near the limit. Each chunk starts `overlap_s` early so a
+    word straddling a cut appears whole in one of the chunks.
+    Only about one chunk plus one window of audio is buffered at a time.
+    """
+    max_len = int(max_chunk_s * sr)
+    overlap = int(overlap_s * sr)
+    frame = sr * 30 // 1000
+    buf = np.zeros(0, dtype=np.float32)
+    buf_start = 0   # absolute sample index of buf[0]
+    floor = 0       # regions ending before this index were already emitted
+
+    def drain(final: bool) -> Iterator[SpeechChunk]:
+        nonlocal buf, buf_start, floor
+        while True:
+            regions = [(s, e) for s, e in speech_regions(buf, sr) if e > floor + frame]
+            if not regions:
+                # nothing but silence: keep only enough tail for the next overlap
+                drop = max(0, len(buf) - overlap)
+                buf_start += drop
+                buf = buf[drop:]
+                floor = max(0, floor - drop)
+                return
+
+            chunk_start = regions[0][0]
+            chunk_end = None
+            cut = None
+            forced = False
+            for s, e in regions:
+                if e - chunk_start > max_len:
+                    if chunk_end is None:
+                        # one very long region: forced cut in its quietest spot near the limit
+                        lo = chunk_start + max_len * 2 // 3
+                        cut = _quietest_point(buf, lo, chunk_start + max_len, sr)
+                        forced = True
+                    else:
+                        cut = chunk_end
+                    break
+                if not final and e >= len(buf) - frame:
+                    break   # region still open, wait for more audio
+                chunk_end = e
+            else:
+                # all regions closed: emit if final, or if no later region could join this chunk
+                if chunk_end is not None and (final or len(buf) - chunk_start > max_len):
+                    cut = chunk_end
+
+            if cut is None:
+                return
+
+            lead = max(0, chunk_start - overlap)
+            yield SpeechChunk(audio=buf[lead:cut], start=(buf_start + lead) / sr)
+
+            # keep `overlap` samples before the cut: after a forced cut the next
+            # chunk starts there, after a pause cut it is only lead-in silence
+            drop = max(0, cut - overlap)
+            buf_start += drop
+            buf = buf[drop:]
+            floor = 0 if forced else cut - drop
+
+    for window in windows:
+        buf = np.concatenate((buf, window))
+        yield from drain(final=False)
+    yield from drain(final=True)
+
+
+_WORD = re.compile(r"[^\w']+")
+
+
+def _norm(word: str) -> str:
+    return _WORD.sub("", word.lower())
+
+
+def _dedupe_overlap(prev_words: List[str], next_words: List[str], max_words: int = 8) -> List[str]:
+    """Drop the longest prefix of next_words that repeats the tail of prev_words."""
+    prev = [_norm(w) for w in prev_words[-max_words:]]
+    nxt = [_norm(w) for w in next_words[:max_words]]
+    for k in range(min(len(prev), len(nxt)), 0, -1):
+        if prev[-k:] == nxt[:k]:
+            return next_words[k:]
+    return next_words
+
+
+class TranscriptStitcher:
+    """
+    Incrementally merges (chunk.start, transcriber result) pairs, so a partial
+    transcript is available after every chunk. Only the start offsets are
+    needed, so callers do not have to keep chunk audio alive.
+    Segment timestamps are shifted to the original recording timeline; segments
+    that fall entirely inside the previous chunk's audio are dropped, and words
+    duplicated by the overlap are removed from the joined text.
+    """
+    def __init__(self):
+        self.words: List[str] = []
+        self.segments: List[Dict] = []
+        self._last_end = 0.0
+
+    def add(self, offset: float, result: Dict) -> None:
+        self.words.extend(_dedupe_overlap(self.words, result.get("text", "").split()))
+        for seg in result.get("segments", []):
+            seg = dict(seg, start=seg["start"] + offset, end=seg["end"] + offset)
+            if seg["end"] <= self._last_end:
+                continue
+            self.segments.append(seg)
+        if self.segments:
+            self._last_end = max(self._last_end, self.segments[-1]["end"])
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.words).strip()
+
+    def result(self) -> Dict:
+        return {"text": self.text, "segments": self.segments}
+
+
+def stitch_transcripts(parts: Iterable[Tuple[float, Dict]]) -> Dict:
+    """Merge (chunk.start, result) pairs into one {"text", "segments"} dict (see TranscriptStitcher)."""
+    stitcher = TranscriptStitcher()
+    for offset, result in parts:
+        stitcher.add(offset, result)
+    return stitcher.result()
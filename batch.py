@@ -0,0 +1,250 @@
+# batch.py
+"""
+Headless batch runner for many recordings.
+
+    python batch.py recordings/ --out outputs/batch --lang en
+    python batch.py manifest.csv --llm-workers 6 --notify
+
+INPUT is a directory of audio files, or a manifest: a .txt file with one path
+per line, or a .csv with a `path` column and optional `target_lang` and
+`custom_query` columns.
+
+Stages are pipelined across files: a decoder thread hashes, decodes and
+VAD-segments the next recordings while the current one is in ASR (bounded by a
+chunk queue), and the LLM/TTS stages of finished transcripts run on a thread
+pool while ASR moves on. Each file gets its own output directory; a
+batch_report.json with per-file timings and the overall throughput in
+audio-hours per wall-hour is written at the end.
+"""
+import argparse
+import csv
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import (
+    ASR_MODEL_ID, build_stage_graph, meeting_id_for, save_outputs, transcribe_stream, transcript_cache,
+)
+from agents.audio import file_digest, probe_duration, stream_audio
+from agents.cache import TranscriptCache
+from agents.vad import segment_stream
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".mp4", ".ogg", ".flac", ".webm", ".aac", ".wma", ".mkv"}
+
+# (kind, file index, payload) items; None ends the stream
+_END = None
+
+
+def load_items(source, default_lang):
+    """List of {"path", "target_lang", "custom_query"} from a directory or manifest."""
+    if os.path.isdir(source):
+        paths = sorted(
+            os.path.join(source, f) for f in os.listdir(source)
+            if os.path.splitext(f)[1].lower() in AUDIO_EXTENSIONS
+        )
+        return [{"path": p, "target_lang": default_lang, "custom_query": ""} for p in paths]
+
+    base = os.path.dirname(os.path.abspath(source))
+    items = []
+    with open(source, encoding="utf-8", newline="") as f:
+        if source.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = ({"path": line.strip()} for line in f if line.strip() and not line.startswith("#"))
+        for row in rows:
+            items.append({
+                "path": os.path.join(base, row["path"]),
+                "target_lang": row.get("target_lang") or default_lang,
+                "custom_query": row.get("custom_query") or "",
+            })
+    return items
+
+
+class QueueDesync(RuntimeError):
+    """The chunk queue no longer lines up with the files; the rest of the batch cannot be trusted."""
+
+
+def _decoder(items, chunk_queue):
+    """
+    Producer thread: fingerprint + cache lookup, then VAD chunks for every file
+    in order. A file is ("start", chunks..., "end"); a decode error inside it
+    sends ("error") before its "end", an error before "start" sends only ("error").
+    """
+    for idx, item in enumerate(items):
+        started = False
+        try:
+            digest = file_digest(item["path"])
+            key = TranscriptCache.make_key(digest, ASR_MODEL_ID)
+            # header probe; 0 when the container does not say (only the throughput figures use it)
+            duration = probe_duration(item["path"]) or 0.0
+            cached = transcript_cache.get().get(key)
+            chunk_queue.put(("start", idx, {"key": key, "digest": digest, "duration": duration, "cached": cached}))
+            started = True
+            if cached is None:
+                for chunk in segment_stream(stream_audio(item["path"], window_seconds=30)):
+                    chunk_queue.put(("chunk", idx, chunk))
+        except Exception as e:
+            chunk_queue.put(("error", idx, e))
+        if started:
+            chunk_queue.put(("end", idx, None))
+    chunk_queue.put(_END)
+
+
+class _FileChunks:
+    """Iterator over the chunks of file `idx` on the shared queue, up to its end marker."""
+
+    def __init__(self, chunk_queue, idx):
+        self.chunk_queue = chunk_queue
+        self.idx = idx
+        self.ended = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.ended:
+            raise StopIteration
+        msg = self.chunk_queue.get()
+        if msg is _END or msg[1] != self.idx:
+            raise QueueDesync(f"expected chunks of file {self.idx}, got {msg!r:.80}")
+        kind, _, payload = msg
+        if kind == "end":
+            self.ended = True
+            raise StopIteration
+        if kind == "error":
+            raise payload
+        return payload
+
+    def drain(self):
+        """Skip whatever is left of the file (nothing once its end marker was read)."""
+        while not self.ended:
+            try:
+                next(self, None)
+            except QueueDesync:
+                raise
+            except Exception:
+                # the file's decode error; its end marker follows
+                pass
+
+
+def transcribe_from_queue(chunk_queue, idx, start, audio_path):
+    """ASR for one file whose chunks arrive on the queue; returns the transcriber result dict."""
+    chunks = _FileChunks(chunk_queue, idx)
+    try:
+        if start["cached"] is not None:
+            return dict(start["cached"], cached=True)
+        for event, value in transcribe_stream(audio_path, chunks, start["key"]):
+            if event == "done":
+                return value
+    finally:
+        # an ASR or decode error leaves the file's remaining chunks on the queue
+        chunks.drain()
+
+
+def finish_file(item, result, out_dir, notify, meeting_id):
+    """LLM/TTS stages for one transcript (runs on the LLM thread pool); returns its report row."""
+    t0 = time.perf_counter()
+    graph = build_stage_graph(result["text"], result.get("segments", []), item["target_lang"],
+                              item["custom_query"], "", meeting_id, out_dir=out_dir, notify=notify,
+                              title=os.path.basename(item["path"]))
+    results = graph.run()
+    save_outputs(out_dir, result["text"], results["share_text"])
+    with open(os.path.join(out_dir, "analysis.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "language": result["language"], "segments": result.get("segments", []),
+            "analysis": results["analysis"], "auto_insight": results["auto_insight"],
+            "chat": results["chat"], "tts": results["tts"],
+        }, f, ensure_ascii=False, indent=2, default=str)
+    return {"llm_s": time.perf_counter() - t0, "stage_errors": {k: str(v) for k, v in graph.errors.items()}}
+
+
+def run_batch(items, out_root, llm_workers=4, notify=False, prefetch_chunks=32):
+    os.makedirs(out_root, exist_ok=True)
+    chunk_queue = queue.Queue(maxsize=prefetch_chunks)
+    threading.Thread(target=_decoder, args=(items, chunk_queue), daemon=True).start()
+
+    report = []
+    futures = []
+    wall0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=llm_workers) as llm_pool:
+        while True:
+            msg = chunk_queue.get()
+            if msg is _END:
+                break
+            kind, idx, payload = msg
+            item = items[idx]
+            row = {"path": item["path"], "status": "ok"}
+            report.append(row)
+            if kind == "error":
+                row.update(status="error", error=f"decode: {payload}")
+                print(f"❌ {item['path']}: {payload}")
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                result = transcribe_from_queue(chunk_queue, idx, payload, item["path"])
+            except QueueDesync:
+                raise
+            except Exception as e:
+                row.update(status="error", error=f"transcription: {e}")
+                print(f"❌ {item['path']}: {e}")
+                continue
+            row.update(audio_s=payload["duration"], asr_s=time.perf_counter() - t0,
+                       cached=result["cached"], language=result["language"])
+            print(f"🎙️ [{idx + 1}/{len(items)}] {os.path.basename(item['path'])}: "
+                  f"{payload['duration'] / 60:.1f} min in {row['asr_s']:.1f}s"
+                  + (" (cached)" if result["cached"] else ""))
+            if not result["text"]:
+                row.update(status="empty")
+                continue
+
+            stem = os.path.splitext(os.path.basename(item["path"]))[0]
+            out_dir = os.path.join(out_root, f"{idx:04d}_{stem}")
+            futures.append((row, llm_pool.submit(finish_file, item, result, out_dir, notify,
+                                                       meeting_id_for(payload["digest"]))))
+            row["out_dir"] = out_dir
+
+        for row, fut in futures:
+            try:
+                row.update(fut.result())
+            except Exception as e:
+                row.update(status="error", error=f"llm: {e}")
+
+    wall_s = time.perf_counter() - wall0
+    audio_s = sum(r.get("audio_s", 0.0) for r in report)
+    summary = {
+        "files": len(items),
+        "ok": sum(r["status"] == "ok" for r in report),
+        "audio_hours": audio_s / 3600,
+        "wall_hours": wall_s / 3600,
+        "audio_hours_per_wall_hour": audio_s / wall_s if wall_s else 0.0,
+    }
+    with open(os.path.join(out_root, "batch_report.json"), "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "files": report}, f, indent=2)
+    return summary
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Process many meeting recordings without the UI.")
+    ap.add_argument("input", help="directory of recordings, or a .txt/.csv manifest")
+    ap.add_argument("--out", default="outputs/batch", help="output root (one sub-directory per file)")
+    ap.add_argument("--lang", default=os.getenv("DEFAULT_TARGET_LANG", "en"), help="default target language")
+    ap.add_argument("--llm-workers", type=int, default=4, help="concurrent LLM/TTS pipelines")
+    ap.add_argument("--prefetch-chunks", type=int, default=32, help="decoded chunks buffered ahead of ASR")
+    ap.add_argument("--notify", action="store_true", help="also send Slack/email for every file")
+    args = ap.parse_args()
+
+    items = load_items(args.input, args.lang)
+    if not items:
+        raise SystemExit(f"No recordings found in {args.input}")
+    summary = run_batch(items, args.out, llm_workers=args.llm_workers, notify=args.notify,
+                        prefetch_chunks=args.prefetch_chunks)
+    print(f"✅ {summary['ok']}/{summary['files']} files, {summary['audio_hours']:.2f} audio-hours in "
+          f"{summary['wall_hours'] * 60:.1f} min -> {summary['audio_hours_per_wall_hour']:.1f} audio-hours/wall-hour")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+ASR backend comparison: word error rate and speed.
+
+    python -m benchmarks.bench_asr data/ --model base --backends whisper whisper-int8 --threads 8
+    python -m benchmarks.bench_asr --minutes 5          # synthetic audio, drift only
+
+`data/` holds recordings with reference transcripts next to them
+(meeting1.wav + meeting1.txt). Every recording is decoded and VAD-chunked once;
+then each backend transcribes the same chunks through
+TranscriberAgent.transcribe_chunks (the pipeline's path), so the timings
+cover ASR only. Reported per backend: load time, ASR seconds, real-time
+factor, speedup over the first backend, corpus WER against the references
+(when present), and WER against the first backend's output ("drift"), which
+isolates what quantisation changes. Results are saved as JSON.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import time
+from datetime import datetime
+
+import numpy as np
+
+from agents.audio import SAMPLE_RATE, stream_audio
+from agents.vad import TranscriptStitcher, segment_stream
+from benchmarks.synthetic import synthetic_speech, write_wav
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".mp4", ".ogg", ".flac", ".webm"}
+
+
+def normalize(text: str) -> list:
+    """Lower-case words without punctuation, for WER."""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def edit_distance(ref: list, hyp: list) -> int:
+    """Word-level Levenshtein distance (one numpy row per reference word)."""
+    if not ref or not hyp:
+        return max(len(ref), len(hyp))
+    vocab = {w: i for i, w in enumerate(set(ref) | set(hyp))}
+    hyp_ids = np.array([vocab[w] for w in hyp])
+    steps = np.arange(len(hyp) + 1)
+    prev = steps.copy()
+    for i, word in enumerate(ref, 1):
+        cand = np.empty_like(prev)
+        cand[0] = i
+        # substitution/match and deletion
+        cand[1:] = np.minimum(prev[:-1] + (hyp_ids != vocab[word]), prev[1:] + 1)
+        # insertions: cur[j] = min over k <= j of cand[k] + (j - k)
+        prev = np.minimum.accumulate(cand - steps) + steps
+    return int(prev[-1])
+
+
+def wer(refs: list, hyps: list) -> float:
+    """Corpus WER: total word edits over total reference words."""
+    edits = words = 0
+    for ref, hyp in zip(refs, hyps):
+        r, h = normalize(ref), normalize(hyp)
+        edits += edit_distance(r, h)
+        words += len(r)
+    return edits / words if words else 0.0
+
+
+def load_dataset(args, workdir: str):
+    """[(name, chunks, audio seconds, reference text or None)], decoded and VAD-chunked once."""
+    if args.data:
+        paths = sorted(os.path.join(args.data, f) for f in os.listdir(args.data)
+                       if os.path.splitext(f)[1].lower() in AUDIO_EXTENSIONS)
+    else:
+        os.makedirs(workdir, exist_ok=True)
+        paths = [write_wav(os.path.join(workdir, f"synthetic_{i}.wav"), synthetic_speech(args.minutes * 60, seed=i))
+                 for i in range(args.files)]
+    items = []
+    for path in paths:
+        chunks = list(segment_stream(stream_audio(path, window_seconds=30)))
+        samples = sum(len(w) for w in stream_audio(path, window_seconds=60))
+        ref_path = os.path.splitext(path)[0] + ".txt"
+        ref = open(ref_path, encoding="utf-8").read() if os.path.exists(ref_path) else None
+        items.append((os.path.basename(path), chunks, samples / SAMPLE_RATE, ref))
+    return items
+
+
+def run_backend(backend: str, args, items):
+    from agents.transcriber import TranscriberAgent
+
+    t0 = time.perf_counter()
+    agent = TranscriberAgent(model_name=args.model, backend=backend, threads=args.threads)
+    load_s = time.perf_counter() - t0
+    agent.transcribe_batch([np.zeros(SAMPLE_RATE, dtype=np.float32)], language=args.language)  # warm-up
+
+    texts, asr_s = [], 0.0
+    for _, chunks, _, _ in items:
+        t0 = time.perf_counter()
+        stitcher = TranscriptStitcher()
+        for offset, part in agent.transcribe_chunks(chunks, language=args.language, batch_size=args.batch_size):
+            stitcher.add(offset, part)
+        asr_s += time.perf_counter() - t0
+        texts.append(stitcher.text)
+    return {"backend": backend, "load_s": load_s, "asr_s": asr_s}, texts
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare ASR backends on WER and speed.")
+    ap.add_argument("data", nargs="?", help="directory of recordings with same-name .txt references")
+    ap.add_argument("--model", default=os.getenv("WHISPER_MODEL", "base"))
+    ap.add_argument("--backends", nargs="+", default=["whisper", "whisper-int8"])
+    ap.add_argument("--threads", type=int, default=None, help="torch threads (default ASR_THREADS / torch default)")
+    ap.add_argument("--batch-size", type=int, default=8)
+    ap.add_argument("--language", default="en")
+    ap.add_argument("--minutes", type=float, default=2, help="length of each synthetic recording")
+    ap.add_argument("--files", type=int, default=2, help="number of synthetic recordings")
+    ap.add_argument("--out", default=None, help="JSON results path (default outputs/benchmarks/asr_<time>.json)")
+    args = ap.parse_args()
+
+    items = load_dataset(args, os.path.join("outputs", "benchmarks", "asr_audio"))
+    audio_s = sum(a for _, _, a, _ in items)
+    refs = [r for _, _, _, r in items]
+    print(f"{len(items)} recordings, {audio_s / 60:.1f} min of audio, model={args.model}")
+
+    rows, baseline = [], None
+    for backend in args.backends:
+        row, texts = run_backend(backend, args, items)
+        baseline = baseline or (row, texts)
+        row["rtf"] = row["asr_s"] / audio_s
+        row["speedup"] = baseline[0]["asr_s"] / row["asr_s"]
+        scored = [(r, t) for r, t in zip(refs, texts) if r is not None]
+        row["wer"] = wer(*zip(*scored)) if scored else None
+        row["drift_wer"] = wer(baseline[1], texts)
+        rows.append(row)
+
+    print(f"{'backend':14s} {'load':>7s} {'asr':>8s} {'RTF':>7s} {'speedup':>8s} {'WER':>7s} {'drift':>7s}")
+    for r in rows:
+        wer_s = f"{r['wer'] * 100:6.1f}%" if r["wer"] is not None else "    n/a"
+        print(f"{r['backend']:14s} {r['load_s']:6.1f}s {r['asr_s']:7.1f}s {r['rtf']:7.3f} "
+              f"{r['speedup']:7.2f}x {wer_s} {r['drift_wer'] * 100:6.1f}%")
+
+    out = args.out or os.path.join("outputs", "benchmarks", f"asr_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "model": args.model,
+                     "threads": args.threads, "batch_size": args.batch_size, "audio_s": audio_s,
+                     "files": len(items), "platform": platform.platform(), "cpu_count": os.cpu_count()},
+            "backends": rows,
+        }, f, indent=2)
+    print(f"\nresults: {out}")
+
+
+if __name__ == "__main__":
+    main()
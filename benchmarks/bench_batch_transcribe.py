@@ -0,0 +1,53 @@
+"""
+Compare the per-chunk transcribe() loop with transcribe_batch().
+
+    python -m benchmarks.bench_batch_transcribe [audio_file] --model base --chunks 8
+
+Without an audio file, synthetic speech-like audio (amplitude-modulated
+harmonics) is used; it is enough to exercise the encoder/decoder cost.
+"""
+import argparse
+import time
+
+from agents.audio import SAMPLE_RATE, decode_audio
+from agents.transcriber import TranscriberAgent
+from benchmarks.synthetic import synthetic_chunk
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("audio", nargs="?")
+    ap.add_argument("--model", default="base")
+    ap.add_argument("--chunks", type=int, default=8)
+    ap.add_argument("--batch-size", type=int, default=8)
+    ap.add_argument("--language", default="en")
+    args = ap.parse_args()
+
+    if args.audio:
+        audio = decode_audio(args.audio)
+        step = 30 * SAMPLE_RATE
+        chunks = [audio[i:i + step] for i in range(0, len(audio), step)][:args.chunks]
+    else:
+        chunks = [synthetic_chunk(30, i) for i in range(args.chunks)]
+    audio_s = sum(len(c) for c in chunks) / SAMPLE_RATE
+
+    agent = TranscriberAgent(model_name=args.model)
+    agent.transcribe_batch(chunks[:1], language=args.language)  # warm-up
+
+    t0 = time.perf_counter()
+    for c in chunks:
+        agent.transcribe(c, language=args.language)
+    loop_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    agent.transcribe_batch(chunks, language=args.language, batch_size=args.batch_size)
+    batch_s = time.perf_counter() - t0
+
+    print(f"audio: {audio_s:.0f}s in {len(chunks)} chunks, model={args.model}")
+    print(f"sequential loop : {loop_s:7.2f}s  (RTF {loop_s / audio_s:.3f})")
+    print(f"batched (bs={args.batch_size}) : {batch_s:7.2f}s  (RTF {batch_s / audio_s:.3f})")
+    print(f"speedup         : {loop_s / batch_s:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Offline end-to-end pipeline benchmark.
+
+    python -m benchmarks.bench_pipeline --minutes 1 5 15 --model base
+    python -m benchmarks.bench_pipeline --minutes 5 --compare outputs/benchmarks/pipeline_<before>.json
+
+Synthetic speech-like recordings of each length are run through the real
+decode -> VAD -> Whisper path, then through the post-transcription stage graph
+with every external service replaced by a local stand-in: the "stub" LLM
+provider (LLMNLP and get_gemini_response, with LLM_STUB_LATENCY_MS of simulated
+latency), the local TTS backend instead of gTTS, and in-process SMTP and
+webhook servers for email and Slack. Reported per recording: decode/VAD time,
+transcription time and Whisper real-time factor, latency of every stage,
+notification delivery time, end-to-end throughput (audio-hours per wall-hour)
+and peak memory. Python allocations are traced in a separate, untimed pass
+over the transcription path, so tracemalloc's overhead stays out of the
+timings. Results are written as JSON; --compare prints the change against an
+earlier run.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.stubs import start_stub_services
+from benchmarks.synthetic import synthetic_speech, synthetic_transcript, write_wav
+from telemetry import peak_rss_bytes
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def configure_environment(args, workdir: str):
+    """Point every external dependency at a local stand-in. Must run before importing pipeline."""
+    smtp, webhook, env = start_stub_services()
+    env.update({
+        "LLM_PROVIDER": "stub",
+        "LLM_STUB_LATENCY_MS": str(args.llm_latency_ms),
+        "TTS_BACKEND": "local",
+        "LOCAL_TTS_LATENCY_MS": str(args.tts_latency_ms),
+        "WHISPER_MODEL": args.model,
+        "ASR_BACKEND": args.backend,
+        # fresh caches so every run measures real work
+        "TRANSCRIPT_CACHE_DIR": os.path.join(workdir, "cache", "transcripts"),
+        "LLM_CACHE_DIR": os.path.join(workdir, "cache", "llm"),
+        "OUTBOX_DB": os.path.join(workdir, "outbox.sqlite3"),
+        "ARCHIVE_DB": os.path.join(workdir, "archive.sqlite3"),
+    })
+    os.environ.update(env)
+    return smtp, webhook
+
+
+def bench_one(pipeline, path: str, audio_s: float, seed: int, out_dir: str) -> dict:
+    from agents.audio import file_digest, stream_audio
+    from agents.vad import segment_stream
+
+    row = {"audio_s": audio_s}
+
+    # decode + VAD on their own (the transcription below repeats them, overlapped with ASR);
+    # a diagnostic pass the real pipeline never makes, so it is left out of end_to_end_s
+    t0 = time.perf_counter()
+    chunks = speech_s = 0
+    for chunk in segment_stream(stream_audio(path, window_seconds=30)):
+        chunks += 1
+        speech_s += chunk.duration
+    row["decode_vad_s"] = time.perf_counter() - t0
+    row["chunks"], row["speech_s"] = chunks, speech_s
+
+    t_start = t0 = time.perf_counter()
+    first_partial = None
+    result = None
+    for event, value in pipeline.iter_transcription(path):
+        if event == "partial" and first_partial is None:
+            first_partial = time.perf_counter() - t0
+        elif event == "done":
+            result = value
+    row["transcription_s"] = time.perf_counter() - t0
+    row["first_partial_s"] = first_partial
+    row["whisper_rtf"] = row["transcription_s"] / audio_s
+    row["language"] = result["language"]
+
+    # Whisper output on synthetic tones is short or empty; give the text stages a realistic load
+    transcript, segments = result["text"], result["segments"]
+    expected_words = audio_s / 60 * 150
+    row["transcript_source"] = "asr"
+    if len(transcript.split()) < 0.25 * expected_words:
+        transcript, segments = synthetic_transcript(audio_s, seed), []
+        row["transcript_source"] = "synthetic"
+    row["transcript_chars"] = len(transcript)
+    meeting_id = pipeline.meeting_id_for(file_digest(path))
+
+    t0 = time.perf_counter()
+    graph = pipeline.build_stage_graph(transcript, segments, "en", "What are the action items?", "", meeting_id,
+                                       out_dir=out_dir, notify=True)
+    graph.run()
+    row["stages_s"] = time.perf_counter() - t0
+    row["stage_latency_s"] = dict(graph.timings)
+    row["stage_errors"] = {name: str(e) for name, e in graph.errors.items()}
+
+    t0 = time.perf_counter()
+    while pipeline.outbox.get().pending():
+        time.sleep(0.01)
+    row["notify_delivery_s"] = time.perf_counter() - t0
+
+    row["end_to_end_s"] = time.perf_counter() - t_start
+    row["audio_hours_per_wall_hour"] = audio_s / row["end_to_end_s"]
+    row["peak_python_mb"] = peak_python_mb(pipeline, path)
+    rss = peak_rss_bytes()
+    row["max_rss_mb"] = rss / (1024 * 1024) if rss else float("nan")
+    return row
+
+
+def peak_python_mb(pipeline, path: str) -> float:
+    """
+    Peak traced Python memory of decode -> VAD -> ASR for one recording, run
+    again without the transcript cache (the timed run just filled it).
+    """
+    from agents.audio import stream_audio
+    from agents.vad import segment_stream
+
+    tracemalloc.start()
+    try:
+        for _ in pipeline.transcribe_stream(path, segment_stream(stream_audio(path, window_seconds=30))):
+            pass
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def compare(old: dict, new: dict) -> None:
+    metrics = ("decode_vad_s", "transcription_s", "whisper_rtf", "stages_s", "end_to_end_s",
+               "audio_hours_per_wall_hour", "peak_python_mb", "max_rss_mb")
+    old_runs = {r["minutes"]: r for r in old["runs"]}
+    print(f"\nvs {old['meta']['revision']} ({old['meta']['timestamp']}):")
+    for run in new["runs"]:
+        before = old_runs.get(run["minutes"])
+        if before is None:
+            continue
+        print(f"  {run['minutes']:g} min")
+        for m in metrics:
+            a, b = before.get(m), run.get(m)
+            if a is None or b is None:
+                continue
+            change = f"{(b - a) / a * 100:+6.1f}%" if a else "   n/a"
+            print(f"    {m:26s} {a:10.3f} -> {b:10.3f}  {change}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark.")
+    ap.add_argument("--minutes", type=float, nargs="+", default=[1, 5], help="recording lengths to test")
+    ap.add_argument("--model", default=os.getenv("WHISPER_MODEL", "base"))
+    ap.add_argument("--backend", default=os.getenv("ASR_BACKEND", "whisper"), help="ASR engine (agents/asr.py)")
+    ap.add_argument("--repeat", type=int, default=1, help="runs per length (results are averaged)")
+    ap.add_argument("--llm-latency-ms", type=float, default=400, help="simulated latency per LLM call")
+    ap.add_argument("--tts-latency-ms", type=float, default=50, help="simulated latency per TTS sentence")
+    ap.add_argument("--out", default=None, help="JSON results path (default outputs/benchmarks/pipeline_<time>.json)")
+    ap.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    smtp, webhook = configure_environment(args, workdir)
+
+    t0 = time.perf_counter()
+    import pipeline
+    startup_s = time.perf_counter() - t0
+
+    # warm-up: first-call costs (model weights paging in, thread pools) stay out of the numbers
+    warm = write_wav(os.path.join(workdir, "warmup.wav"), synthetic_speech(10, seed=999))
+    pipeline.transcribe_recording(warm)
+
+    runs = []
+    for minutes in args.minutes:
+        audio_s = minutes * 60
+        samples = []
+        for rep in range(args.repeat):
+            seed = int(minutes * 1000) + rep
+            path = write_wav(os.path.join(workdir, f"meeting_{minutes:g}min_{rep}.wav"),
+                             synthetic_speech(audio_s, seed=seed))
+            samples.append(bench_one(pipeline, path, audio_s, seed, os.path.join(workdir, f"out_{seed}")))
+            os.remove(path)
+        run = dict(samples[-1], minutes=minutes, repeat=args.repeat)
+        for key, value in samples[-1].items():
+            if isinstance(value, float) and key != "max_rss_mb":
+                run[key] = sum(s[key] for s in samples if s[key] is not None) / len(samples)
+        run["stage_latency_s"] = {
+            name: sum(s["stage_latency_s"].get(name, 0.0) for s in samples) / len(samples)
+            for name in samples[-1]["stage_latency_s"]
+        }
+        runs.append(run)
+        print(f"{minutes:g} min: transcription {run['transcription_s']:.1f}s (RTF {run['whisper_rtf']:.3f}), "
+              f"stages {run['stages_s']:.1f}s, end-to-end {run['end_to_end_s']:.1f}s "
+              f"({run['audio_hours_per_wall_hour']:.1f} audio-h/wall-h), peak RSS {run['max_rss_mb']:.0f} MB")
+        for name, seconds in sorted(run["stage_latency_s"].items(), key=lambda kv: -kv[1]):
+            print(f"    {name:14s} {seconds:7.2f}s")
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "model": args.model,
+            "backend": args.backend,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "startup_s": startup_s,
+            "llm_latency_ms": args.llm_latency_ms,
+            "tts_latency_ms": args.tts_latency_ms,
+            "emails_delivered": smtp.messages,
+            "slack_delivered": webhook.messages,
+        },
+        "runs": runs,
+    }
+    out = args.out or os.path.join("outputs", "benchmarks",
+                                   f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nresults: {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
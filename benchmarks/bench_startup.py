@@ -0,0 +1,129 @@
+"""
+Cold-start benchmark: how long until the app can serve, and until it is warm.
+
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --compare outputs/benchmarks/startup_<before>.json
+
+Each measurement runs in a fresh interpreter (no warm module cache in
+sys.modules) with the stub LLM provider and throw-away state directories:
+
+- import_pipeline: `import pipeline` (agents are lazy, so no model load)
+- import_main:     `import main`, i.e. the Gradio UI is built and jobs can be queued
+- warm:            import + warm_up() (Whisper loaded, one dummy inference)
+
+Medians over --runs are printed together with the slowest modules imported
+by pipeline (python -X importtime), and saved as JSON.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+SCENARIOS = {
+    "import_pipeline": "import pipeline",
+    "import_main": "import main",
+    "warm": "import pipeline; pipeline.warm_up()",
+}
+
+
+def _env(workdir: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "LLM_PROVIDER": "stub",
+        "TRANSCRIPT_CACHE_DIR": os.path.join(workdir, "transcripts"),
+        "LLM_CACHE_DIR": os.path.join(workdir, "llm"),
+        "OUTBOX_DB": os.path.join(workdir, "outbox.sqlite3"),
+        "ARCHIVE_DB": os.path.join(workdir, "archive.sqlite3"),
+        "JOBS_DB": os.path.join(workdir, "jobs.sqlite3"),
+        "JOBS_DIR": os.path.join(workdir, "jobs"),
+    })
+    return env
+
+
+def time_scenario(code: str, env: dict):
+    """Wall time of a fresh interpreter running `code`, or None if it failed."""
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - t0
+    if proc.returncode != 0:
+        return None, proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"
+    return elapsed, None
+
+
+def slowest_imports(env: dict, top: int = 10):
+    """(cumulative seconds, module) for the slowest modules imported directly by pipeline."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import pipeline"],
+                          env=env, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - 1 - len(name.lstrip())) // 2  # two spaces per nesting level
+        if depth == 1:
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cold-start benchmark.")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    ap.add_argument("--out", default=None, help="JSON results path (default outputs/benchmarks/startup_<time>.json)")
+    ap.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    env = _env(workdir)
+    results = {}
+    for name in args.scenarios:
+        times, error = [], None
+        for _ in range(args.runs):
+            elapsed, error = time_scenario(SCENARIOS[name], env)
+            if elapsed is None:
+                break
+            times.append(elapsed)
+        if times:
+            results[name] = {"median_s": statistics.median(times), "min_s": min(times), "runs": times}
+            print(f"{name:16s} median {results[name]['median_s']:6.2f}s  (min {min(times):.2f}s)")
+        else:
+            results[name] = {"error": error}
+            print(f"{name:16s} failed: {error}")
+
+    imports = slowest_imports(env)
+    print("\nslowest imports of pipeline:")
+    for seconds, module in imports:
+        print(f"  {seconds:6.3f}s  {module}")
+
+    report = {
+        "meta": {"timestamp": datetime.now().isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "platform": platform.platform()},
+        "scenarios": results,
+        "slowest_imports": [{"module": m, "seconds": s} for s, m in imports],
+    }
+    out = args.out or os.path.join("outputs", "benchmarks",
+                                   f"startup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults: {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            before = json.load(f)["scenarios"]
+        print(f"\nvs {args.compare}:")
+        for name, now in results.items():
+            old = before.get(name, {})
+            if "median_s" in now and "median_s" in old:
+                change = (now["median_s"] - old["median_s"]) / old["median_s"] * 100
+                print(f"  {name:16s} {old['median_s']:6.2f}s -> {now['median_s']:6.2f}s  {change:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
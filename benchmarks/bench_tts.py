@@ -0,0 +1,42 @@
+"""
+Offline TTS benchmark with the local synthesiser (no network).
+
+    LOCAL_TTS_LATENCY_MS=150 python -m benchmarks.bench_tts --sentences 40 --workers 4
+
+Compares sequential synthesis, the parallel stage, and a warm sentence cache.
+"""
+import argparse
+import os
+import time
+
+from agents.tts import LocalToneBackend, SentenceCache, synthesize
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sentences", type=int, default=40)
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+    os.environ.setdefault("LOCAL_TTS_LATENCY_MS", "150")
+
+    text = " ".join(f"Action item {i} is assigned to the platform team for next sprint." for i in range(args.sentences))
+    backend = LocalToneBackend()
+
+    def timed(**kwargs):
+        t0 = time.perf_counter()
+        synthesize(text, backend=backend, **kwargs)
+        return time.perf_counter() - t0
+
+    sequential = timed(max_workers=1, cache=SentenceCache())
+    warm = SentenceCache()
+    parallel = timed(max_workers=args.workers, cache=warm)
+    cached = timed(max_workers=args.workers, cache=warm)
+
+    print(f"{args.sentences} sentences, {os.environ['LOCAL_TTS_LATENCY_MS']} ms simulated latency each")
+    print(f"sequential          : {sequential:6.2f}s")
+    print(f"parallel (x{args.workers})      : {parallel:6.2f}s  ({sequential / parallel:.1f}x)")
+    print(f"parallel, warm cache: {cached:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
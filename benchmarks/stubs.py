@@ -0,0 +1,82 @@
+"""
+Local stand-ins for the notification endpoints used by the benchmarks:
+a minimal SMTP server and a Slack-style webhook, both on 127.0.0.1.
+"""
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib; counts delivered messages."""
+
+    def handle(self):
+        self.wfile.write(b"220 localhost bench SMTP\r\n")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            cmd = line.decode().strip().upper()
+            if cmd.startswith(("EHLO", "HELO")):
+                self.wfile.write(b"250 localhost\r\n")
+            elif cmd == "DATA":
+                self.wfile.write(b"354 end with .\r\n")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.server.messages += 1
+                self.wfile.write(b"250 queued\r\n")
+            elif cmd == "QUIT":
+                self.wfile.write(b"221 bye\r\n")
+                return
+            else:  # MAIL, RCPT, NOOP, RSET
+                self.wfile.write(b"250 ok\r\n")
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.messages = 0
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.messages += 1
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class WebhookStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _WebhookHandler)
+        self.messages = 0
+
+
+def start_stub_services():
+    """
+    Start both stubs on background threads. Returns (smtp, webhook, env) where
+    env points the app's SMTP/Slack settings at them; set it before importing
+    pipeline, which reads the configuration at import time.
+    """
+    smtp, webhook = SMTPStub(), WebhookStub()
+    for srv in (smtp, webhook):
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+    env = {
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp.server_address[1]),
+        "SMTP_SSL": "false",
+        "SMTP_SENDER_EMAIL": "bench@localhost",
+        "SMTP_APP_PASSWORD": "",
+        "EMAIL_RECIPIENTS": "team@localhost",
+        "SLACK_WEBHOOK_URL": f"http://127.0.0.1:{webhook.server_address[1]}/hook",
+    }
+    return smtp, webhook, env
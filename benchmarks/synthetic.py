@@ -0,0 +1,60 @@
+"""
+Synthetic, speech-like test audio for the benchmarks (no recordings needed).
+
+Voiced stretches are amplitude-modulated harmonics with a wandering pitch,
+separated by short pauses, so decoding, VAD chunking and the Whisper encoder
+see a realistic workload. Transcripts of matching length are generated for
+the text stages, since Whisper has nothing meaningful to say about tones.
+"""
+import wave
+
+import numpy as np
+
+from agents.audio import SAMPLE_RATE
+
+WORDS_PER_MINUTE = 150
+_VOCAB = (
+    "we need to ship the release before friday and the platform team owns the migration "
+    "budget review is next week please send the numbers risks include the vendor delay "
+    "action item alice updates the roadmap decision we keep the current pricing"
+).split()
+
+
+def synthetic_chunk(seconds: float, seed: int) -> np.ndarray:
+    """`seconds` of continuous voiced audio."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = 120 + 40 * np.sin(2 * np.pi * 0.3 * t)
+    voice = sum(np.sin(2 * np.pi * k * f0 * t) / k for k in range(1, 6))
+    syllables = (np.sin(2 * np.pi * 4 * t) > 0).astype(np.float32)
+    return (0.1 * voice * syllables + 0.005 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def synthetic_speech(seconds: float, seed: int = 0) -> np.ndarray:
+    """`seconds` of utterances (2-12 s) separated by pauses (0.3-1.5 s)."""
+    rng = np.random.default_rng(seed)
+    out = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    pos = 0
+    while pos < len(out):
+        n = min(int(rng.uniform(2, 12) * SAMPLE_RATE), len(out) - pos)
+        out[pos:pos + n] = synthetic_chunk(n / SAMPLE_RATE, seed + pos)[:n]
+        pos += n + int(rng.uniform(0.3, 1.5) * SAMPLE_RATE)
+    return out
+
+
+def write_wav(path: str, audio: np.ndarray, sr: int = SAMPLE_RATE) -> str:
+    """Write float32 audio in [-1, 1] as 16-bit mono WAV."""
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes((np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes())
+    return path
+
+
+def synthetic_transcript(seconds: float, seed: int = 0) -> str:
+    """About WORDS_PER_MINUTE words per minute of meeting-like text, in sentences."""
+    rng = np.random.default_rng(seed)
+    words = rng.choice(_VOCAB, size=max(1, int(seconds / 60 * WORDS_PER_MINUTE)))
+    sentences = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+    return " ".join(s.capitalize() + "." for s in sentences)
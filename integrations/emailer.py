@@ -1,34 +1,108 @@
+import logging
 import os
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
 SENDER = os.getenv("SMTP_SENDER_EMAIL")
 APP_PASSWORD = os.getenv("SMTP_APP_PASSWORD")
 RECIPIENTS = [e.strip() for e in os.getenv("EMAIL_RECIPIENTS", "").split(",") if e.strip()]
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_SSL = os.getenv("SMTP_SSL", "true").lower() in ("1", "true", "yes")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "20"))
+
+
+def build_message(subject: str, body: str, recipients: list[str], sender: str = None) -> MIMEText:
+    msg = MIMEText(body, "plain", "utf-8")
+    msg["Subject"] = subject
+    msg["From"] = sender or SENDER
+    msg["To"] = ", ".join(recipients)
+    return msg
+
+
+class SMTPConnection:
+    """
+    A persistent, logged-in SMTP connection that is reused across messages.
+    It is checked with NOOP after being idle and transparently reopened if the
+    server dropped it. Not thread-safe on its own; callers hold `lock`.
+    """
+    def __init__(self, host: str = None, port: int = None, use_ssl: bool = None,
+                 sender: str = None, password: str = None, idle_check: float = 30.0):
+        self.host = host or SMTP_HOST
+        self.port = port or SMTP_PORT
+        self.use_ssl = SMTP_SSL if use_ssl is None else use_ssl
+        self.sender = sender or SENDER
+        self.password = APP_PASSWORD if password is None else password
+        self.idle_check = idle_check
+        self.lock = threading.Lock()
+        self.connects = 0
+        self._smtp = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        cls = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        smtp = cls(self.host, self.port, timeout=SMTP_TIMEOUT)
+        if self.password:
+            smtp.login(self.sender, self.password)
+        self.connects += 1
+        return smtp
+
+    def _ensure(self):
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_check:
+            try:
+                if self._smtp.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def send(self, msg: MIMEText, recipients: list[str]) -> None:
+        """Send one message, reconnecting once if the server closed the connection."""
+        try:
+            self._ensure().sendmail(self.sender, recipients, msg.as_string())
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._ensure().sendmail(self.sender, recipients, msg.as_string())
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+
+# shared connection for direct send_email() calls
+_connection = SMTPConnection()
+
 
 def send_email(subject: str, body: str, recipients: list[str] = None):
     if not (SENDER and APP_PASSWORD):
-        print("❌ Email not configured: missing sender or password")
+        log.error("Email not configured: missing sender or password")
         return  
 
     recipients = recipients or RECIPIENTS
     if not recipients:
-        print("❌ No recipients defined")
+        log.error("No recipients defined")
         return  
 
-    msg = MIMEText(body, "plain", "utf-8")
-    msg["Subject"] = subject
-    msg["From"] = SENDER
-    msg["To"] = ", ".join(recipients)
+    msg = build_message(subject, body, recipients)
 
     try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            smtp.login(SENDER, APP_PASSWORD)
-            smtp.sendmail(SENDER, recipients, msg.as_string())
-        print(f"✅ Email sent to {recipients}")
+        with _connection.lock:
+            _connection.send(msg, recipients)
+        log.info("Email sent to %s", recipients)
     except Exception as e:
-        print("❌ Email sending error:", e)
+        log.error("Email sending error: %s", e)
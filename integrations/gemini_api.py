@@ -1,13 +1,22 @@
-import os
-import google.generativeai as genai
+import logging
+
+from integrations.llm_client import default_provider, generate
+from telemetry import count
+
+log = logging.getLogger(__name__)
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
 
 def get_gemini_response(prompt: str) -> str:
-    api_key = os.getenv("GEMINI_API_KEY")
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-2.5-flash")
+    # the configured provider (LLM_PROVIDER, else the first one with an API key) through the shared
+    # client + response cache + router (timeouts, retries, failover to LLM_PROVIDERS);
+    # LLM_PROVIDER=stub answers locally for offline runs
+    provider = "unconfigured"
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        provider = default_provider()
+        return generate(prompt, provider=provider, model=GEMINI_MODEL if provider == "gemini" else None)
     except Exception as e:
-        print("⚠️ Gemini API error:", e)
+        count("llm_errors_total", provider=provider)
+        log.warning("Gemini API error: %s", e)
         return "(Gemini API failed)"
@@ -0,0 +1,309 @@
+"""
+Shared LLM client layer.
+
+- One long-lived client per provider/model (genai.configure runs once, the
+  OpenAI client is reused) instead of rebuilding them on every call.
+- A memoising response cache keyed by sha256(provider, model, system, prompt),
+  kept in memory (LRU) and on disk, with TTL and size limits.
+- A "stub" provider that answers locally, so the whole pipeline can run and be
+  tested offline (LLM_PROVIDER=stub).
+- Calls go through an LLMRouter (integrations/llm_router.py): per-provider
+  rate limits, timeouts, retries with jitter, failover to the providers in
+  LLM_PROVIDERS and optional hedging.
+- Every request is a telemetry span; requests, characters and (estimated)
+  tokens are counted per provider that answered.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from integrations.llm_router import LLMRouter, Route
+from telemetry import count, estimate_tokens, metrics, span
+
+load_dotenv()
+
+DEFAULT_MODELS = {
+    "gemini": "gemini-1.5-flash",
+    "openai": "gpt-4o-mini",
+    "stub": "stub",
+}
+
+# seconds per attempt; enforced by the router and passed on to the SDK calls
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "60"))
+
+_client_lock = threading.Lock()
+_gemini_models: Dict[str, object] = {}
+_openai_client = None
+
+
+def _gemini_model(model: str):
+    with _client_lock:
+        if model not in _gemini_models:
+            import google.generativeai as genai
+            if not _gemini_models:
+                genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            _gemini_models[model] = genai.GenerativeModel(model)
+        return _gemini_models[model]
+
+
+def _openai():
+    global _openai_client
+    with _client_lock:
+        if _openai_client is None:
+            from openai import OpenAI
+            _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return _openai_client
+
+
+def _gemini_generate(model: str, prompt: str, system: Optional[str]) -> str:
+    if system:
+        resp = _gemini_model(model).generate_content([
+            {"role": "user", "parts": [system]},
+            {"role": "user", "parts": [prompt]},
+        ], request_options={"timeout": LLM_TIMEOUT_S})
+    else:
+        resp = _gemini_model(model).generate_content(prompt, request_options={"timeout": LLM_TIMEOUT_S})
+    return resp.text
+
+
+def _openai_generate(model: str, prompt: str, system: Optional[str]) -> str:
+    msg = [{"role": "system", "content": system}] if system else []
+    msg.append({"role": "user", "content": prompt})
+    resp = _openai().chat.completions.create(model=model, messages=msg, temperature=0.2, timeout=LLM_TIMEOUT_S)
+    return resp.choices[0].message.content
+
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _stub_generate(model: str, prompt: str, system: Optional[str]) -> str:
+    """
+    Deterministic local stand-in for an LLM. JSON-style requests get a JSON
+    analysis built from the prompt's sentences; anything else gets a short text.
+    LLM_STUB_LATENCY_MS simulates network/model latency.
+    """
+    delay = float(os.getenv("LLM_STUB_LATENCY_MS", "0")) / 1000
+    if delay:
+        time.sleep(delay)
+    if system and "JSON" in system:
+        # drop "Target language: .." and header lines such as "Meeting transcript:"
+        body = prompt.split("Target language:")[0]
+        body = "\n".join(line for line in body.splitlines() if not line.rstrip().endswith(":"))
+        sentences = [s.strip() for s in _SENTENCE.split(body) if s.strip()]
+        pick = lambda *words: [s for s in sentences if any(w in s.lower() for w in words)]
+        return json.dumps({
+            "summary": sentences[:3],
+            "actions": pick("will", "action", "assign", "todo"),
+            "decisions": pick("decide", "agreed", "approve"),
+            "risks": pick("risk", "delay", "blocker"),
+            "translation": " ".join(sentences[:3]),
+            "sentiment": "neutral",
+        })
+    return f"(stub response to {len(prompt.split())} words)"
+
+
+PROVIDERS: Dict[str, Callable[[str, str, Optional[str]], str]] = {
+    "gemini": _gemini_generate,
+    "openai": _openai_generate,
+    "stub": _stub_generate,
+}
+
+
+def register_provider(name: str, fn: Callable[[str, str, Optional[str]], str], default_model: str = None) -> None:
+    """Add (or replace) a provider: fn(model, prompt, system) -> text."""
+    PROVIDERS[name] = fn
+    DEFAULT_MODELS.setdefault(name, default_model or name)
+
+
+class ResponseCache:
+    """LRU memory cache in front of a directory of JSON entries, both with a TTL."""
+
+    def __init__(self, cache_dir: Optional[str] = "outputs/cache/llm", ttl: float = 7 * 24 * 3600,
+                 max_entries: int = 256, max_bytes: int = 100 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # the directory is created by the first put(), so building the shared cache at import touches no disk
+        self._dir_ready = False
+
+    @staticmethod
+    def make_key(provider: str, model: str, prompt: str, system: Optional[str] = None) -> str:
+        h = hashlib.sha256()
+        for part in (provider, model, system or "", prompt):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is None and self.cache_dir:
+                try:
+                    with open(self._path(key), encoding="utf-8") as f:
+                        data = json.load(f)
+                    entry = (data["created"], data["response"])
+                    self._remember(key, entry)
+                except (OSError, ValueError, KeyError):
+                    entry = None
+            if entry is None or now - entry[0] > self.ttl:
+                self.misses += 1
+                return None
+            self._mem.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, response: str) -> None:
+        entry = (time.time(), response)
+        with self._lock:
+            self._remember(key, entry)
+            if self.cache_dir:
+                if not self._dir_ready:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    self._dir_ready = True
+                tmp = f"{self._path(key)}.{threading.get_ident()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"created": entry[0], "response": response}, f, ensure_ascii=False)
+                os.replace(tmp, self._path(key))
+                self._evict_disk()
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        self._mem[key] = entry
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if now - st.st_mtime > self.ttl:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # already evicted by another process
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0, "memory_entries": len(self._mem)}
+
+
+response_cache = ResponseCache(
+    cache_dir=os.getenv("LLM_CACHE_DIR", "outputs/cache/llm"),
+    ttl=float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_MB", "100")) * 1024 * 1024,
+)
+
+
+def default_provider() -> str:
+    """LLM_PROVIDER if set, else Gemini when a key is present, else OpenAI."""
+    provider = os.getenv("LLM_PROVIDER")
+    if provider:
+        return provider
+    if os.getenv("GEMINI_API_KEY"):
+        return "gemini"
+    if os.getenv("OPENAI_API_KEY"):
+        return "openai"
+    raise RuntimeError("No LLM provider configured. Set GEMINI_API_KEY or OPENAI_API_KEY in .env")
+
+
+def fallback_providers() -> List[str]:
+    """LLM_PROVIDERS (comma-separated) if set, else every provider with an API key."""
+    configured = os.getenv("LLM_PROVIDERS")
+    if configured:
+        return [p.strip() for p in configured.split(",") if p.strip()]
+    return [p for p, key in (("gemini", "GEMINI_API_KEY"), ("openai", "OPENAI_API_KEY")) if os.getenv(key)]
+
+
+def provider_chain(provider: str, model: str) -> List[Route]:
+    """The requested provider/model first, then the fallbacks with their default models."""
+    return [(provider, model)] + [(p, DEFAULT_MODELS.get(p, p)) for p in fallback_providers()
+                                  if p != provider and p in PROVIDERS]
+
+
+def _call_provider(provider: str, model: str, prompt: str, system: Optional[str]) -> str:
+    return PROVIDERS[provider](model, prompt, system)
+
+
+router = LLMRouter(
+    _call_provider,
+    timeout=LLM_TIMEOUT_S,
+    retries=int(os.getenv("LLM_RETRIES", "2")),
+    provider_inflight=int(os.getenv("LLM_MAX_INFLIGHT", "8")),
+    hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "0")),
+)
+metrics.register_collector(lambda: [
+    ("llm_provider_latency_seconds", {"provider": p, "quantile": q / 100}, v) for p, q, v in router.percentiles()
+])
+
+
+def generate(prompt: str, provider: Optional[str] = None, model: Optional[str] = None,
+             system: Optional[str] = None, cache: Optional[ResponseCache] = None, use_cache: bool = True,
+             validate: Optional[Callable[[str], bool]] = None) -> str:
+    """
+    Run one completion through the router and the shared clients, memoised in
+    the response cache (under the requested provider, whichever one answered).
+    Errors are not cached and propagate to the caller once retries and
+    failover are exhausted; responses rejected by `validate` are returned but
+    not cached either.
+    """
+    provider = provider or default_provider()
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+    model = model or DEFAULT_MODELS.get(provider, provider)
+    cache = cache or response_cache
+
+    key = ResponseCache.make_key(provider, model, prompt, system)
+    if use_cache:
+        hit = cache.get(key)
+        if hit is not None:
+            count("llm_requests_total", provider=provider, cached="true")
+            return hit
+    prompt_chars = len(prompt) + len(system or "")
+    with span("llm", provider=provider, model=model, prompt_chars=prompt_chars) as attrs:
+        text, used = router.complete(provider_chain(provider, model), prompt, system)
+        attrs["response_chars"] = len(text or "")
+        attrs["answered_by"] = used
+    count("llm_requests_total", provider=used, cached="false")
+    count("llm_chars_total", prompt_chars, provider=used, direction="prompt")
+    count("llm_chars_total", len(text or ""), provider=used, direction="response")
+    count("llm_tokens_total", estimate_tokens(prompt) + estimate_tokens(system or ""), provider=used,
+          direction="prompt")
+    count("llm_tokens_total", estimate_tokens(text or ""), provider=used, direction="response")
+    if use_cache and text and (validate is None or validate(text)):
+        cache.put(key, text)
+    return text
@@ -0,0 +1,258 @@
+"""
+Routing of LLM calls over one or more providers.
+
+Every completion from integrations.llm_client.generate goes through the
+router, which adds, per provider:
+
+- a token bucket (LLM_RPM_<PROVIDER> requests per minute, bursts of
+  LLM_BURST_<PROVIDER>), so we throttle ourselves instead of collecting 429s;
+  a throttled provider is skipped for the next one in the chain when that one
+  has capacity,
+- a timeout per attempt (LLM_TIMEOUT_S, also passed to the provider SDKs);
+  a call that overruns it anyway finishes in the background and is ignored,
+  but keeps one of the provider's LLM_MAX_INFLIGHT call slots until it ends,
+  so a hung provider is skipped instead of filling the shared thread pool,
+- retries with exponential backoff and full jitter (LLM_RETRIES); each retry
+  moves on to the next provider in the chain (failover),
+- optional hedging (LLM_HEDGE_PERCENTILE, e.g. 95): when an attempt is still
+  running after that percentile of the provider's recent latencies, the same
+  request is also sent to the next provider and the first answer wins,
+- latency histograms (llm_provider_seconds{provider, outcome}) and recent
+  p50/p95/p99 gauges.
+
+The chain is the requested provider followed by the fallbacks in
+LLM_PROVIDERS (default: every provider with an API key).
+"""
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from telemetry import count, metrics, propagate
+
+log = logging.getLogger(__name__)
+
+# (provider, model)
+Route = Tuple[str, str]
+
+
+class ProviderTimeout(Exception):
+    pass
+
+
+class RateLimited(Exception):
+    pass
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`; acquire() blocks up to `timeout`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float = 0.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_s = (1 - self._tokens) / self.rate
+            if now + wait_s > deadline:
+                return False
+            time.sleep(wait_s)
+
+
+class ProviderState:
+    """Rate limit, in-flight calls and recent latencies of one provider."""
+
+    def __init__(self, name: str, rpm: Optional[float] = None, burst: Optional[float] = None, window: int = 200,
+                 max_inflight: int = 8):
+        self.name = name
+        self.bucket = TokenBucket(rpm / 60, burst or max(1.0, rpm / 10)) if rpm else None
+        self.slots = threading.BoundedSemaphore(max_inflight)
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = 0.0) -> bool:
+        """A call slot and a rate-limit token, waiting up to `timeout`; release() when the call has ended."""
+        deadline = time.monotonic() + timeout
+        if not (self.slots.acquire(timeout=timeout) if timeout > 0 else self.slots.acquire(blocking=False)):
+            return False
+        if self.bucket is None or self.bucket.acquire(max(0.0, deadline - time.monotonic())):
+            return True
+        self.slots.release()
+        return False
+
+    def release(self) -> None:
+        self.slots.release()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            values = sorted(self.latencies)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+class LLMRouter:
+    def __init__(self, call: Callable[[str, str, str, Optional[str]], str], timeout: float = 60.0,
+                 retries: int = 2, backoff: float = 0.5, max_backoff: float = 8.0,
+                 hedge_percentile: float = 0.0, hedge_min_samples: int = 20, rate_wait: Optional[float] = None,
+                 limits: Optional[Dict[str, Tuple[float, Optional[float]]]] = None, max_inflight: int = 32,
+                 provider_inflight: int = 8):
+        """
+        `call(provider, model, prompt, system) -> text` does the actual request.
+        `limits` maps provider -> (requests per minute, burst); providers not in
+        it are unlimited unless LLM_RPM_<PROVIDER> is set. `rate_wait` is how
+        long to queue for a throttled provider (default: the timeout).
+        `provider_inflight` caps the calls running per provider, including
+        timed-out ones that have not returned yet; `max_inflight` sizes the
+        shared thread pool.
+        """
+        self.call = call
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.rate_wait = timeout if rate_wait is None else rate_wait
+        self.limits = dict(limits or {})
+        self.provider_inflight = provider_inflight
+        self._states: Dict[str, ProviderState] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="llm")
+
+    def state(self, provider: str) -> ProviderState:
+        with self._lock:
+            if provider not in self._states:
+                rpm, burst = self.limits.get(provider, (None, None))
+                env = provider.upper().replace("-", "_")
+                rpm = rpm or float(os.getenv(f"LLM_RPM_{env}", "0")) or None
+                burst = burst or float(os.getenv(f"LLM_BURST_{env}", "0")) or None
+                self._states[provider] = ProviderState(provider, rpm, burst, max_inflight=self.provider_inflight)
+            return self._states[provider]
+
+    def percentiles(self) -> List[Tuple[str, float, float]]:
+        """(provider, percentile, seconds) over each provider's recent calls."""
+        with self._lock:
+            states = list(self._states.values())
+        out = []
+        for state in states:
+            for q in (50, 95, 99):
+                value = state.percentile(q)
+                if value is not None:
+                    out.append((state.name, q, value))
+        return out
+
+    def _run(self, route: Route, prompt: str, system: Optional[str]) -> Tuple[str, str]:
+        provider, model = route
+        t0 = time.perf_counter()
+        outcome = "error"
+        try:
+            text = self.call(provider, model, prompt, system)
+            outcome = "ok"
+            return text, provider
+        finally:
+            # the slot taken by _reserve is held until the call really ends, timed out or not
+            self.state(provider).release()
+            elapsed = time.perf_counter() - t0
+            # successful calls that timed out or lost a hedge count too, when they finally end;
+            # fast failures would only drag the hedging percentile down
+            if outcome == "ok":
+                self.state(provider).record(elapsed)
+            metrics.observe("llm_provider_seconds", elapsed, provider=provider, outcome=outcome)
+
+    def _reserve(self, routes: Sequence[Route], block: bool) -> Optional[Route]:
+        """
+        The first route with a free call slot and rate-limit capacity right now;
+        if none and `block`, wait for the first route. The slot is released by _run.
+        """
+        for route in routes:
+            if self.state(route[0]).acquire():
+                return route
+        if block and self.state(routes[0][0]).acquire(self.rate_wait):
+            return routes[0]
+        return None
+
+    def _hedge_delay(self, provider: str) -> Optional[float]:
+        state = self.state(provider)
+        if not self.hedge_percentile or len(state.latencies) < self.hedge_min_samples:
+            return None
+        return state.percentile(self.hedge_percentile)
+
+    def complete(self, routes: Sequence[Route], prompt: str, system: Optional[str] = None) -> Tuple[str, str]:
+        """(text, provider that answered) for a prompt; raises the last error once every attempt failed."""
+        routes = list(dict.fromkeys(routes))
+        error: Exception = RuntimeError("no LLM provider")
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1))))
+                count("llm_retries_total", provider=routes[0][0])
+            # each retry starts from the next provider in the chain
+            order = routes[attempt % len(routes):] + routes[:attempt % len(routes)]
+            route = self._reserve(order, block=True)
+            if route is None:
+                error = RateLimited(f"{order[0][0]}: no capacity within {self.rate_wait:.0f}s")
+                count("llm_attempt_errors_total", provider=order[0][0], reason="rate_limited")
+                continue
+            try:
+                return self._attempt(route, [r for r in order if r != route], prompt, system)
+            except Exception as e:
+                error = e
+                log.warning("LLM attempt %d failed: %s", attempt + 1, e)
+        raise error
+
+    def _attempt(self, route: Route, alternates: List[Route], prompt: str, system: Optional[str]) -> Tuple[str, str]:
+        t0 = time.monotonic()
+        running = {self._pool.submit(propagate(self._run), route, prompt, system): route}
+        hedge_at = self._hedge_delay(route[0]) if alternates else None
+        error: Optional[Exception] = None
+        while running:
+            now = time.monotonic() - t0
+            budget = self.timeout - now
+            if budget <= 0:
+                break
+            wait_s = budget if hedge_at is None else max(0.0, min(budget, hedge_at - now))
+            done, _ = wait(running, timeout=wait_s, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = running.pop(future)[0]
+                try:
+                    text, used = future.result()
+                except Exception as e:
+                    error = e
+                    count("llm_attempt_errors_total", provider=provider, reason=type(e).__name__)
+                    continue
+                if used != route[0]:
+                    count("llm_hedges_total", provider=used, outcome="won")
+                return text, used
+            if hedge_at is not None and time.monotonic() - t0 >= hedge_at:
+                hedge_at = None
+                backup = self._reserve(alternates, block=False)
+                if backup is not None:
+                    count("llm_hedges_total", provider=backup[0], outcome="sent")
+                    running[self._pool.submit(propagate(self._run), backup, prompt, system)] = backup
+        if running:
+            for provider, _ in running.values():
+                count("llm_attempt_errors_total", provider=provider, reason="timeout")
+            raise ProviderTimeout(f"{route[0]}: no answer within {self.timeout:.0f}s")
+        raise error
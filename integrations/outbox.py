@@ -0,0 +1,228 @@
+"""
+Durable notification outbox with a background dispatcher.
+
+Slack and email notifications are written to a SQLite table and the caller
+returns immediately; a dispatcher thread delivers them. Messages survive a
+restart (pending rows are picked up again), are grouped per destination so a
+batch goes over one pooled HTTP session or one persistent SMTP connection, and
+failed deliveries are retried with exponential backoff and jitter. Delivery
+status can be polled with status() or observed through the on_status callback.
+Send times, delivery outcomes and queue delay are recorded in telemetry.
+"""
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from itertools import groupby
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from integrations.emailer import SMTPConnection, build_message
+from integrations.slack_notify import build_slack_request, post_slack_request, slack_destination
+from telemetry import count, metrics, span
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,               -- 'slack' | 'email'
+    destination TEXT NOT NULL,        -- 'webhook' | 'api' | explicit webhook url, or comma-joined recipients
+    payload TEXT NOT NULL,            -- JSON, never credentials
+    status TEXT NOT NULL DEFAULT 'pending',   -- pending | sent | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+class Outbox:
+    def __init__(self, db_path: str = "outputs/outbox.sqlite3", smtp: Optional[SMTPConnection] = None,
+                 max_attempts: int = 5, backoff: float = 2.0, max_backoff: float = 300.0,
+                 poll_interval: float = 1.0, batch_size: int = 50,
+                 on_status: Optional[Callable[[int, str, Optional[str]], None]] = None):
+        self.db_path = db_path
+        self.smtp = smtp or SMTPConnection()
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.on_status = on_status
+        self._sessions: Dict[str, requests.Session] = {}
+        self._db_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._db_lock, self._db:
+            self._db.executescript(SCHEMA)
+
+    # -- producer side -------------------------------------------------------
+
+    def _enqueue(self, kind: str, destination: str, payload: Dict) -> int:
+        now = time.time()
+        with self._db_lock, self._db:
+            cur = self._db.execute(
+                "INSERT INTO outbox (kind, destination, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, destination, json.dumps(payload), now, now),
+            )
+        self._wake.set()
+        return cur.lastrowid
+
+    def enqueue_slack(self, text: str, webhook: str = None) -> Optional[int]:
+        """
+        Queue a Slack message; returns its outbox id, or None if Slack is not
+        configured. Only the text and the kind of destination are stored; the
+        webhook URL or bot token is looked up again when it is delivered.
+        """
+        destination = slack_destination(webhook)
+        if destination is None:
+            return None
+        return self._enqueue("slack", destination, {"text": text})
+
+    def enqueue_email(self, subject: str, body: str, recipients: List[str]) -> int:
+        return self._enqueue("email", ",".join(recipients), {"subject": subject, "body": body})
+
+    def status(self, message_id: int) -> Optional[Dict]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT id, kind, destination, status, attempts, last_error, created_at, sent_at FROM outbox WHERE id = ?",
+                (message_id,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def pending(self) -> int:
+        """Number of messages still waiting for (re)delivery."""
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+    def wait(self, message_ids: List[int], timeout: float = 30.0) -> bool:
+        """Block until all messages are sent or failed (mainly for tests and batch runs)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if all(self.status(i)["status"] != "pending" for i in message_ids):
+                return True
+            time.sleep(0.05)
+        return False
+
+    # -- dispatcher ------------------------------------------------------------
+
+    def start(self) -> "Outbox":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self.smtp.lock:
+            self.smtp.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                delivered = self.dispatch_once()
+            except Exception:  # never let the dispatcher thread die
+                log.exception("outbox dispatcher error")
+                delivered = 0
+            if not delivered:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def dispatch_once(self) -> int:
+        """Deliver every due message, one batch per destination. Returns how many were attempted."""
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY kind, destination, id LIMIT ?",
+                (time.time(), self.batch_size),
+            ).fetchall()
+        for (kind, destination), batch in groupby(rows, key=lambda r: (r["kind"], r["destination"])):
+            batch = list(batch)
+            if kind == "slack":
+                self._deliver_slack(destination, batch)
+            else:
+                self._deliver_email(destination, batch)
+        return len(rows)
+
+    def _session(self, url: str) -> requests.Session:
+        host = requests.utils.urlparse(url).netloc
+        if host not in self._sessions:
+            self._sessions[host] = requests.Session()
+        return self._sessions[host]
+
+    def _deliver_slack(self, destination: str, rows) -> None:
+        for row in rows:
+            payload = json.loads(row["payload"])
+            try:
+                request = build_slack_request(payload["text"], destination)
+                if request is None:
+                    raise RuntimeError(f"Slack destination {destination!r} is no longer configured")
+                url, headers, body = request
+                with span("slack_send"):
+                    post_slack_request(url, headers, body, session=self._session(url))
+                self._mark_sent(row)
+            except Exception as e:
+                self._mark_failed(row, e)
+
+    def _deliver_email(self, destination: str, rows) -> None:
+        recipients = destination.split(",")
+        with self.smtp.lock:
+            for row in rows:
+                payload = json.loads(row["payload"])
+                msg = build_message(payload["subject"], payload["body"], recipients, sender=self.smtp.sender)
+                try:
+                    with span("smtp_send", recipients=len(recipients)):
+                        self.smtp.send(msg, recipients)
+                    self._mark_sent(row)
+                except Exception as e:
+                    self.smtp.close()
+                    self._mark_failed(row, e)
+
+    def _mark_sent(self, row) -> None:
+        with self._db_lock, self._db:
+            self._db.execute("UPDATE outbox SET status = 'sent', attempts = attempts + 1, sent_at = ? WHERE id = ?",
+                             (time.time(), row["id"]))
+        count("notifications_total", kind=row["kind"], status="sent")
+        metrics.observe("notification_delay_seconds", time.time() - row["created_at"], kind=row["kind"])
+        self._report(row["id"], "sent", None)
+
+    def _mark_failed(self, row, error: Exception) -> None:
+        attempts = row["attempts"] + 1
+        if attempts >= self.max_attempts:
+            status, next_at = "failed", time.time()
+        else:
+            delay = min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+            status, next_at = "pending", time.time() + delay * random.uniform(0.5, 1.0)
+        with self._db_lock, self._db:
+            self._db.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (status, attempts, next_at, str(error), row["id"]),
+            )
+        count("notifications_total", kind=row["kind"], status="retry" if status == "pending" else "failed")
+        log.warning("%s notification #%s attempt %d failed: %s", row["kind"], row["id"], attempts, error)
+        self._report(row["id"], status, str(error))
+
+    def _report(self, message_id: int, status: str, error: Optional[str]) -> None:
+        if self.on_status:
+            try:
+                self.on_status(message_id, status, error)
+            except Exception:
+                pass
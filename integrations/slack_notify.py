@@ -2,19 +2,58 @@ import json
 import os
 import requests
 
-WEBHOOK = os.getenv("SLACK_WEBHOOK_URL")
-BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
-CHANNEL_ID = os.getenv("SLACK_CHANNEL_ID")
+TIMEOUT = float(os.getenv("SLACK_TIMEOUT", "10"))
+API_URL = "https://slack.com/api/chat.postMessage"
+
+# pooled keep-alive connections, shared by every message
+_session = requests.Session()
+
+
+def slack_destination(webhook: str = None):
+    """
+    Where a message goes, without credentials: an explicit webhook URL,
+    "webhook" (SLACK_WEBHOOK_URL), "api" (SLACK_BOT_TOKEN + SLACK_CHANNEL_ID),
+    or None if Slack is not configured.
+    """
+    if webhook:
+        return webhook
+    if os.getenv("SLACK_WEBHOOK_URL"):
+        return "webhook"
+    if os.getenv("SLACK_BOT_TOKEN") and os.getenv("SLACK_CHANNEL_ID"):
+        return "api"
+    return None
+
+
+def build_slack_request(text: str, destination: str = None):
+    """
+    (url, headers, body) for a message to `destination` (see slack_destination;
+    default: the configured one), or None if Slack is not configured. Webhook
+    URLs and the bot token are read from the environment here, at send time.
+    """
+    destination = destination or slack_destination()
+    if destination == "webhook":
+        destination = os.getenv("SLACK_WEBHOOK_URL")
+    elif destination == "api":
+        token, channel = os.getenv("SLACK_BOT_TOKEN"), os.getenv("SLACK_CHANNEL_ID")
+        if not (token and channel):
+            return None
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json; charset=utf-8"}
+        return API_URL, headers, json.dumps({"channel": channel, "text": text})
+    if not destination:
+        return None
+    return destination, {"Content-Type": "application/json"}, json.dumps({"text": text})
+
+
+def post_slack_request(url: str, headers: dict, body: str, session: requests.Session = None) -> None:
+    """POST one prepared message; raises on HTTP errors and on chat.postMessage's ok=false."""
+    resp = (session or _session).post(url, data=body, headers=headers, timeout=TIMEOUT)
+    resp.raise_for_status()
+    if "chat.postMessage" in url and not resp.json().get("ok", False):
+        raise RuntimeError(f"Slack API error: {resp.json().get('error')}")
+
 
 def send_slack_message(text: str) -> None:
     """Send a message via Incoming Webhook (simplest) or chat.postMessage if configured."""
-    if WEBHOOK:
-        payload = {"text": text}
-        requests.post(WEBHOOK, data=json.dumps(payload), headers={"Content-Type": "application/json"})
-        return
-
-    if BOT_TOKEN and CHANNEL_ID:
-        url = "https://slack.com/api/chat.postMessage"
-        headers = {"Authorization": f"Bearer {BOT_TOKEN}", "Content-Type": "application/json; charset=utf-8"}
-        data = {"channel": CHANNEL_ID, "text": text}
-        requests.post(url, headers=headers, data=json.dumps(data))
+    request = build_slack_request(text)
+    if request:
+        post_slack_request(*request)
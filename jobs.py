@@ -0,0 +1,272 @@
+# jobs.py
+"""
+Job subsystem: a SQLite-backed job queue with bounded worker concurrency.
+
+Every submission gets a job id and its own output directory
+(outputs/jobs/<id>/), so concurrent users never overwrite each other's
+transcript, summary or audio. Workers store the latest progress snapshot in
+the database, at most every `progress_interval` seconds (handlers may yield a
+growing transcript many times a second), and followers only re-read a job when
+its progress counter moved. Queued jobs survive a restart, jobs that were
+running when the process died are re-queued, and finished jobs (with their
+directories) are deleted after a retention period.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterator, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,          -- queued | running | done | failed
+    params TEXT NOT NULL,          -- JSON
+    progress TEXT,                 -- JSON, latest snapshot yielded by the handler
+    progress_seq INTEGER NOT NULL DEFAULT 0,   -- bumped on every progress write
+    error TEXT,
+    out_dir TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+TERMINAL = ("done", "failed")
+
+
+class JobStore:
+    def __init__(self, db_path: str = "outputs/jobs.sqlite3", jobs_dir: str = "outputs/jobs"):
+        self.jobs_dir = jobs_dir
+        os.makedirs(jobs_dir, exist_ok=True)
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+            columns = {r["name"] for r in self._db.execute("PRAGMA table_info(jobs)")}
+            if "progress_seq" not in columns:  # database from before the column existed
+                self._db.execute("ALTER TABLE jobs ADD COLUMN progress_seq INTEGER NOT NULL DEFAULT 0")
+
+    def submit(self, params: Dict, input_file: Optional[str] = None) -> str:
+        """
+        Create a queued job. `input_file` is copied into the job directory (and
+        params["audio_path"] pointed at the copy) so the job can still run after
+        a restart, when the original upload may be gone.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        out_dir = os.path.join(self.jobs_dir, job_id)
+        os.makedirs(out_dir, exist_ok=True)
+        params = dict(params)
+        if input_file:
+            dest = os.path.join(out_dir, "input" + os.path.splitext(input_file)[1])
+            shutil.copyfile(input_file, dest)
+            params["audio_path"] = dest
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, params, out_dir, created_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(params), out_dir, time.time()),
+            )
+        return job_id
+
+    def claim_next(self) -> Optional[Dict]:
+        """Atomically move the oldest queued job to running and return it."""
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                             (time.time(), row["id"]))
+        return self._decode(row, status="running")
+
+    def set_progress(self, job_id: str, snapshot: Dict) -> None:
+        with self._lock, self._db:
+            self._db.execute("UPDATE jobs SET progress = ?, progress_seq = progress_seq + 1 WHERE id = ?",
+                             (json.dumps(snapshot), job_id))
+
+    def version(self, job_id: str) -> Optional[tuple]:
+        """(status, progress_seq): a cheap check of whether a job changed, without reading its progress."""
+        with self._lock:
+            row = self._db.execute("SELECT status, progress_seq FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return tuple(row) if row else None
+
+    def finish(self, job_id: str, error: Optional[str] = None) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                ("failed" if error else "done", error, time.time(), job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._decode(row) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def requeue_running(self) -> int:
+        """On startup: jobs left 'running' by a dead process go back to the queue."""
+        with self._lock, self._db:
+            return self._db.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'").rowcount
+
+    def cleanup(self, retention_seconds: float) -> int:
+        """Delete finished jobs older than the retention period, with their output directories."""
+        cutoff = time.time() - retention_seconds
+        with self._lock, self._db:
+            rows = self._db.execute(
+                "SELECT id, out_dir FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (cutoff,)
+            ).fetchall()
+            self._db.executemany("DELETE FROM jobs WHERE id = ?", [(r["id"],) for r in rows])
+        for r in rows:
+            shutil.rmtree(r["out_dir"], ignore_errors=True)
+        return len(rows)
+
+    @staticmethod
+    def _decode(row, status: Optional[str] = None) -> Dict:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else None
+        if status:
+            job["status"] = status
+        return job
+
+
+class JobQueue:
+    """
+    Runs queued jobs on `workers` threads. `handler(job)` is a generator that
+    yields JSON-serialisable progress snapshots; the last one is the job's result.
+    """
+    def __init__(self, store: JobStore, handler: Callable[[Dict], Iterator[Dict]], workers: int = 2,
+                 retention_seconds: float = 24 * 3600, poll_interval: float = 0.5, progress_interval: float = 0.5):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self.poll_interval = poll_interval
+        self.progress_interval = progress_interval
+        # notified after every progress write / finish, so followers in this process wake up at once
+        self._changed = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self) -> "JobQueue":
+        requeued = self.store.requeue_running()
+        if requeued:
+            print(f"♻️ Re-queued {requeued} interrupted job(s)")
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._janitor, name="job-janitor", daemon=True)
+        t.start()
+        self._threads.append(t)
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def submit(self, params: Dict, input_file: Optional[str] = None) -> str:
+        job_id = self.store.submit(params, input_file=input_file)
+        self._wake.set()
+        return job_id
+
+    def follow(self, job_id: str, interval: float = 0.5) -> Iterator[Dict]:
+        """
+        Yield a job whenever its status or progress changes, until it finishes.
+        Only (status, progress_seq) is polled; the full row is read when it moved.
+        Progress written by this process wakes the follower at once, `interval`
+        bounds the wait for writes from other processes.
+        """
+        last = None
+        while True:
+            version = self.store.version(job_id)
+            if version is None:
+                return
+            if version != last:
+                job = self.store.get(job_id)
+                if job is None:
+                    return
+                last = (job["status"], job["progress_seq"])
+                yield job
+                if job["status"] in TERMINAL:
+                    return
+            with self._changed:
+                self._changed.wait(interval)
+
+    def _notify(self) -> None:
+        with self._changed:
+            self._changed.notify_all()
+
+    def _run_job(self, job: Dict) -> None:
+        """
+        Drive the handler, writing its latest snapshot at most every
+        progress_interval seconds. A snapshot held back by the throttle is
+        written by a timer once the interval has passed, so a handler that
+        blocks right after yielding (e.g. on LLM calls) is not left showing
+        stale progress.
+        """
+        lock = threading.Lock()
+        state = {"pending": None, "written_at": 0.0, "timer": None}
+
+        def flush() -> None:
+            with lock:
+                state["timer"] = None
+                if state["pending"] is None:
+                    return
+                self.store.set_progress(job["id"], state["pending"])
+                state["pending"], state["written_at"] = None, time.monotonic()
+            self._notify()
+
+        try:
+            for snapshot in self.handler(job):
+                with lock:
+                    state["pending"] = snapshot
+                    wait_s = state["written_at"] + self.progress_interval - time.monotonic()
+                    if wait_s > 0:
+                        if state["timer"] is None:
+                            state["timer"] = threading.Timer(wait_s, flush)
+                            state["timer"].daemon = True
+                            state["timer"].start()
+                        continue
+                flush()
+        except Exception as e:
+            error = str(e)
+        else:
+            error = None
+        with lock:
+            if state["timer"] is not None:
+                state["timer"].cancel()
+        flush()
+        self.store.finish(job["id"], error=error)
+        self._notify()
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            job = self.store.claim_next()
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self._run_job(job)
+
+    def _janitor(self) -> None:
+        while not self._stop.wait(min(3600.0, max(self.retention_seconds / 4, 1.0))):
+            try:
+                self.store.cleanup(self.retention_seconds)
+            except Exception as e:
+                print("⚠️ Job cleanup error:", e)
@@ -1,173 +1,108 @@
+import logging
 import os
+import threading
+from datetime import datetime
 from dotenv import load_dotenv
 import gradio as gr
-from gtts import gTTS
-from datetime import datetime
-from pydub import AudioSegment
 
-# Agents & integrations
-from agents.transcriber import TranscriberAgent
-from agents.llm_nlp import LLMNLP
-from agents.highlighter import HighlightAgent
-from integrations.slack_notify import send_slack_message
-from integrations.emailer import send_email, RECIPIENTS
-from integrations.gemini_api import get_gemini_response
+# Agents, stages & integrations
+from pipeline import (archive, ask_archive, live_summary_markdown, run_pipeline, save_outputs,
+                      start_live_session, warm_up)
+from jobs import JobQueue, JobStore
+import telemetry
 
 load_dotenv()
 
-# Agents
-transcriber = TranscriberAgent(model_name=os.getenv("WHISPER_MODEL", "base"))
-nlp = LLMNLP()
-highlighter = HighlightAgent()
-
 # Config
 LANGS = ["hi", "ta", "kn", "te", "bn", "fr", "es", "en"]
 DEFAULT_LANG = os.getenv("DEFAULT_TARGET_LANG", "en")
+# the microphone argument of gr.Audio changed in Gradio 4
+MIC_SOURCE = {"sources": ["microphone"]} if int(gr.__version__.split(".")[0]) >= 4 else {"source": "microphone"}
 
 
-# 🔹 Helper: split audio into safe chunks
-def chunk_audio_file(audio_path, chunk_length_ms=60_000):
-    """Split audio into fixed chunks (default 60s)."""
-    audio = AudioSegment.from_file(audio_path)
-    chunks = []
-    for i in range(0, len(audio), chunk_length_ms):
-        chunk = audio[i:i + chunk_length_ms]
-        chunk_path = f"{audio_path}_chunk_{i // chunk_length_ms}.wav"
-        chunk.export(chunk_path, format="wav")
-        chunks.append(chunk_path)
-    return chunks
+def _job_handler(job):
+    """JobQueue handler: run the pipeline for a job inside its own output directory."""
+    params = job["params"]
+    yield from run_pipeline(params["audio_path"], params["target_lang"], params["custom_query"],
+                            params["extra_emails"], out_dir=job["out_dir"], title=params.get("title"))
 
 
-# 🔹 Helper: safe TTS with chunking
-def chunked_tts(text, lang="en", max_chars=2500, out_path="outputs/summary_audio.mp3"):
-    """Split long text into safe chunks for gTTS and merge into one MP3."""
-    os.makedirs("outputs", exist_ok=True)
-    parts = [text[i:i+max_chars] for i in range(0, len(text), max_chars)]
-    audio_segments = []
+jobs = JobQueue(
+    JobStore(os.getenv("JOBS_DB", "outputs/jobs.sqlite3"), os.getenv("JOBS_DIR", "outputs/jobs")),
+    handler=_job_handler,
+    workers=int(os.getenv("JOB_WORKERS", "2")),
+    retention_seconds=float(os.getenv("JOB_RETENTION_HOURS", "24")) * 3600,
+).start()
 
-    for idx, part in enumerate(parts):
-        tts = gTTS(part, lang=lang)
-        temp_path = f"outputs/tmp_tts_{idx}.mp3"
-        tts.save(temp_path)
-        audio_segments.append(AudioSegment.from_mp3(temp_path))
+telemetry.metrics.register_collector(
+    lambda: [("jobs", {"status": status}, n) for status, n in jobs.store.counts().items()]
+)
 
-    combined = sum(audio_segments)
-    combined.export(out_path, format="mp3")
-    return out_path
+EMPTY_OUTPUTS = ("", "", "", "", None, "(No auto insight)", "(No chatbot query)")
 
 
-def pipeline_with_status(audio_path, target_lang, custom_query, extra_emails):
-    status_msgs = []
+def _job_outputs(job):
+    """Map a job row to the UI outputs (8 result fields + job id + download files)."""
+    snap = job["progress"] or {}
+    status = snap.get("status", "")
+    if job["status"] == "queued":
+        status = f"🕒 Job {job['id']} queued ({jobs.store.counts().get('queued', 0)} waiting)..."
+    elif job["status"] == "failed":
+        status = f"{status}\n❌ Job failed: {job['error']}".strip()
+    values = tuple(snap.get(k, d) for k, d in zip(
+        ("lang", "transcript", "summary", "translated", "tts", "auto", "chat"), EMPTY_OUTPUTS
+    ))
+    return values + (status, job["id"], snap.get("transcript_file"), snap.get("summary_file"))
+
 
-    def update_status(msg):
-        status_msgs.append(msg)
-        return "\n".join(status_msgs)
+def follow_job(job_id):
+    """Stream a job's progress to the UI until it finishes (works after a page reload or restart)."""
+    job_id = (job_id or "").strip()
+    found = False
+    for job in jobs.follow(job_id):
+        found = True
+        yield _job_outputs(job)
+    if not found:
+        yield EMPTY_OUTPUTS + (f"❌ Unknown job id: {job_id}", job_id, None, None)
 
-    # 1. Check input
+
+def pipeline_with_status(audio_path, target_lang, custom_query, extra_emails):
+    """Generator handler: queue a job for this upload and stream its progress to the UI."""
     if not audio_path:
-        return "", "", "No audio uploaded", "", None, "(No auto insight)", "(No chatbot query)", update_status("❌ No audio uploaded")
-
-    # 2. Language detection
-    update_status("⏳ Detecting language...")
-    source_lang = transcriber.detect_language(audio_path)
-    update_status(f"🗣️ Detected language: {source_lang}")
-
-    # 3. Transcription with chunking
-    update_status("🎙️ Transcribing audio (chunked)...")
-    try:
-        chunks = chunk_audio_file(audio_path, chunk_length_ms=60_000)
-        transcripts = []
-        for ch in chunks:
-            result = transcriber.transcribe(ch, language=source_lang)
-            transcripts.append(result.get("text", ""))
-        transcript = " ".join(transcripts).strip()
-    except Exception as e:
-        return source_lang, "", "Error in transcription", "", None, "(No auto insight)", "(No chatbot query)", update_status(f"❌ Transcription error: {e}")
-
-    if not transcript:
-        return source_lang, "", "Empty transcript", "", None, "(No auto insight)", "(No chatbot query)", update_status("❌ Transcript is empty")
-
-    # 4. AI insights
-    update_status("🤖 Generating AI insights...")
-    gemini_auto_response = get_gemini_response(transcript)
-    gemini_chat_response = get_gemini_response(custom_query) if custom_query.strip() else "(No custom query provided)"
-
-    # 5. NLP analysis
-    update_status("🔍 Analyzing transcript with NLP...")
-    analysis = nlp.analyze(transcript, target_lang)
-    summary_bullets = analysis.get("summary", [])
-    action_items = analysis.get("actions", [])
-    decisions = analysis.get("decisions", [])
-    risks = analysis.get("risks", [])
-    sentiment = analysis.get("sentiment", "neutral")
-
-    # ✅ FIX: no more transcript[:2000], use full transcript
-    translated = (
-        analysis.get("translation")
-        or (" ".join(summary_bullets) if summary_bullets else transcript)
+        yield ("", "", "No audio uploaded", "", None, "(No auto insight)", "(No chatbot query)",
+               "❌ No audio uploaded", "", None, None)
+        return
+    # the job runs on a copy named input.<ext>; the archive shows the name the user uploaded
+    job_id = jobs.submit(
+        {"target_lang": target_lang, "custom_query": custom_query or "", "extra_emails": extra_emails or "",
+         "title": os.path.basename(audio_path)},
+        input_file=audio_path,
     )
+    yield from follow_job(job_id)
+
+
+def live_stream(chunk, session):
+    """Streaming handler: feed each microphone chunk to the live session (created on the first chunk)."""
+    if chunk is None:
+        return session, gr.update(), gr.update()
+    if session is None:
+        session = start_live_session()
+    sr, samples = chunk
+    session.feed(samples, sr)
+    return session, session.text, live_summary_markdown(session)
+
+
+def live_finish(session):
+    """Recording stopped: commit the rest, run the final summary update and save the transcript."""
+    if session is None:
+        return None, "", "⏳ Start recording to begin a live session.", None
+    result = session.finish()
+    summary = live_summary_markdown(session)
+    meeting_id = f"live_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    ts_path, _ = save_outputs(os.path.join("outputs", "live", meeting_id), result["text"], summary)
+    archive.get().add_meeting(meeting_id, result["segments"], result["text"], title="Live meeting")
+    return None, result["text"], summary, ts_path
 
-    if isinstance(translated, dict):
-        translated = translated.get(target_lang) or translated.get("en") or str(translated)
-
-    # 6. TTS with chunking
-    update_status("🔊 Generating TTS summary audio...")
-    os.makedirs("outputs", exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    tts_path = os.path.join("outputs", f"summary_audio_{timestamp}.mp3")
-
-    try:
-        tts_path = chunked_tts(translated, lang=target_lang if target_lang else "en", out_path=tts_path)
-    except Exception as e:
-        update_status(f"⚠️ TTS error: {e}")
-        tts_path = None
-
-    # 7. Build final summary text
-    text_block = ["**Meeting Summary**"] + [f"• {b}" for b in summary_bullets]
-    text_block += ["\n**Action Items**"] + ([f"- {a}" for a in action_items] if action_items else ["- (none)"])
-    text_block += ["\n**Decisions**"] + ([f"- {d}" for d in decisions] if decisions else ["- (none)"])
-    text_block += ["\n**Risks**"] + ([f"- {r}" for r in risks] if risks else ["- (none)"])
-    text_block.append(f"\n**Sentiment:** {sentiment}")
-    text_block.append("\n**Gemini Auto Insight:**")
-    text_block.append(gemini_auto_response)
-    share_text = "\n".join(text_block)
-
-    # 8. Notifications
-    update_status("📤 Sending Slack and Email notifications...")
-
-    # Slack
-    try:
-        send_slack_message(share_text)
-        update_status("✅ Slack message sent.")
-    except Exception as e:
-        update_status(f"⚠️ Slack error: {e}")
-
-    # Email
-    try:
-        final_recipients = RECIPIENTS.copy() if RECIPIENTS else []
-        if extra_emails:
-            emails = [e.strip() for e in extra_emails.split(",") if "@" in e]
-            final_recipients.extend(emails)
-        if final_recipients:
-            send_email(subject="Meeting Summary", body=share_text, recipients=final_recipients)
-            update_status(f"✅ Email sent to: {', '.join(final_recipients)}")
-        else:
-            update_status("⚠️ No recipients found, email not sent.")
-    except Exception as e:
-        update_status(f"⚠️ Email error: {e}")
-
-    update_status("🎉 Processing complete!")
-
-    return (
-        source_lang,
-        transcript,
-        share_text,
-        translated,
-        tts_path,
-        gemini_auto_response,
-        gemini_chat_response,
-        "\n".join(status_msgs),
-    )
 
 # Gradio UI
 with gr.Blocks(css="""
@@ -198,6 +133,8 @@ with gr.Blocks(css="""
             custom_query = gr.Textbox(label="💡 Ask AI Insight", placeholder="Type your question here...")
             extra_emails = gr.Textbox(label="📧 Extra Emails", placeholder="Enter emails separated by commas")
             submit_btn = gr.Button("🔎 Process Audio", variant="primary")
+            job_id_box = gr.Textbox(label="🆔 Job ID", placeholder="Paste a job ID to check its status")
+            check_btn = gr.Button("🔁 Check Job Status")
 
         # 📤 Output Panel
         with gr.Column(scale=2):
@@ -233,40 +170,66 @@ with gr.Blocks(css="""
                 output_auto = gr.Textbox(label="Gemini Auto Insight", lines=5, interactive=False)
                 output_chat = gr.Textbox(label="Gemini Chatbot Response", lines=5, interactive=False)
 
-    # 🔗 Helper to save files
-    def save_files(lang, transcript, summary):
-        """Save transcript & summary as downloadable files."""
-        os.makedirs("outputs", exist_ok=True)
-        ts_path, sm_path = None, None
-        if transcript:
-            ts_path = os.path.join("outputs", "transcript.txt")
-            with open(ts_path, "w", encoding="utf-8") as f:
-                f.write(transcript)
-        if summary:
-            sm_path = os.path.join("outputs", "summary.txt")
-            with open(sm_path, "w", encoding="utf-8") as f:
-                f.write(summary)
-        return ts_path, sm_path
+    # 🔴 Live meeting: transcript and summary while the meeting is still running
+    with gr.Row():
+        with gr.Column(scale=1):
+            gr.Markdown("### 🔴 Live Meeting\nRecord from the microphone; text appears after each pause.")
+            live_audio = gr.Audio(label="🎤 Microphone", type="numpy", streaming=True, **MIC_SOURCE)
+            live_state = gr.State(None)
+        with gr.Column(scale=2):
+            live_transcript = gr.Textbox(label="Live Transcript", lines=8, max_lines=30, interactive=False,
+                                         show_copy_button=True)
+            live_summary = gr.Markdown("⏳ Start recording to begin a live session.")
+            live_download = gr.File(label="⬇️ Download Live Transcript")
+
+    # 🗂️ Questions across every processed meeting (answered from the best-matching passages)
+    with gr.Row():
+        with gr.Column(scale=1):
+            archive_query = gr.Textbox(label="🗂️ Ask All Meetings",
+                                       placeholder="e.g. What did we decide about the vendor contract?")
+            archive_btn = gr.Button("🔎 Search Meetings")
+        with gr.Column(scale=2):
+            archive_answer = gr.Markdown()
 
     # 🔗 Button actions
+    job_outputs = [
+        output_lang,
+        output_transcript,
+        output_summary,
+        output_translated,
+        output_tts,
+        output_auto,
+        output_chat,
+        status_display,
+        job_id_box,
+        download_transcript,
+        download_summary,
+    ]
     submit_btn.click(
         fn=pipeline_with_status,
         inputs=[audio_input, lang_input, custom_query, extra_emails],
-        outputs=[
-            output_lang,
-            output_transcript,
-            output_summary,
-            output_translated,
-            output_tts,
-            output_auto,
-            output_chat,
-            status_display,
-        ],
-    ).then(
-        fn=save_files,
-        inputs=[output_lang, output_transcript, output_summary],
-        outputs=[download_transcript, download_summary],
+        outputs=job_outputs,
     )
+    check_btn.click(fn=follow_job, inputs=[job_id_box], outputs=job_outputs)
+    archive_btn.click(fn=ask_archive, inputs=[archive_query], outputs=[archive_answer])
+    archive_query.submit(fn=ask_archive, inputs=[archive_query], outputs=[archive_answer])
+    live_audio.stream(fn=live_stream, inputs=[live_audio, live_state],
+                      outputs=[live_state, live_transcript, live_summary])
+    live_audio.stop_recording(fn=live_finish, inputs=[live_state],
+                              outputs=[live_state, live_transcript, live_summary, live_download])
 
 if __name__ == "__main__":
-    ui.launch()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    # Prometheus-style metrics next to the UI (METRICS_PORT=0 disables; METRICS_HOST=0.0.0.0 to expose)
+    metrics_port = int(os.getenv("METRICS_PORT", "9464"))
+    if metrics_port:
+        metrics_host = os.getenv("METRICS_HOST", "127.0.0.1")
+        telemetry.serve(metrics_port, host=metrics_host)
+        print(f"📈 Metrics at http://{metrics_host}:{metrics_port}/metrics")
+    # generator handlers need the queue (default in Gradio 4, opt-in in 3.x)
+    ui.queue()
+    ui.launch(prevent_thread_lock=True)
+    # load Whisper and run a dummy inference once the UI is already serving (WARMUP=0 to skip)
+    if os.getenv("WARMUP", "1").lower() in ("1", "true", "yes"):
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    ui.block_thread()
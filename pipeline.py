@@ -0,0 +1,538 @@
+# pipeline.py
+"""
+Processing stages shared by the Gradio app: agents, transcription, TTS and
+the post-transcription stage graph (insights, analysis, TTS, notifications).
+"""
+import itertools
+import json
+import os
+import time
+from dotenv import load_dotenv
+from datetime import datetime
+
+import numpy as np
+
+# Agents & integrations (Whisper/torch are imported on first use, see _load_transcriber)
+from agents.lazy import Lazy
+from agents.llm_nlp import LLMNLP
+from agents.highlighter import HighlightAgent
+from agents.audio import SAMPLE_RATE, file_digest, stream_audio
+from agents.cache import TranscriptCache
+from agents.vad import TranscriptStitcher, segment_stream
+from agents.langid import detect_language
+from agents.live import LiveSession
+from agents.archive import MeetingArchive, format_context
+from agents.graph import StageGraph
+from agents.tts import file_extension, sentence_cache, synthesize_to_file
+from integrations.emailer import RECIPIENTS, SENDER
+from integrations.outbox import Outbox
+from integrations.gemini_api import get_gemini_response
+from integrations.llm_client import response_cache
+from telemetry import count, estimate_tokens, metrics, record_span, span, trace
+
+load_dotenv()
+
+# Agents
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+# ASR engine: "whisper" (fp32) or "whisper-int8" (quantised CPU), see agents/asr.py
+ASR_BACKEND = os.getenv("ASR_BACKEND", "whisper")
+# identifies the transcripts a configuration produces (cache key); fp32 keeps the plain model name
+ASR_MODEL_ID = WHISPER_MODEL if ASR_BACKEND == "whisper" else f"{WHISPER_MODEL}:{ASR_BACKEND}"
+# TRANSCRIBE_WORKERS > 1 spreads transcription over a process pool (one model per worker)
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "1"))
+
+
+def _load_transcriber():
+    with span("load_transcriber", model=WHISPER_MODEL, backend=ASR_BACKEND):
+        if TRANSCRIBE_WORKERS > 1:
+            from agents.pool import TranscriptionPool
+            return TranscriptionPool(model_name=WHISPER_MODEL, workers=TRANSCRIBE_WORKERS, backend=ASR_BACKEND)
+        from agents.transcriber import TranscriberAgent
+        return TranscriberAgent(model_name=WHISPER_MODEL, backend=ASR_BACKEND)
+
+
+# Heavy agents are built on first use (thread-safe, once), so importing this
+# module is cheap; warm_up() loads them ahead of the first job.
+transcriber = Lazy(_load_transcriber, "transcriber")
+# LLMNLP raises without an API key; lazily, that only fails the analysis stage
+nlp = Lazy(LLMNLP, "nlp")
+transcript_cache = Lazy(lambda: TranscriptCache(
+    cache_dir=os.getenv("TRANSCRIPT_CACHE_DIR", "outputs/cache/transcripts"),
+    max_bytes=int(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "500")) * 1024 * 1024,
+), "transcript_cache")
+
+
+def _log_delivery(message_id, status, error):
+    print(f"📤 Notification #{message_id}: {status}" + (f" ({error})" if error else ""))
+
+
+# Slack/email go through a durable outbox delivered by a background thread, started on
+# first use (warm_up() starts it with the app, so messages queued before a restart go out)
+outbox = Lazy(lambda: Outbox(os.getenv("OUTBOX_DB", "outputs/outbox.sqlite3"), on_status=_log_delivery).start(),
+              "outbox")
+highlighter = HighlightAgent()
+# every processed meeting's segments, full-text indexed for Q&A (see agents/archive.py);
+# the database is opened on first use
+archive = Lazy(lambda: MeetingArchive(os.getenv("ARCHIVE_DB", "outputs/archive.sqlite3")), "archive")
+
+# Config
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+# threads for the post-transcription stage graph
+STAGE_WORKERS = int(os.getenv("PIPELINE_STAGE_WORKERS", "6"))
+# concurrent TTS requests per job
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "4"))
+# live mode: seconds of audio between rolling summaries / re-transcriptions of the open utterance (0 = off)
+LIVE_SUMMARY_SECONDS = float(os.getenv("LIVE_SUMMARY_SECONDS", "60"))
+LIVE_PARTIAL_SECONDS = float(os.getenv("LIVE_PARTIAL_SECONDS", "3"))
+# token budget of the extractive condensation sent to the insight prompt and to each analysis
+# (map-reduce) piece; 0 = raw transcript
+CONDENSE_TOKENS = int(os.getenv("LLM_CONDENSE_TOKENS", "4000"))
+# transcript passages sent with a question
+ARCHIVE_TOP_K = int(os.getenv("ARCHIVE_TOP_K", "6"))
+
+QA_PROMPT = (
+    "Answer the question using only the meeting excerpts below. Mention the meeting and time of the "
+    "excerpts you rely on. If the excerpts do not contain the answer, say so.\n\n"
+    "Excerpts:\n{context}\n\n"
+    "Question: {question}"
+)
+
+
+def warm_up():
+    """
+    Load the heavy agents and run one dummy inference, so the first real job
+    does not pay for model loading or first-call setup, and start the outbox
+    dispatcher. Safe to run in a background thread while the UI is already serving.
+    """
+    with span("warm_up"):
+        agent = transcriber.get()
+        # one short buffer per pool worker (a single agent just runs them in turn)
+        noise = (0.01 * np.random.default_rng(0).standard_normal(SAMPLE_RATE)).astype(np.float32)
+        agent.transcribe_batch([noise] * max(1, TRANSCRIBE_WORKERS), language="en", batch_size=1)
+        try:
+            nlp.get()
+        except Exception as e:
+            print("⚠️ LLM agent not available:", e)
+        outbox.get()
+    print("🔥 Models warmed up.")
+
+
+# 🔹 Helper: TTS (sentence-split, parallel, cached; see agents/tts.py)
+def chunked_tts(text, lang="en", out_path="outputs/summary_audio.mp3"):
+    """Synthesise `text` into one audio file at `out_path` and return the path."""
+    return synthesize_to_file(text, out_path, lang=lang, max_workers=TTS_WORKERS)
+
+
+# 🔹 Helper: decode, detect language and transcribe one recording (streams progress)
+def meeting_id_for(digest):
+    """
+    Archive ID of a recording, from its file digest: processing the same file
+    again replaces its meeting instead of adding a duplicate, and different
+    files never share an ID whatever they are called.
+    """
+    return digest[:16]
+
+
+def iter_transcription(audio_path, digest=None):
+    """
+    Decode, detect language and transcribe one recording, reporting progress as
+    it goes. Yields ("language", code), then ("partial", transcript so far) after
+    every transcribed batch, and finally ("done", {"text", "language",
+    "segments", "cached"}).
+    A hash of the file's bytes (plus model name) is looked up in the transcript
+    cache first; on a hit detection and transcription are skipped. Hashing the
+    file rather than the decoded samples means the audio is decoded only once,
+    by the stream below.
+    Otherwise fixed windows are streamed from ffmpeg and the VAD segmenter
+    groups speech into chunks cut at pauses, so silence never reaches Whisper
+    and only about one chunk of audio is in memory at a time. The language is
+    voted from a few speech windows sampled across the file (agents/langid.py),
+    so leading silence or hold music does not decide it; chunks are transcribed
+    WHISPER_BATCH_SIZE at a time (spread over worker processes when
+    TRANSCRIBE_WORKERS > 1). Pass `digest` when the caller has already hashed
+    the file.
+    """
+    with span("cache_lookup"):
+        key = TranscriptCache.make_key(digest or file_digest(audio_path), ASR_MODEL_ID)
+        cached = transcript_cache.get().get(key)
+    if cached is not None:
+        yield "language", cached["language"]
+        yield "done", dict(cached, cached=True)
+        return
+
+    yield from transcribe_stream(audio_path, segment_stream(stream_audio(audio_path, window_seconds=30)), key)
+
+
+def transcribe_stream(audio_path, chunks, cache_key=None):
+    """
+    Language detection and ASR over the VAD chunks of one recording, with the
+    same events as iter_transcription. Shared by iter_transcription and the
+    batch runner (whose chunks come from a decoder thread); the result is
+    stored under `cache_key` when given.
+    """
+    with span("decode_first_chunk"):
+        first = next(chunks, None)
+    if first is None:
+        yield "done", {"text": "", "language": "", "segments": [], "cached": False}
+        return
+    with span("language_detection"):
+        source_lang = detect_language(audio_path, transcriber.get())
+    yield "language", source_lang
+
+    stitcher = TranscriptStitcher()
+    parts = transcriber.get().transcribe_chunks(
+        itertools.chain([first], chunks), language=source_lang, batch_size=WHISPER_BATCH_SIZE
+    )
+    # per-chunk spans cover decode + VAD + ASR since the previous chunk (time spent by our consumers excluded)
+    t_asr = t_prev = time.perf_counter()
+    for offset, part in parts:
+        now = time.perf_counter()
+        record_span("asr_chunk", now - t_prev, start=t_prev, offset=round(offset, 2))
+        stitcher.add(offset, part)
+        yield "partial", stitcher.text
+        t_prev = time.perf_counter()
+    record_span("transcription", time.perf_counter() - t_asr, start=t_asr)
+    result = dict(stitcher.result(), language=source_lang)
+    if result["text"] and cache_key is not None:
+        transcript_cache.get().put(cache_key, result)
+    yield "done", dict(result, cached=False)
+
+
+def transcribe_recording(audio_path):
+    """Blocking form of iter_transcription: returns the final result dict."""
+    for event, value in iter_transcription(audio_path):
+        if event == "done":
+            return value
+
+
+# 🔹 Helper: pick the translated summary out of the analysis
+def pick_translation(analysis, transcript, target_lang):
+    summary_bullets = analysis.get("summary", [])
+    translated = (
+        analysis.get("translation")
+        or (" ".join(summary_bullets) if summary_bullets else transcript)
+    )
+    if isinstance(translated, dict):
+        translated = translated.get(target_lang) or translated.get("en") or str(translated)
+    return translated
+
+
+# 🔹 Helper: markdown block shared to the UI, Slack and email
+def build_share_text(analysis, gemini_auto_response):
+    summary_bullets = analysis.get("summary", [])
+    action_items = analysis.get("actions", [])
+    decisions = analysis.get("decisions", [])
+    risks = analysis.get("risks", [])
+    sentiment = analysis.get("sentiment", "neutral")
+
+    text_block = ["**Meeting Summary**"] + [f"• {b}" for b in summary_bullets]
+    text_block += ["\n**Action Items**"] + ([f"- {a}" for a in action_items] if action_items else ["- (none)"])
+    text_block += ["\n**Decisions**"] + ([f"- {d}" for d in decisions] if decisions else ["- (none)"])
+    text_block += ["\n**Risks**"] + ([f"- {r}" for r in risks] if risks else ["- (none)"])
+    text_block.append(f"\n**Sentiment:** {sentiment}")
+    text_block.append("\n**Gemini Auto Insight:**")
+    text_block.append(gemini_auto_response)
+    return "\n".join(text_block)
+
+
+# 🔹 Helper: long transcripts are condensed to their key sentences before the LLM prompts
+def condense_transcript(transcript):
+    """The transcript cut down to CONDENSE_TOKENS by HighlightAgent (unchanged when it already fits)."""
+    if not CONDENSE_TOKENS:
+        return transcript
+    condensed = highlighter.condense(transcript, CONDENSE_TOKENS)
+    count("condense_tokens_total", estimate_tokens(transcript), side="input")
+    count("condense_tokens_total", estimate_tokens(condensed), side="output")
+    return condensed
+
+
+# 🔹 Helper: questions answered from the most relevant transcript passages only
+def answer_question(question, meeting_ids=None, k=None):
+    """
+    (answer, passages) for a question over some meetings (all when meeting_ids
+    is None). Only the top-k passages are sent; if none match, a single meeting
+    falls back to its opening passages.
+    """
+    k = k or ARCHIVE_TOP_K
+    with span("retrieval") as attrs:
+        hits = archive.get().search(question, k=k, meeting_ids=meeting_ids)
+        if not hits and meeting_ids and len(meeting_ids) == 1:
+            hits = archive.get().opening(meeting_ids[0], k=k)
+        attrs["passages"] = len(hits)
+    if not hits:
+        return "(No matching meeting content found)", []
+    prompt = QA_PROMPT.format(context=format_context(hits), question=question.strip())
+    return get_gemini_response(prompt), hits
+
+
+def ask_archive(question):
+    """Markdown answer to a question across every archived meeting, with its sources."""
+    if not (question or "").strip():
+        return "💡 Type a question about your past meetings."
+    answer, hits = answer_question(question)
+    sources = [f"- {h['title'] or h['meeting_id']} ({h['meeting_id']})" for h in hits]
+    return "\n".join([answer, "", f"**Sources** ({archive.get().count()} meetings searched)"] + list(dict.fromkeys(sources)))
+
+
+def email_summary(share_text, extra_emails):
+    """Queue the summary for the configured + extra recipients; returns a status line."""
+    if not SENDER:
+        return "⚠️ Email not configured, email not sent."
+    final_recipients = RECIPIENTS.copy() if RECIPIENTS else []
+    if extra_emails:
+        emails = [e.strip() for e in extra_emails.split(",") if "@" in e]
+        final_recipients.extend(emails)
+    if not final_recipients:
+        return "⚠️ No recipients found, email not sent."
+    message_id = outbox.get().enqueue_email("Meeting Summary", share_text, final_recipients)
+    return f"📤 Email #{message_id} queued for: {', '.join(final_recipients)}"
+
+
+def build_stage_graph(transcript, segments, target_lang, custom_query, extra_emails, meeting_id, out_dir="outputs",
+                      notify=True, title=None):
+    """
+    Everything after transcription, as a dependency graph:
+
+        condense ─> auto_insight ─┐
+        analysis ─────────────────┼─> share_text ─> slack, email
+                                  └─> translation ─> tts
+        archive ─> chat
+
+    The auto insight reads the condensed transcript (its key sentences within
+    CONDENSE_TOKENS). Analysis splits the raw transcript for map-reduce first
+    and condenses each piece, so condensation never hides a long meeting from
+    the map-reduce split. The three LLM calls run concurrently,
+    then TTS overlaps with queueing the Slack/email notifications (delivered
+    in the background by the outbox).
+    Each stage falls back to its default on error so one failure does not
+    take the other outputs down. With notify=False the Slack/email stages are left out.
+    The meeting is archived under `meeting_id` (see meeting_id_for), and the
+    chat question is answered from its most relevant passages.
+    """
+    graph = StageGraph(max_workers=STAGE_WORKERS)
+    graph.add("archive", lambda: archive.get().add_meeting(meeting_id, segments, transcript, title=title), default=0)
+    graph.add("condense", lambda: condense_transcript(transcript), default=transcript)
+    graph.add("auto_insight", lambda condense: get_gemini_response(condense), deps=["condense"],
+              default="(Gemini API failed)")
+    # chat waits for the archive stage, so the question can be answered from this meeting's passages
+    graph.add(
+        "chat",
+        lambda archive: (answer_question(custom_query, meeting_ids=[meeting_id])[0]
+                         if custom_query.strip() else "(No custom query provided)"),
+        deps=["archive"], default="(Gemini API failed)",
+    )
+    graph.add("analysis", lambda: nlp.get().analyze(transcript, target_lang, segments=segments,
+                                                    condense=condense_transcript),
+              default={})
+    graph.add("translation", lambda analysis: pick_translation(analysis, transcript, target_lang),
+              deps=["analysis"], default=transcript)
+    graph.add("share_text", lambda analysis, auto_insight: build_share_text(analysis, auto_insight),
+              deps=["analysis", "auto_insight"], default="")
+
+    def tts(translation):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        tts_path = os.path.join(out_dir, f"summary_audio_{timestamp}.{file_extension()}")
+        return chunked_tts(translation, lang=target_lang if target_lang else "en", out_path=tts_path)
+
+    def slack(share_text):
+        message_id = outbox.get().enqueue_slack(share_text)
+        return f"📤 Slack message #{message_id} queued." if message_id else "⚠️ Slack not configured."
+
+    graph.add("tts", tts, deps=["translation"], default=None)
+    if notify:
+        graph.add("slack", slack, deps=["share_text"])
+        graph.add("email", lambda share_text: email_summary(share_text, extra_emails), deps=["share_text"])
+    return graph
+
+
+def save_outputs(out_dir, transcript, summary):
+    """Save transcript & summary as downloadable files in the job's own directory."""
+    os.makedirs(out_dir, exist_ok=True)
+    ts_path, sm_path = None, None
+    if transcript:
+        ts_path = os.path.join(out_dir, "transcript.txt")
+        with open(ts_path, "w", encoding="utf-8") as f:
+            f.write(transcript)
+    if summary:
+        sm_path = os.path.join(out_dir, "summary.txt")
+        with open(sm_path, "w", encoding="utf-8") as f:
+            f.write(summary)
+    return ts_path, sm_path
+
+
+# 🔹 Live mode: microphone stream -> incremental transcript + rolling summary (see agents/live.py)
+def start_live_session():
+    """A LiveSession on the shared transcriber, summarised by the LLM agent every LIVE_SUMMARY_SECONDS."""
+    def summarize(previous, new_text):
+        return nlp.get().update_summary(previous, new_text)
+
+    return LiveSession(transcriber.get(), summarizer=summarize,
+                       partial_every_s=LIVE_PARTIAL_SECONDS, summary_every_s=LIVE_SUMMARY_SECONDS)
+
+
+def live_summary_markdown(session):
+    """Markdown for the rolling summary of a live session."""
+    if session.summary is None:
+        note = f"⚠️ {session.summary_error}" if session.summary_error else "⏳ The first summary follows shortly..."
+        return f"**Live Summary**\n{note}"
+    summary = session.summary
+    text_block = ["**Live Summary**"] + [f"• {b}" for b in summary.get("summary", [])]
+    for title, key in (("Action Items", "actions"), ("Decisions", "decisions"), ("Risks", "risks")):
+        items = summary.get(key, [])
+        text_block += [f"\n**{title}**"] + ([f"- {i}" for i in items] if items else ["- (none)"])
+    return "\n".join(text_block)
+
+
+def cache_stats():
+    """Hit/miss counts and hit rate of the transcript, LLM response and TTS sentence caches."""
+    tts_lookups = sentence_cache.hits + sentence_cache.misses
+    return {
+        **({"transcript": transcript_cache.get().stats()} if transcript_cache.loaded else {}),
+        "llm": response_cache.stats(),
+        "tts": {"hits": sentence_cache.hits, "misses": sentence_cache.misses,
+                "hit_rate": sentence_cache.hits / tts_lookups if tts_lookups else 0.0},
+    }
+
+
+def _telemetry_gauges():
+    for name, stats in cache_stats().items():
+        yield "cache_hits", {"cache": name}, stats["hits"]
+        yield "cache_misses", {"cache": name}, stats["misses"]
+        yield "cache_hit_ratio", {"cache": name}, stats["hit_rate"]
+    if outbox.loaded:
+        yield "outbox_pending", {}, outbox.get().pending()
+    if archive.loaded:
+        yield "archived_meetings", {}, archive.get().count()
+
+
+metrics.register_collector(_telemetry_gauges)
+
+# spans shown in the one-line timing summary (sub-steps such as asr_chunk/llm are in the report)
+SUMMARY_SPANS = ("cache_lookup", "language_detection", "transcription", "analysis", "auto_insight",
+                 "chat", "tts")
+
+
+def timing_summary(report):
+    """'⏱️ 41.2s total: transcription 30.1s, analysis 7.9s, ...' from a telemetry report."""
+    stages = [(n, report["stages"][n]["total_s"]) for n in SUMMARY_SPANS if n in report["stages"]]
+    parts = ", ".join(f"{n} {t:.1f}s" for n, t in sorted(stages, key=lambda x: -x[1]))
+    return f"⏱️ {report['wall_s']:.1f}s total" + (f": {parts}" if parts else "")
+
+
+STAGE_LABELS = {
+    "auto_insight": "AI insight", "chat": "Chatbot", "analysis": "NLP analysis",
+    "translation": "Translation", "share_text": "Summary", "tts": "TTS",
+    "slack": "Slack", "email": "Email", "archive": "Archive", "condense": "Condensation",
+}
+# stage name -> key in run_pipeline's snapshot dict
+STAGE_OUTPUTS = {
+    "auto_insight": "auto", "chat": "chat", "share_text": "summary",
+    "translation": "translated", "tts": "tts",
+}
+STAGE_DONE = {
+    "auto_insight": "🤖 AI insight ready.",
+    "analysis": "🔍 NLP analysis ready.",
+    "tts": "🔊 TTS summary audio ready.",
+}
+
+
+def run_pipeline(audio_path, target_lang, custom_query, extra_emails, out_dir="outputs", title=None):
+    """
+    Full processing of one recording as a generator: yields a snapshot dict
+    (lang, transcript, summary, translated, tts, auto, chat, status,
+    transcript_file, summary_file) every time something new is available, so
+    callers can show results progressively. All files go to `out_dir`.
+    `title` names the meeting in the archive (default: the file name).
+    The whole run is traced; the last snapshot also carries the per-job
+    telemetry report (`report`, saved as `metrics_file`).
+    """
+    with trace(os.path.basename(os.path.abspath(out_dir))) as job_trace:
+        last = None
+        for last in _run_stages(audio_path, target_lang, custom_query, extra_emails, out_dir, title):
+            yield last
+        if not audio_path or last is None:
+            return
+        report = job_trace.report(caches=cache_stats())
+        metrics_file = os.path.join(out_dir, "metrics.json")
+        os.makedirs(out_dir, exist_ok=True)
+        with open(metrics_file, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        yield dict(last, report=report, metrics_file=metrics_file,
+                   status=f"{last['status']}\n{timing_summary(report)}")
+
+
+def _run_stages(audio_path, target_lang, custom_query, extra_emails, out_dir, title=None):
+    status_msgs = []
+    out = {
+        "lang": "", "transcript": "", "summary": "", "translated": "", "tts": None,
+        "auto": "(No auto insight)", "chat": "(No chatbot query)",
+        "transcript_file": None, "summary_file": None,
+    }
+
+    def update_status(msg):
+        status_msgs.append(msg)
+        return "\n".join(status_msgs)
+
+    def snapshot():
+        return dict(out, status="\n".join(status_msgs))
+
+    # 1. Check input
+    if not audio_path:
+        out["summary"] = "No audio uploaded"
+        update_status("❌ No audio uploaded")
+        yield snapshot()
+        return
+
+    # 2 + 3. Language detection + transcription (served from the transcript cache when possible)
+    update_status("⏳ Detecting language...")
+    yield snapshot()
+    result = None
+    try:
+        digest = file_digest(audio_path)
+        for event, value in iter_transcription(audio_path, digest):
+            if event == "language":
+                out["lang"] = value
+                update_status(f"🗣️ Detected language: {value}")
+                update_status("🎙️ Transcribing speech (silence skipped)...")
+            elif event == "partial":
+                out["transcript"] = value
+            else:
+                result = value
+                out["transcript"] = result["text"]
+                if result.get("cached"):
+                    update_status(f"♻️ Reused cached transcript (language: {result['language']})")
+            yield snapshot()
+    except Exception as e:
+        out["summary"] = "Error in transcription"
+        update_status(f"❌ Transcription error: {e}")
+        yield snapshot()
+        return
+
+    transcript = result["text"]
+    if not transcript:
+        out["summary"] = "Empty transcript"
+        update_status("❌ Transcript is empty")
+        yield snapshot()
+        return
+
+    # 4-8. Insights, NLP analysis, TTS and notifications run as a stage graph:
+    # independent stages overlap, each one's failure is reported but isolated,
+    # and every finished stage is pushed to the UI right away.
+    update_status("🤖 Generating AI insights and analyzing transcript...")
+    yield snapshot()
+    graph = build_stage_graph(transcript, result.get("segments", []), target_lang, custom_query, extra_emails,
+                              meeting_id_for(digest), out_dir=out_dir, title=title or os.path.basename(audio_path))
+    for stage in graph.run_iter():
+        if stage.name in STAGE_OUTPUTS:
+            out[STAGE_OUTPUTS[stage.name]] = stage.value
+        if stage.error is not None:
+            update_status(f"⚠️ {STAGE_LABELS[stage.name]} error: {stage.error}")
+        elif stage.name in ("slack", "email"):
+            update_status(stage.value)
+        elif stage.name in STAGE_DONE:
+            update_status(f"{STAGE_DONE[stage.name]} ({stage.seconds:.1f}s)")
+        yield snapshot()
+
+    out["transcript_file"], out["summary_file"] = save_outputs(out_dir, transcript, out["summary"])
+    update_status("🎉 Processing complete!")
+    yield snapshot()
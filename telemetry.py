@@ -0,0 +1,296 @@
+# telemetry.py
+"""
+Timing spans and metrics for the pipeline.
+
+`span(name)` times a block. Every span feeds the process-wide `metrics`
+registry (a `stage_seconds` histogram). If a job trace is active (`trace(job_id)`),
+the span is also recorded in that trace, which produces a structured per-job
+report: spans, per-stage totals, LLM character and token counts, cache hit
+rates and peak RSS.
+
+The active trace lives in a context variable. Work handed to thread pools is
+wrapped with `propagate(fn)` so that its spans land in the submitting job's trace.
+
+`metrics.render()` produces the Prometheus text exposition format, and
+`serve(port)` exposes it at /metrics on a background HTTP thread.
+"""
+import bisect
+import contextvars
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+log = logging.getLogger(__name__)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+PREFIX = "meeting_"
+
+Labels = Tuple[Tuple[str, str], ...]
+# collector() -> iterable of (metric name, {labels}, value) gauge samples, read at render time
+Collector = Callable[[], Iterable[Tuple[str, Dict[str, str], float]]]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or None where the platform does not report it."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token); providers are called through text-only APIs."""
+    return (len(text) + 3) // 4
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Thread-safe counters, histograms and gauge collectors."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], List] = {}  # [bucket counts, sum, count]
+        self._collectors: List[Collector] = []
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _labels(labels: Dict[str, object]) -> Labels:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = (name, self._labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, self._labels(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            idx = bisect.bisect_left(self.buckets, value)
+            if idx < len(self.buckets):
+                hist[0][idx] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get((name, self._labels(labels)), 0.0)
+
+    def gauges(self) -> List[Tuple[str, Dict[str, str], float]]:
+        samples = [("process_peak_rss_bytes", {}, float(peak_rss_bytes() or 0))]
+        for collector in self._collectors:
+            try:
+                samples.extend(collector())
+            except Exception as e:
+                log.warning("metrics collector failed: %s", e)
+        return samples
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        def fmt(labels) -> str:
+            labels = labels.items() if isinstance(labels, dict) else labels
+            inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            return "{" + inner + "}" if inner else ""
+
+        lines = []
+        typed = set()
+
+        def header(name: str, kind: str) -> None:
+            if name not in typed:
+                typed.add(name)
+                if name[len(PREFIX):] in self._help:
+                    lines.append(f"# HELP {name} {self._help[name[len(PREFIX):]]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._histograms.items())
+        for (name, labels), value in counters:
+            full = PREFIX + name
+            header(full, "counter")
+            lines.append(f"{full}{fmt(labels)} {value:g}")
+        for (name, labels), (counts, total, count) in histograms:
+            full = PREFIX + name
+            header(full, "histogram")
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{full}_bucket{fmt(labels + (('le', f'{bound:g}'),))} {cumulative}")
+            lines.append(f"{full}_bucket{fmt(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{full}_sum{fmt(labels)} {total:g}")
+            lines.append(f"{full}_count{fmt(labels)} {count}")
+        for name, labels, value in sorted(self.gauges(), key=lambda s: s[0]):
+            full = PREFIX + name
+            header(full, "gauge")
+            lines.append(f"{full}{fmt(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.describe("stage_seconds", "Duration of pipeline stages and sub-steps")
+metrics.describe("llm_requests_total", "LLM completions by provider and cache outcome")
+metrics.describe("llm_tokens_total", "Estimated LLM tokens (4 chars/token) by provider and direction")
+metrics.describe("llm_chars_total", "LLM prompt/response characters by provider and direction")
+
+
+class Trace:
+    """Spans and counters of one job."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.started = time.perf_counter()
+        self.spans: List[Dict] = []
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, start: float, seconds: float, attrs: Dict) -> None:
+        with self._lock:
+            self.spans.append({"name": name, "start_s": round(start - self.started, 4),
+                               "seconds": round(seconds, 4), **attrs})
+
+    def add(self, counter: str, value: float = 1.0) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0.0) + value
+
+    def stage_totals(self) -> Dict[str, Dict[str, float]]:
+        totals: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            t = totals.setdefault(s["name"], {"count": 0, "total_s": 0.0, "max_s": 0.0})
+            t["count"] += 1
+            t["total_s"] = round(t["total_s"] + s["seconds"], 4)
+            t["max_s"] = max(t["max_s"], s["seconds"])
+        return totals
+
+    def report(self, caches: Optional[Dict] = None) -> Dict:
+        """Structured, JSON-serialisable summary of the job."""
+        rss = peak_rss_bytes()
+        with self._lock:
+            spans, counters = list(self.spans), dict(self.counters)
+        return {
+            "job_id": self.job_id,
+            "wall_s": round(time.perf_counter() - self.started, 4),
+            "stages": self.stage_totals(),
+            "counters": counters,
+            "caches": caches or {},
+            # high-water mark of the whole process so far, not of this job (jobs share the process)
+            "process_peak_rss_mb": round(rss / (1024 * 1024), 1) if rss else None,
+            "spans": spans,
+        }
+
+
+_current: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def trace(job_id: str) -> Iterator[Trace]:
+    """Make a new Trace the active one for the enclosed block."""
+    t = Trace(job_id)
+    token = _current.set(t)
+    try:
+        yield t
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:  # generator finalised in another context
+            pass
+
+
+def record_span(name: str, seconds: float, start: Optional[float] = None, **attrs) -> None:
+    """Record an already-measured duration as a span."""
+    metrics.observe("stage_seconds", seconds, stage=name)
+    t = _current.get()
+    if t is not None:
+        t.add_span(name, start if start is not None else time.perf_counter() - seconds, seconds, attrs)
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Dict]:
+    """Time the enclosed block; the yielded dict can be filled with extra attributes."""
+    t0 = time.perf_counter()
+    try:
+        yield attrs
+    except Exception as e:
+        attrs["error"] = type(e).__name__
+        metrics.inc("stage_errors_total", stage=name)
+        raise
+    finally:
+        record_span(name, time.perf_counter() - t0, start=t0, **attrs)
+
+
+def count(name: str, value: float = 1.0, **labels) -> None:
+    """Increment a counter in the registry and in the active trace."""
+    metrics.inc(name, value, **labels)
+    t = _current.get()
+    if t is not None:
+        suffix = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+        t.add(f"{name}{{{suffix}}}" if suffix else name, value)
+
+
+def propagate(fn: Callable) -> Callable:
+    """Wrap `fn` so it runs under the caller's active trace (for thread pool workers)."""
+    t = _current.get()
+    if t is None:
+        return fn
+
+    def run(*args, **kwargs):
+        token = _current.set(t)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve /metrics on a daemon thread; returns the server (server_address has
+    the bound port). Local only by default; pass host="0.0.0.0" to expose it.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
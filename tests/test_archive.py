@@ -0,0 +1,63 @@
+import pytest
+
+from agents.archive import MeetingArchive, build_passages, format_context, match_expression
+from benchmarks.synthetic import synthetic_transcript
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return MeetingArchive(str(tmp_path / "archive.sqlite3"))
+
+
+def _segments(text, seconds_per_segment=5.0):
+    sentences = [s.strip() + "." for s in text.split(".") if s.strip()]
+    return [{"start": i * seconds_per_segment, "end": (i + 1) * seconds_per_segment, "text": s}
+            for i, s in enumerate(sentences)]
+
+
+def test_passages_group_consecutive_segments_with_their_time_range():
+    segments = _segments(synthetic_transcript(600, seed=1))
+    passages = build_passages(segments, max_words=50)
+    assert all(len(p["text"].split()) <= 50 for p in passages)
+    assert " ".join(p["text"] for p in passages) == " ".join(s["text"] for s in segments)
+    assert passages[0]["start"] == 0.0 and passages[1]["start"] == passages[0]["end"]
+    # plain text (no segments) is split on sentences, without times
+    assert build_passages([], "One. Two three.", max_words=2) == [
+        {"text": "One.", "start": None, "end": None}, {"text": "Two three.", "start": None, "end": None}]
+    # unpunctuated Whisper text still makes passages of bounded size
+    run_on = " ".join(["word"] * 200)
+    assert [len(p["text"].split()) for p in build_passages([], run_on)] == [80, 80, 40]
+
+
+def test_question_retrieves_top_k_passages_across_meetings(archive):
+    for i in range(30):
+        archive.add_meeting(f"standup_{i}", _segments(synthetic_transcript(1800, seed=i)), title=f"Standup {i}")
+    archive.add_meeting("vendor_review", _segments(
+        "Welcome everyone. The Acme contract renewal was rejected because of the pricing. "
+        "We will look for another supplier before March."), title="Vendor review")
+
+    hits = archive.search("Why was the Acme contract rejected?", k=3)
+    assert hits[0]["meeting_id"] == "vendor_review"
+    assert "rejected" in hits[0]["text"] and hits[0]["start"] == 0.0
+    assert len(hits) <= 3
+    # stemming: "suppliers" finds "supplier"; scoping limits the meetings searched
+    assert archive.search("suppliers", meeting_ids=["vendor_review"])[0]["title"] == "Vendor review"
+    assert archive.search("suppliers", meeting_ids=["standup_0", "standup_1"]) == []
+    # the prompt context stays small however many meetings are archived
+    assert len(format_context(archive.search("release migration budget", k=6)).split()) < 6 * 100
+    assert archive.count() == 31
+
+
+def test_reindexing_a_meeting_replaces_its_passages(archive):
+    archive.add_meeting("m1", _segments("The launch slips to June."))
+    archive.add_meeting("m1", _segments("The launch stays in May."))
+    assert [h["text"] for h in archive.search("launch")] == ["The launch stays in May."]
+    assert archive.meetings()[0]["passage_count"] == 1
+    assert archive.opening("m1")[0]["text"] == "The launch stays in May."
+
+
+def test_questions_are_safe_fts_expressions(archive):
+    archive.add_meeting("m1", _segments('We discussed NOT "shipping" (near) the OR-gate.'))
+    assert match_expression("what is the?") is None
+    assert match_expression('NOT "near" OR*') == '"not" OR "near"'
+    assert archive.search('NOT near OR "gate') and archive.search("the and of") == []
@@ -0,0 +1,46 @@
+import pytest
+
+from agents import asr
+from agents.asr import get_engine, register_engine
+
+
+def test_engine_selected_from_env(monkeypatch):
+    monkeypatch.delenv("ASR_BACKEND", raising=False)
+    assert get_engine().name == "whisper"
+    monkeypatch.setenv("ASR_BACKEND", "whisper-int8")
+    assert get_engine().name == "whisper-int8"
+    assert get_engine("whisper").name == "whisper"
+    with pytest.raises(ValueError):
+        get_engine("nope")
+
+
+def test_register_engine():
+    class Fake:
+        name = "fake"
+
+        def load(self, model_name, device=None):
+            return f"model:{model_name}"
+
+    register_engine(Fake())
+    try:
+        assert get_engine("fake").load("tiny") == "model:tiny"
+    finally:
+        asr.ENGINES.pop("fake")
+
+
+def test_quantised_linears_replace_whisper_subclass():
+    torch = pytest.importorskip("torch")
+
+    class CastingLinear(torch.nn.Linear):  # stands in for whisper.model.Linear
+        pass
+
+    model = torch.nn.Sequential(CastingLinear(8, 4), torch.nn.ReLU(), torch.nn.Sequential(CastingLinear(4, 2)))
+    x = torch.randn(3, 8)
+    expected = model(x)
+    asr._use_plain_linear(model)
+    assert all(type(m) is not CastingLinear for m in model.modules())
+    assert torch.allclose(model(x), expected)
+
+    quantised = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    assert not any(type(m) is torch.nn.Linear for m in quantised.modules())
+    assert torch.allclose(quantised(x), expected, atol=0.1)
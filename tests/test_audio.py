@@ -0,0 +1,27 @@
+import shutil
+
+import pytest
+
+np = pytest.importorskip("numpy")
+if shutil.which("ffmpeg") is None:
+    pytest.skip("ffmpeg not installed", allow_module_level=True)
+
+from agents.audio import SAMPLE_RATE, decode_audio, stream_audio
+from benchmarks.synthetic import synthetic_speech, write_wav
+
+
+def test_stream_audio_yields_full_16k_windows_and_a_short_tail(tmp_path):
+    path = write_wav(str(tmp_path / "meeting.wav"), synthetic_speech(7.5, seed=1))
+    windows = list(stream_audio(path, window_seconds=2))
+
+    assert [len(w) for w in windows] == [2 * SAMPLE_RATE] * 3 + [int(1.5 * SAMPLE_RATE)]
+    assert all(w.dtype == np.float32 and np.abs(w).max() <= 1.0 for w in windows)
+    np.testing.assert_array_equal(np.concatenate(windows), decode_audio(path))
+
+
+def test_stream_audio_resamples_to_16k(tmp_path):
+    path = write_wav(str(tmp_path / "phone.wav"), synthetic_speech(3.0, seed=2)[::2], sr=8000)
+    windows = list(stream_audio(path, window_seconds=1))
+
+    assert all(len(w) == SAMPLE_RATE for w in windows[:-1]) and 0 < len(windows[-1]) <= SAMPLE_RATE
+    assert sum(map(len, windows)) == pytest.approx(3 * SAMPLE_RATE, abs=SAMPLE_RATE // 100)
@@ -0,0 +1,103 @@
+import json
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("dotenv")
+
+import batch
+import pipeline
+from agents.vad import SpeechChunk
+
+# file -> number of chunks the fake decoder sends
+CHUNKS = {0: 5, 1: 3, 2: 3}
+
+
+class FakeASR:
+    """Whisper stand-in that fails the batch holding chunk `fail_at` of a file."""
+
+    def __init__(self, fail_at):
+        self.fail_at = fail_at
+
+    def transcribe_chunks(self, chunks, language=None, batch_size=8):
+        pending = []
+        for chunk in chunks:
+            pending.append(chunk)
+            if len(pending) == batch_size:
+                yield from self._batch(pending)
+                pending = []
+        yield from self._batch(pending)
+
+    def _batch(self, pending):
+        for chunk in pending:
+            file_idx, n = divmod(int(chunk.start), 100)
+            if self.fail_at.get(file_idx) == n:
+                raise RuntimeError(f"CUDA out of memory in file {file_idx}")
+        return [(c.start, {"text": f"chunk {int(c.start)}", "segments": []}) for c in pending]
+
+
+class NullCache:
+    def put(self, key, result):
+        pass
+
+
+def fake_decoder(items, chunk_queue):
+    for idx in range(len(items)):
+        chunk_queue.put(("start", idx, {"key": f"key{idx}", "digest": f"d{idx}", "duration": 60.0, "cached": None}))
+        for n in range(CHUNKS[idx]):
+            chunk_queue.put(("chunk", idx, SpeechChunk(np.zeros(10, np.float32), idx * 100 + n)))
+        chunk_queue.put(("end", idx, None))
+    chunk_queue.put(batch._END)
+
+
+@pytest.fixture
+def fake_asr(monkeypatch):
+    def install(fail_at):
+        monkeypatch.setattr(pipeline, "transcriber", pipeline.Lazy(lambda: FakeASR(fail_at)))
+        monkeypatch.setattr(pipeline, "detect_language", lambda path, asr: "en")
+        monkeypatch.setattr(pipeline, "WHISPER_BATCH_SIZE", 2)
+        monkeypatch.setattr(pipeline, "transcript_cache", pipeline.Lazy(lambda: NullCache()))
+        monkeypatch.setattr(batch, "_decoder", fake_decoder)
+        monkeypatch.setattr(batch, "finish_file", lambda item, result, out_dir, notify, meeting_id:
+                            {"text": result["text"], "meeting_id": meeting_id})
+    return install
+
+
+def _run(tmp_path):
+    items = [{"path": f"meeting{i}.wav", "target_lang": "en", "custom_query": ""} for i in CHUNKS]
+    thread = threading.Thread(target=batch.run_batch, args=(items, str(tmp_path)), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "batch hung"
+    with open(tmp_path / "batch_report.json") as f:
+        return json.load(f)["files"]
+
+
+def test_asr_error_mid_file_and_in_last_batch_only_fails_that_file(fake_asr, tmp_path):
+    # file 0 fails in its first batch (chunks still queued); file 2 in its last batch (end marker already read)
+    fake_asr({0: 1, 2: 2})
+    report = _run(tmp_path)
+    assert [r["status"] for r in report] == ["error", "ok", "error"]
+    assert "file 0" in report[0]["error"] and "file 2" in report[2]["error"]
+    assert report[1]["text"] == "chunk 100 chunk 101 chunk 102"
+    # archived under the file's digest, not its position in the batch
+    assert report[1]["meeting_id"] == pipeline.meeting_id_for("d1")
+
+
+def test_decode_error_inside_a_file_is_followed_by_its_end_marker():
+    chunk_queue = batch.queue.Queue()
+    for msg in [("chunk", 0, "a"), ("error", 0, RuntimeError("corrupt frame")), ("end", 0, None),
+                ("start", 1, {})]:
+        chunk_queue.put(msg)
+    chunks = batch._FileChunks(chunk_queue, 0)
+    assert next(chunks) == "a"
+    with pytest.raises(RuntimeError, match="corrupt frame"):
+        next(chunks)
+    chunks.drain()
+    assert chunks.ended and chunk_queue.get()[:2] == ("start", 1)
+
+    # running past the file's end is a desync, not a per-file error
+    chunk_queue.put(("chunk", 1, "b"))
+    with pytest.raises(batch.QueueDesync):
+        batch._FileChunks(chunk_queue, 0).drain()
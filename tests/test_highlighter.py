@@ -0,0 +1,94 @@
+import json
+import random
+
+import pytest
+
+from agents.highlighter import GAP, HighlightAgent, split_sentences
+from telemetry import estimate_tokens
+
+CHATTER = ("so yeah I think that was the general idea okay right and then we looked at the numbers "
+           "again yesterday honestly it was pretty much as expected anyway moving on sure").split()
+ACTIONS = [
+    "Priya will send the revised vendor contract by Friday.",
+    "Tom is going to update the onboarding checklist before the next sprint.",
+    "Action item for Lena: book the venue for the offsite.",
+]
+DECISIONS = ["We agreed to keep the current pricing for Q3."]
+
+
+def long_transcript(minutes: int, seed: int = 0) -> str:
+    """About 150 words per minute of filler chatter with the action items and decisions spread through it."""
+    rng = random.Random(seed)
+    sentences = [" ".join(rng.choice(CHATTER) for _ in range(rng.randint(8, 16))).capitalize() + "."
+                 for _ in range(minutes * 150 // 12)]
+    for i, s in enumerate(ACTIONS + DECISIONS):
+        sentences.insert((i + 1) * len(sentences) // 5, s)
+    return " ".join(sentences)
+
+
+def test_sentence_segmentation():
+    text = "Dr. Lee joined at 9.30 today. Costs rose 2.5%, e.g. for cloud! Is that final?\nno punctuation here"
+    assert [text[s:e].strip() for s, e in split_sentences(text)] == [
+        "Dr. Lee joined at 9.30 today.", "Costs rose 2.5%, e.g. for cloud!", "Is that final?", "no punctuation here"]
+    run_on = " ".join(["word"] * 100)
+    assert [len(run_on[s:e].split()) for s, e in split_sentences(run_on, max_words=40)] == [40, 40, 20]
+
+
+def test_extract_uses_categories_and_word_boundaries():
+    agent = HighlightAgent()
+    text = "The planet is far. We plan the launch. Risky? Maybe. Sam will follow up. Nothing else."
+    assert agent.extract(text) == ["We plan the launch.", "Risky?", "Sam will follow up."]
+
+
+def test_short_transcripts_are_not_condensed():
+    text = "Short meeting. Sam will follow up."
+    assert HighlightAgent().condense(text, token_budget=100) is text
+
+
+def test_condensed_prompt_keeps_action_items_and_is_much_smaller():
+    transcript = long_transcript(120)
+    condensed = HighlightAgent().condense(transcript, token_budget=1500)
+
+    assert estimate_tokens(condensed) <= 1500
+    assert estimate_tokens(condensed) < estimate_tokens(transcript) / 10
+    assert all(s in condensed for s in ACTIONS + DECISIONS)
+    assert condensed.startswith(GAP)
+
+
+def test_analysis_condenses_each_map_piece(monkeypatch, tmp_path):
+    pytest.importorskip("dotenv")
+    from agents import llm_nlp
+    from agents.llm_nlp import LLMNLP
+    from integrations import llm_client
+    from integrations.llm_client import ResponseCache
+
+    prompts = []
+
+    def fake(model, prompt, system):
+        if "Partial summaries" in prompt:
+            return json.dumps({"summary": ["merged"], "translation": "merged", "sentiment": "neutral"})
+        prompts.append(prompt)
+        return json.dumps({"summary": ["part"], "actions": [s for s in ACTIONS if s in prompt],
+                           "decisions": [], "risks": [], "sentiment": "neutral"})
+
+    monkeypatch.setitem(llm_client.PROVIDERS, "fake-sized", fake)
+    monkeypatch.setenv("LLM_PROVIDER", "fake-sized")
+    monkeypatch.setattr(llm_client, "response_cache", ResponseCache(cache_dir=str(tmp_path)))
+    monkeypatch.setattr(llm_nlp, "MAP_CONCURRENCY", 2)
+    # smaller pieces, so a one-hour meeting takes several map calls
+    monkeypatch.setattr(llm_nlp, "PROMPT_BUDGET_CHARS", 20_000)
+    nlp = LLMNLP()
+    agent = HighlightAgent()
+    transcript = long_transcript(60)
+    assert len(transcript) > 2 * llm_nlp.PROMPT_BUDGET_CHARS
+
+    raw = nlp.analyze(transcript, "en")
+    raw_prompts = list(prompts)
+    prompts.clear()
+    short = nlp.analyze(transcript, "en", condense=lambda piece: agent.condense(piece, token_budget=500))
+
+    # the raw transcript decides the map-reduce split; condensation only shrinks each piece
+    assert len(prompts) == len(raw_prompts) > 2
+    assert all(len(p) < 500 * 4 + 200 for p in prompts)
+    assert sum(map(len, prompts)) < sum(map(len, raw_prompts)) / 5
+    assert sorted(short["actions"]) == sorted(raw["actions"]) == sorted(ACTIONS)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from agents import langid
+from agents.audio import SAMPLE_RATE
+from agents.langid import candidate_offsets, detect_language, sample_speech_windows, vote
+from benchmarks.synthetic import synthetic_speech, write_wav
+
+
+class FakeTranscriber:
+    """Leans German on a steady tone (hold music, diffuse like real Whisper) and English otherwise; cannot transcribe."""
+    detected_lang = "en"
+
+    def __init__(self):
+        self.calls = []
+
+    def language_probs(self, audios):
+        self.calls.append(len(audios))
+        out = []
+        for a in audios:
+            frames = a[:len(a) // 480 * 480].reshape(-1, 480)
+            steady = np.std(np.sqrt(np.mean(frames ** 2, axis=1))) < 1e-3
+            out.append({"de": 0.6, "en": 0.25, "fr": 0.15} if steady else {"en": 0.7, "de": 0.3})
+        return out
+
+
+@pytest.fixture
+def music_then_meeting(tmp_path):
+    t = np.arange(45 * SAMPLE_RATE) / SAMPLE_RATE
+    music = (0.2 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    return write_wav(str(tmp_path / "call.wav"), np.concatenate([music, synthetic_speech(240, seed=3)]))
+
+
+def test_hold_music_at_the_start_is_outvoted(music_then_meeting, monkeypatch):
+    decoded = []
+    real = langid.decode_window
+    monkeypatch.setattr(langid, "decode_window", lambda p, s, n: decoded.append(n) or real(p, s, n))
+    fake = FakeTranscriber()
+
+    assert detect_language(music_then_meeting, fake) == "en"
+    assert fake.calls == [3]  # one batched call over three windows
+    assert sum(decoded) <= langid.LANGID_CANDIDATES * langid.WINDOW_SECONDS
+
+
+def test_leading_silence_is_skipped(tmp_path):
+    audio = np.concatenate([np.zeros(90 * SAMPLE_RATE, np.float32), synthetic_speech(60, seed=1)])
+    path = write_wav(str(tmp_path / "late_start.wav"), audio)
+    windows = sample_speech_windows(path, count=3)
+    assert windows and all(len(w) >= langid.MIN_SPEECH_SECONDS * SAMPLE_RATE for w in windows)
+
+
+def test_no_speech_returns_default_without_model_call(tmp_path):
+    path = write_wav(str(tmp_path / "silence.wav"), np.zeros(20 * SAMPLE_RATE, np.float32))
+    fake = FakeTranscriber()
+    assert detect_language(path, fake) == "en" and fake.calls == []
+
+
+def test_offsets_and_vote():
+    assert candidate_offsets(20, 6) == [0.0]
+    offsets = candidate_offsets(600, 6)
+    assert len(offsets) == 6 and offsets[0] >= 0 and offsets[-1] <= 570
+    assert vote([{"en": 0.6, "hi": 0.4}, {"hi": 0.9, "en": 0.1}], weights=[1, 3])[0] == "hi"
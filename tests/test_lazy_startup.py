@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from agents.lazy import Lazy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_factory_runs_once_under_concurrent_first_use():
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.1)
+        return object()
+
+    lazy = Lazy(build)
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(lazy.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len({id(v) for v in seen}) == 1 and lazy.loaded
+
+
+def test_failed_factory_is_retried():
+    attempts = []
+
+    def build():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("no API key")
+        return "agent"
+
+    lazy = Lazy(build)
+    with pytest.raises(RuntimeError):
+        lazy.get()
+    assert not lazy.loaded
+    assert lazy.get() == "agent"
+
+
+def test_importing_pipeline_loads_no_model(tmp_path):
+    pytest.importorskip("dotenv")
+    pytest.importorskip("requests")
+    code = (
+        "import os, sys, threading, pipeline; "
+        "assert not pipeline.transcriber.loaded and not pipeline.nlp.loaded and not pipeline.archive.loaded; "
+        "assert 'torch' not in sys.modules and 'whisper' not in sys.modules; "
+        "assert not any(os.path.exists(os.environ[v]) for v in "
+        "('ARCHIVE_DB', 'LLM_CACHE_DIR', 'OUTBOX_DB', 'TRANSCRIPT_CACHE_DIR')); "
+        "assert not any(t.name == 'outbox-dispatcher' for t in threading.enumerate())"
+    )
+    env = dict(os.environ, OUTBOX_DB=str(tmp_path / "outbox.sqlite3"), ARCHIVE_DB=str(tmp_path / "archive.sqlite3"),
+               TRANSCRIPT_CACHE_DIR=str(tmp_path / "transcripts"), LLM_CACHE_DIR=str(tmp_path / "llm"))
+    env.pop("LLM_PROVIDER", None)
+    env.pop("GEMINI_API_KEY", None)
+    env.pop("OPENAI_API_KEY", None)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
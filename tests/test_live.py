@@ -0,0 +1,199 @@
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from agents.audio import SAMPLE_RATE
+from agents.live import LiveSession, Resampler, replay, to_mono_16k
+from benchmarks.synthetic import synthetic_chunk, synthetic_speech, write_wav
+
+
+class FakeTranscriber:
+    """One word per started second of audio, numbered across calls, so every word is traceable."""
+    def __init__(self):
+        self.calls = []
+        self.next_word = 0
+
+    def transcribe_batch(self, audios, language=None, batch_size=8):
+        out = []
+        for audio in audios:
+            self.calls.append(len(audio) / SAMPLE_RATE)
+            n = max(1, int(np.ceil(len(audio) / SAMPLE_RATE)))
+            words = [f"w{self.next_word + i}" for i in range(n)]
+            self.next_word += n
+            out.append({"text": " ".join(words), "language": "en",
+                        "segments": [{"start": 0.0, "end": len(audio) / SAMPLE_RATE, "text": " ".join(words)}]})
+        return out
+
+
+class RecordingSummarizer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, previous, new_text):
+        self.calls.append((previous, new_text))
+        return {"summary": [f"part {len(self.calls)}"], "actions": [], "decisions": [], "risks": []}
+
+
+def test_utterances_are_committed_while_streaming_and_summaries_get_only_new_text(tmp_path):
+    path = write_wav(str(tmp_path / "meeting.wav"), synthetic_speech(90, seed=5))
+    summarizer = RecordingSummarizer()
+    session = LiveSession(FakeTranscriber(), summarizer=summarizer, partial_every_s=0, summary_every_s=20)
+
+    committed_during_stream = []
+    feed = session.feed
+
+    def watched_feed(samples, sr):
+        feed(samples, sr)
+        session.wait()
+        committed_during_stream.append(len(session.words))
+
+    session.feed = watched_feed
+    result = replay(path, session, chunk_s=0.5, speed=0)
+
+    # text arrived long before the end, with no buffer ever longer than one Whisper window
+    assert committed_during_stream[len(committed_during_stream) // 4] > 0
+    assert max(session.transcriber.calls) <= 30
+    assert result["duration"] == pytest.approx(90, abs=0.5)
+    assert result["segments"] == sorted(result["segments"], key=lambda s: s["start"])
+    # rolling summaries: several updates, each with only new words, chained on the previous summary
+    assert len(summarizer.calls) >= 3
+    sent = [text for _, text in summarizer.calls]
+    assert " ".join(sent) == result["text"]
+    assert summarizer.calls[0][0] is None
+    assert summarizer.calls[-1][0] == {"summary": [f"part {len(sent) - 1}"], "actions": [], "decisions": [],
+                                       "risks": []}
+    assert result["summary"]["summary"] == [f"part {len(sent)}"]
+
+
+def test_open_utterance_is_tentative_until_the_pause():
+    session = LiveSession(FakeTranscriber(), partial_every_s=1.0)
+    speech = synthetic_chunk(4, seed=1)
+    for i in range(0, len(speech), SAMPLE_RATE // 2):
+        session.feed(speech[i:i + SAMPLE_RATE // 2])
+    session.wait()
+    assert session.words == [] and session.tentative
+
+    session.feed(np.zeros(SAMPLE_RATE, dtype=np.float32))
+    session.wait()
+    assert session.words and not session.tentative
+    assert session.finish()["text"] == session.committed_text
+
+
+def test_failed_summary_is_retried_with_the_next_interval():
+    attempts = []
+
+    def flaky(previous, new_text):
+        attempts.append(new_text)
+        if len(attempts) == 1:
+            raise RuntimeError("provider down")
+        return {"summary": ["ok"]}
+
+    session = LiveSession(FakeTranscriber(), summarizer=flaky, partial_every_s=0, summary_every_s=5)
+    for seed in range(3):
+        session.feed(synthetic_chunk(3, seed=seed))
+        session.feed(np.zeros(3 * SAMPLE_RATE, dtype=np.float32))
+        session.wait()
+        session._summary_job.result()
+    result = session.finish()
+    assert result["summary"] == {"summary": ["ok"]}
+    assert attempts[1].startswith(attempts[0])
+    assert " ".join(attempts[1:]) == result["text"]
+
+
+def test_feed_does_not_wait_for_whisper():
+    release = threading.Event()
+
+    class SlowTranscriber(FakeTranscriber):
+        def transcribe_batch(self, audios, language=None, batch_size=8):
+            release.wait(5)
+            return super().transcribe_batch(audios, language, batch_size)
+
+    session = LiveSession(SlowTranscriber(), partial_every_s=0)
+    # a full utterance and its pause: the worker starts transcribing and blocks
+    session.feed(synthetic_chunk(2, seed=4))
+    session.feed(np.zeros(SAMPLE_RATE, dtype=np.float32))
+    # the stream handler keeps accepting audio meanwhile
+    for _ in range(10):
+        session.feed(np.zeros(SAMPLE_RATE // 2, dtype=np.float32))
+    assert session.position == pytest.approx(8.0) and session.words == []
+
+    release.set()
+    session.wait()
+    assert session.words and session.transcriber.calls == [pytest.approx(2.0, abs=0.3)]
+    assert session.finish()["text"] == session.committed_text
+
+
+def test_replay_keeps_real_time_pace(tmp_path):
+    audio = np.concatenate([synthetic_chunk(1.0, seed=2), np.zeros(SAMPLE_RATE, dtype=np.float32),
+                            synthetic_chunk(1.0, seed=3)])
+    path = write_wav(str(tmp_path / "short.wav"), audio)
+    session = LiveSession(FakeTranscriber(), partial_every_s=0)
+    t0 = time.perf_counter()
+    result = replay(path, session, chunk_s=0.25, speed=1.0)
+    assert time.perf_counter() - t0 >= 2.9
+    assert len(session.transcriber.calls) == 2
+    assert result["text"]
+
+
+def test_microphone_chunks_are_converted_to_mono_16k():
+    stereo = (np.ones((4800, 2)) * 16384).astype(np.int16)
+    audio = to_mono_16k(stereo, 48000)
+    assert audio.dtype == np.float32 and audio.shape == (1600,)
+    assert audio[0] == pytest.approx(0.5, abs=1e-3)
+
+
+def test_resampling_filters_out_what_16k_cannot_hold():
+    t = np.arange(48000) / 48000
+    speech_band = np.sin(2 * np.pi * 1000 * t).astype(np.float32)
+    ultrasonic = np.sin(2 * np.pi * 20000 * t).astype(np.float32)   # would alias to 4 kHz
+    assert np.abs(to_mono_16k(speech_band, 48000)[100:-100]).max() == pytest.approx(1.0, abs=1e-3)
+    assert np.abs(to_mono_16k(ultrasonic, 48000)[100:-100]).max() < 1e-3
+
+    # a stream resampled chunk by chunk matches resampling it in one go
+    resampler = Resampler(44100)
+    mic = np.sin(2 * np.pi * 440 * np.arange(44100) / 44100).astype(np.float32)
+    pieces = [resampler.process(mic[i:i + 1000]) for i in range(0, len(mic), 1000)]
+    streamed = np.concatenate(pieces + [resampler.process(np.zeros(0), final=True)])
+    np.testing.assert_allclose(streamed, to_mono_16k(mic, 44100), atol=1e-6)
+    assert len(streamed) == SAMPLE_RATE
+
+
+def test_session_resamples_microphone_audio_across_chunks():
+    session = LiveSession(FakeTranscriber(), partial_every_s=0)
+    mic = (synthetic_chunk(2, seed=5)[:, None] * np.ones(2)).astype(np.float32)   # stereo
+    mic = np.repeat(mic, 3, axis=0)   # 48 kHz
+    for i in range(0, len(mic), 4800):
+        session.feed(mic[i:i + 4800], 48000)
+    session.feed(np.zeros(SAMPLE_RATE, dtype=np.float32))
+    session.wait()
+    assert session.position == pytest.approx(3.0, abs=1e-3)
+    assert session.words
+
+
+def test_rolling_summary_prompt_holds_only_new_text(monkeypatch, tmp_path):
+    pytest.importorskip("dotenv")
+    from agents.llm_nlp import LLMNLP
+    from integrations import llm_client
+    from integrations.llm_client import ResponseCache
+
+    prompts = []
+
+    def fake(model, prompt, system):
+        prompts.append(prompt)
+        new = prompt.split("New transcript:\n")[1]
+        return json.dumps({"summary": [new[:20]], "actions": [s for s in new.split(". ") if "will" in s]})
+
+    monkeypatch.setitem(llm_client.PROVIDERS, "fake-rolling", fake)
+    monkeypatch.setenv("LLM_PROVIDER", "fake-rolling")
+    monkeypatch.setattr(llm_client, "response_cache", ResponseCache(cache_dir=str(tmp_path)))
+    nlp = LLMNLP()
+
+    first = nlp.update_summary(None, "Kickoff of the launch. Ana will book the venue")
+    second = nlp.update_summary(first, "Budget is approved. Raj will send the invoice")
+
+    assert "Kickoff" not in prompts[1].split("New transcript:")[1]
+    assert f"- {first['summary'][0]}" in prompts[1]
+    assert second["actions"] == ["Ana will book the venue", "Raj will send the invoice"]
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from integrations import llm_client
+from integrations.llm_client import ResponseCache, generate, register_provider
+
+
+@pytest.fixture
+def counting_provider():
+    calls = []
+
+    def fake(model, prompt, system):
+        calls.append(prompt)
+        return f"answer to {prompt}"
+
+    register_provider("counting", fake)
+    yield calls
+    llm_client.PROVIDERS.pop("counting")
+
+
+def test_identical_prompts_hit_the_cache(tmp_path, counting_provider):
+    cache = ResponseCache(cache_dir=str(tmp_path))
+    assert generate("hi", provider="counting", cache=cache) == "answer to hi"
+    assert generate("hi", provider="counting", cache=cache) == "answer to hi"
+    assert generate("other", provider="counting", cache=cache) == "answer to other"
+    assert counting_provider == ["hi", "other"]
+    assert cache.stats()["hits"] == 1
+
+    # a fresh process (new memory cache) still finds the entry on disk
+    again = ResponseCache(cache_dir=str(tmp_path))
+    assert generate("hi", provider="counting", cache=again) == "answer to hi"
+    assert counting_provider == ["hi", "other"]
+
+
+def test_ttl_and_memory_size_limits(tmp_path, counting_provider):
+    cache = ResponseCache(cache_dir=None, ttl=0, max_entries=2)
+    generate("a", provider="counting", cache=cache)
+    generate("a", provider="counting", cache=cache)  # expired immediately
+    assert counting_provider == ["a", "a"]
+
+    cache = ResponseCache(cache_dir=None, max_entries=2)
+    for p in ["x", "y", "z", "x"]:
+        generate(p, provider="counting", cache=cache)
+    assert counting_provider[-4:] == ["x", "y", "z", "x"]  # "x" was evicted by "z"
+
+
+def test_cache_directory_is_created_by_the_first_write(tmp_path, counting_provider):
+    cache = ResponseCache(cache_dir=str(tmp_path / "llm"))
+    assert cache.get("missing") is None and not (tmp_path / "llm").exists()
+    generate("a", provider="counting", cache=cache)
+    assert len(list((tmp_path / "llm").iterdir())) == 1
+
+
+def test_eviction_tolerates_files_removed_by_another_process(monkeypatch, tmp_path, counting_provider):
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=3600, max_bytes=0)
+    generate("a", provider="counting", cache=cache)
+
+    def gone(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(llm_client.os, "remove", gone)
+    assert generate("b", provider="counting", cache=cache) == "answer to b"
+
+
+def test_invalid_responses_are_not_cached(tmp_path, counting_provider):
+    cache = ResponseCache(cache_dir=str(tmp_path))
+    generate("q", provider="counting", cache=cache, validate=lambda t: t.startswith("{"))
+    generate("q", provider="counting", cache=cache, validate=lambda t: t.startswith("{"))
+    assert counting_provider == ["q", "q"]
+
+
+def test_truncated_json_is_not_cached_for_analysis(monkeypatch, tmp_path):
+    from agents.llm_nlp import LLMNLP
+
+    replies = ['{"summary": ["a"', json.dumps({"summary": ["a"], "actions": [], "decisions": [], "risks": []})]
+    calls = []
+
+    def flaky(model, prompt, system):
+        calls.append(prompt)
+        return replies.pop(0)
+
+    monkeypatch.setitem(llm_client.PROVIDERS, "flaky-json", flaky)
+    monkeypatch.setenv("LLM_PROVIDER", "flaky-json")
+    monkeypatch.setattr(llm_client, "response_cache", ResponseCache(cache_dir=str(tmp_path)))
+    nlp = LLMNLP()
+    with pytest.raises(ValueError):
+        nlp.analyze("Short meeting.", "en")
+    # the broken reply was not cached: the retry asks the provider again and succeeds
+    assert nlp.analyze("Short meeting.", "en")["summary"] == ["a"]
+    assert len(calls) == 2 and calls[0] == calls[1]
+
+
+def test_llmnlp_runs_offline_with_stub(monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_PROVIDER", "stub")
+    monkeypatch.setattr(llm_client, "response_cache", ResponseCache(cache_dir=str(tmp_path)))
+    from agents.llm_nlp import LLMNLP
+
+    nlp = LLMNLP()
+    transcript = "We agreed to launch in May. Priya will update the roadmap. Hiring is a risk."
+    first = nlp.analyze(transcript, "en")
+    assert first["decisions"] == ["We agreed to launch in May."]
+    assert first["actions"] == ["Priya will update the roadmap."]
+    assert nlp.analyze(transcript, "en") == first
+    assert llm_client.response_cache.stats()["hits"] == 1
+    json.dumps(first)
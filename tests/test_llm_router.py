@@ -0,0 +1,160 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from integrations.llm_router import LLMRouter, ProviderTimeout, TokenBucket
+from telemetry import metrics
+
+ROUTES = [("primary", "m1"), ("backup", "m2")]
+
+
+class FakeProviders:
+    """Per-provider injected latency (seconds, or a function of the prompt) and errors."""
+
+    def __init__(self, latency=None, fail=None):
+        self.latency = latency or {}
+        self.fail = fail or {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, provider, model, prompt, system):
+        with self._lock:
+            self.calls.append(provider)
+            n = self.calls.count(provider)
+        delay = self.latency.get(provider, 0.0)
+        time.sleep(delay(prompt) if callable(delay) else delay)
+        if n <= self.fail.get(provider, 0):
+            raise ConnectionError(f"{provider} unavailable")
+        return f"{provider}: {prompt}"
+
+
+def test_token_bucket_paces_requests_after_the_burst():
+    bucket = TokenBucket(rate=50, burst=2)
+    t0 = time.perf_counter()
+    assert all(bucket.acquire(timeout=1) for _ in range(7))
+    assert time.perf_counter() - t0 >= 0.09   # 5 tokens at 50/s after a burst of 2
+    empty = TokenBucket(rate=1, burst=1)
+    empty.acquire()
+    assert not empty.acquire(timeout=0.05)
+
+
+def test_errors_are_retried_on_the_next_provider():
+    fake = FakeProviders(fail={"primary": 5})
+    router = LLMRouter(fake, retries=2, backoff=0.01)
+    assert router.complete(ROUTES, "hi") == ("backup: hi", "backup")
+    assert fake.calls == ["primary", "backup"]
+
+    single = LLMRouter(FakeProviders(fail={"primary": 2}), retries=2, backoff=0.01)
+    assert single.complete(ROUTES[:1], "hi") == ("primary: hi", "primary")
+    with pytest.raises(ConnectionError):
+        LLMRouter(FakeProviders(fail={"primary": 5}), retries=1, backoff=0.01).complete(ROUTES[:1], "hi")
+
+
+def test_slow_provider_times_out_and_fails_over():
+    fake = FakeProviders(latency={"primary": 1.0})
+    router = LLMRouter(fake, timeout=0.1, retries=1, backoff=0.01)
+    assert router.complete(ROUTES, "hi") == ("backup: hi", "backup")
+    assert fake.calls == ["primary", "backup"]
+    with pytest.raises(ProviderTimeout):
+        LLMRouter(FakeProviders(latency={"primary": 1.0}), timeout=0.05, retries=0).complete(ROUTES[:1], "hi")
+
+
+def test_timed_out_calls_hold_their_provider_slot():
+    fake = FakeProviders(latency={"primary": 1.0})
+    router = LLMRouter(fake, timeout=0.05, retries=1, backoff=0.0, provider_inflight=2)
+    used = [router.complete(ROUTES, str(i))[1] for i in range(5)]
+    # two hung primary calls use up its slots; later requests go straight to the backup
+    assert used == ["backup"] * 5
+    assert fake.calls.count("primary") == 2
+
+
+def test_throttled_provider_overflows_to_the_next_one():
+    fake = FakeProviders()
+    router = LLMRouter(fake, limits={"primary": (60, 2)}, rate_wait=0.0)
+    used = [router.complete(ROUTES, str(i))[1] for i in range(5)]
+    assert used == ["primary", "primary", "backup", "backup", "backup"]
+
+
+def _stalls_on(prompt, gate):
+    """Primary latency: a few ms, except `prompt`, which hangs until `gate` is set."""
+    def latency(p):
+        if p == prompt:
+            gate.wait(5)
+        return 0.002
+    return latency
+
+
+def test_hedging_answers_a_stalled_request_from_the_next_provider():
+    gate = threading.Event()
+    fake = FakeProviders({"primary": _stalls_on("stalled", gate)})
+    router = LLMRouter(fake, hedge_percentile=90, hedge_min_samples=20)
+    for i in range(20):
+        router.complete(ROUTES, str(i))
+    assert "backup" not in fake.calls
+    won = metrics.counter("llm_hedges_total", provider="backup", outcome="won")
+
+    # answered by the hedge while the primary is still stuck
+    assert router.complete(ROUTES, "stalled") == ("backup: stalled", "backup")
+    assert fake.calls[-2:] == ["primary", "backup"]
+    assert metrics.counter("llm_hedges_total", provider="backup", outcome="won") == won + 1
+    gate.set()
+
+    # without hedging the same request waits for the primary
+    gate = threading.Event()
+    fake = FakeProviders({"primary": _stalls_on("stalled", gate)})
+    plain = LLMRouter(fake, hedge_percentile=0)
+    with ThreadPoolExecutor(1) as pool:
+        answer = pool.submit(plain.complete, ROUTES, "stalled")
+        gate.set()
+        assert answer.result(timeout=5) == ("primary: stalled", "primary")
+    assert fake.calls == ["primary"]
+
+
+def test_latency_histograms_and_percentiles_per_provider():
+    router = LLMRouter(FakeProviders(latency={"histogrammed": 0.02}))
+    for i in range(10):
+        router.complete([("histogrammed", "m")], str(i))
+    percentiles = {(p, q): v for p, q, v in router.percentiles()}
+    assert 0.02 <= percentiles[("histogrammed", 50)] <= percentiles[("histogrammed", 99)] < 0.2
+    rendered = metrics.render()
+    assert 'meeting_llm_provider_seconds_count{outcome="ok",provider="histogrammed"} 10' in rendered
+    assert 'meeting_llm_provider_seconds_bucket{outcome="ok",provider="histogrammed",le="0.01"} 0' in rendered
+
+
+def test_generate_fails_over_to_the_configured_providers(monkeypatch, tmp_path):
+    pytest.importorskip("dotenv")
+    from integrations import llm_client
+    from integrations.llm_client import ResponseCache, generate
+
+    def down(model, prompt, system):
+        raise TimeoutError("503")
+
+    monkeypatch.setitem(llm_client.PROVIDERS, "flaky-primary", down)
+    monkeypatch.setitem(llm_client.PROVIDERS, "steady-backup", lambda model, prompt, system: f"backup says {prompt}")
+    monkeypatch.setenv("LLM_PROVIDERS", "steady-backup")
+    monkeypatch.setattr(llm_client, "response_cache", ResponseCache(cache_dir=str(tmp_path)))
+
+    assert generate("hello", provider="flaky-primary") == "backup says hello"
+    assert metrics.counter("llm_requests_total", provider="steady-backup", cached="false") >= 1
+    # cached under the requested provider: no second round trip
+    monkeypatch.setenv("LLM_PROVIDERS", "")
+    assert generate("hello", provider="flaky-primary") == "backup says hello"
+
+
+def test_insight_prompts_use_the_configured_provider(monkeypatch, tmp_path):
+    pytest.importorskip("dotenv")
+    from integrations import llm_client
+    from integrations.gemini_api import get_gemini_response
+    from integrations.llm_client import ResponseCache
+
+    monkeypatch.setitem(llm_client.PROVIDERS, "house-model", lambda model, prompt, system: f"house: {prompt}")
+    monkeypatch.setenv("LLM_PROVIDER", "house-model")
+    monkeypatch.setattr(llm_client, "response_cache", ResponseCache(cache_dir=str(tmp_path)))
+    assert get_gemini_response("hi") == "house: hi"
+
+    monkeypatch.delenv("LLM_PROVIDER")
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    assert get_gemini_response("hi") == "(Gemini API failed)"
@@ -0,0 +1,60 @@
+import json
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from agents import llm_nlp
+from agents.llm_nlp import LLMNLP, split_transcript
+from integrations import llm_client
+from integrations.llm_client import ResponseCache
+
+
+def test_split_transcript_respects_segments_and_budget():
+    segments = [{"text": f"Segment number {i}."} for i in range(50)]
+    pieces = split_transcript("", segments, budget=100)
+    assert all(len(p) <= 100 for p in pieces)
+    assert " ".join(pieces) == " ".join(s["text"] for s in segments)
+
+
+def test_long_transcript_is_mapped_concurrently_and_merged(monkeypatch, tmp_path):
+    active, peak, prompts = [0], [0], []
+    lock = threading.Lock()
+
+    def fake(model, prompt, system):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            prompts.append(prompt)
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if "Partial summaries" in prompt:
+            return json.dumps({"summary": ["whole meeting"], "translation": "whole meeting", "sentiment": "positive"})
+        actions = [line for line in prompt.split(". ") if "will" in line]
+        return json.dumps({"summary": [prompt[20:40]], "actions": actions + ["Send the notes"],
+                           "decisions": [], "risks": ["Budget risk"], "sentiment": "positive"})
+
+    monkeypatch.setitem(llm_client.PROVIDERS, "fake-map", fake)
+    monkeypatch.setenv("LLM_PROVIDER", "fake-map")
+    monkeypatch.setattr(llm_client, "response_cache", ResponseCache(cache_dir=str(tmp_path)))
+    monkeypatch.setattr(llm_nlp, "PROMPT_BUDGET_CHARS", 2000)
+    monkeypatch.setattr(llm_nlp, "MAP_CONCURRENCY", 3)
+
+    segments = [{"text": f"Filler sentence number {i} about the roadmap."} for i in range(300)]
+    segments.append({"text": "Dana will file the final report"})
+    transcript = " ".join(s["text"] for s in segments)
+
+    result = LLMNLP().analyze(transcript, "en", segments=segments)
+
+    map_calls = [p for p in prompts if "Partial summaries" not in p]
+    assert len(map_calls) > 3
+    assert all(len(p) < 2100 for p in map_calls)
+    assert peak[0] == 3
+    # the end of the meeting reaches the analysis and duplicates are merged
+    assert any("Dana will file the final report" in a for a in result["actions"])
+    assert result["actions"].count("Send the notes") == 1
+    assert result["risks"] == ["Budget risk"]
+    assert result["summary"] == ["whole meeting"]
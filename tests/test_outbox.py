@@ -0,0 +1,138 @@
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("dotenv")
+
+from integrations.emailer import SMTPConnection
+from integrations.outbox import Outbox
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: records connections and delivered messages."""
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.wfile.write(b"220 localhost test SMTP\r\n")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            cmd = line.decode().strip().upper()
+            if cmd.startswith(("EHLO", "HELO")):
+                self.wfile.write(b"250 localhost\r\n")
+            elif cmd == "DATA":
+                self.wfile.write(b"354 end with .\r\n")
+                data = []
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(chunk)
+                server.messages.append(b"".join(data).decode())
+                self.wfile.write(b"250 queued\r\n")
+            elif cmd == "QUIT":
+                self.wfile.write(b"221 bye\r\n")
+                return
+            else:  # MAIL, RCPT, NOOP, RSET
+                self.wfile.write(b"250 ok\r\n")
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.connections = 0
+        self.messages = []
+
+
+class _Webhook(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.server.failures_left > 0:
+            self.server.failures_left -= 1
+            self.send_response(500)
+        else:
+            self.server.received.append(json.loads(body)["text"])
+            self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servers():
+    smtp = _SMTPServer()
+    hook = HTTPServer(("127.0.0.1", 0), _Webhook)
+    hook.received, hook.failures_left = [], 2
+    for srv in (smtp, hook):
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield smtp, hook
+    smtp.shutdown()
+    hook.shutdown()
+
+
+def test_outbox_delivers_in_background_with_retries(tmp_path, servers):
+    smtp_server, hook = servers
+    smtp = SMTPConnection(host="127.0.0.1", port=smtp_server.server_address[1], use_ssl=False,
+                          sender="bot@example.com", password="")
+    events = []
+    outbox = Outbox(str(tmp_path / "outbox.db"), smtp=smtp, backoff=0.05, poll_interval=0.02,
+                    on_status=lambda *e: events.append(e)).start()
+    webhook = f"http://127.0.0.1:{hook.server_address[1]}/hook"
+
+    ids = [outbox.enqueue_email(f"Summary {i}", f"body {i}", ["a@example.com", "b@example.com"]) for i in range(3)]
+    ids.append(outbox.enqueue_slack("hello channel", webhook=webhook))
+    assert outbox.wait(ids, timeout=10)
+    outbox.stop()
+
+    assert all(outbox.status(i)["status"] == "sent" for i in ids)
+    # three emails to the same recipients share one persistent SMTP connection
+    assert len(smtp_server.messages) == 3 and smtp_server.connections == 1
+    # the webhook failed twice and the message was retried with backoff
+    assert hook.received == ["hello channel"]
+    assert outbox.status(ids[-1])["attempts"] == 3
+    assert ("pending" in [e[1] for e in events]) and events[-1][1] == "sent"
+
+
+def test_pending_messages_survive_a_restart(tmp_path, servers):
+    _, hook = servers
+    hook.failures_left = 0
+    webhook = f"http://127.0.0.1:{hook.server_address[1]}/hook"
+    db = str(tmp_path / "outbox.db")
+
+    first = Outbox(db)  # never started: simulates a crash before delivery
+    message_id = first.enqueue_slack("queued before restart", webhook=webhook)
+
+    second = Outbox(db, poll_interval=0.02).start()
+    assert second.wait([message_id], timeout=10)
+    second.stop()
+    assert hook.received == ["queued before restart"]
+
+
+def test_slack_credentials_are_read_at_delivery_not_stored(tmp_path, servers, monkeypatch):
+    _, hook = servers
+    hook.failures_left = 0
+    db = str(tmp_path / "outbox.db")
+    monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-secret")
+    monkeypatch.setenv("SLACK_CHANNEL_ID", "C123")
+    monkeypatch.setenv("SLACK_WEBHOOK_URL", "http://127.0.0.1:1/stale-hook")
+
+    outbox = Outbox(db)
+    message_id = outbox.enqueue_slack("from the env webhook")
+    with open(db, "rb") as f:
+        stored = f.read()
+    assert b"xoxb-secret" not in stored and b"stale-hook" not in stored
+
+    # the webhook is looked up when the message goes out, so a rotated URL is picked up
+    monkeypatch.setenv("SLACK_WEBHOOK_URL", f"http://127.0.0.1:{hook.server_address[1]}/hook")
+    outbox.start()
+    assert outbox.wait([message_id], timeout=10)
+    outbox.stop()
+    assert hook.received == ["from the env webhook"]
@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+
+from agents.graph import StageGraph
+
+
+def test_independent_stages_overlap_and_errors_are_isolated():
+    # each pair of stages meets at a barrier: it only opens if both run at the same time
+    first_wave, fan_out = threading.Barrier(2, timeout=5), threading.Barrier(2, timeout=5)
+
+    def together(barrier, value):
+        def fn(**_):
+            barrier.wait()
+            return value
+        return fn
+
+    def broken():
+        raise RuntimeError("provider down")
+
+    graph = StageGraph(max_workers=4)
+    graph.add("insight", together(first_wave, "insight"))
+    graph.add("chat", broken, default="(failed)")
+    graph.add("analysis", together(first_wave, {"summary": ["s"]}))
+    graph.add("share", lambda analysis, insight, chat: f"{analysis['summary'][0]}|{insight}|{chat}",
+              deps=["analysis", "insight", "chat"])
+    graph.add("slack", together(fan_out, "sent"), deps=["share"])
+    graph.add("email", together(fan_out, "sent"), deps=["share"])
+
+    order = [r.name for r in graph.run_iter()]
+
+    # run one at a time, a barrier would have timed out and failed its stages
+    assert not graph.errors.keys() - {"chat"}
+    assert graph.results["slack"] == graph.results["email"] == "sent"
+    assert order[0] == "chat" and order.index("share") < order.index("slack")
+    assert graph.results["share"] == "s|insight|(failed)"
+    assert isinstance(graph.errors["chat"], RuntimeError)
+
+
+def test_unknown_dependency_is_rejected():
+    graph = StageGraph()
+    with pytest.raises(ValueError):
+        graph.add("tts", lambda translation: None, deps=["translation"])
@@ -0,0 +1,58 @@
+import math
+import os
+import shutil
+import subprocess
+import sys
+import wave
+
+import pytest
+
+pytest.importorskip("numpy")
+if shutil.which("ffmpeg") is None:
+    pytest.skip("ffmpeg not installed", allow_module_level=True)
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Child process: stream the whole file through stream_audio and report peak RSS (KiB on Linux)
+CHILD = """
+import resource, sys
+from agents.audio import stream_audio
+n = 0
+for window in stream_audio(sys.argv[1], window_seconds=30):
+    n += len(window)
+print(n, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def _write_tone(path, seconds, sr=16000):
+    """Write a mono 16-bit WAV one second at a time so the test itself stays small."""
+    one_sec = b"".join(
+        int(8000 * math.sin(2 * math.pi * 440 * i / sr)).to_bytes(2, "little", signed=True)
+        for i in range(sr)
+    )
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        for _ in range(seconds):
+            w.writeframes(one_sec)
+
+
+def _stream_peak_rss(path):
+    out = subprocess.run([sys.executable, "-c", CHILD, str(path)], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout.split()
+    return int(out[0]), int(out[1])
+
+
+def test_stream_audio_memory_is_flat(tmp_path):
+    short, long_ = tmp_path / "short.wav", tmp_path / "long.wav"
+    _write_tone(short, 60)
+    _write_tone(long_, 30 * 60)
+
+    short_samples, short_rss = _stream_peak_rss(short)
+    long_samples, long_rss = _stream_peak_rss(long_)
+
+    assert short_samples == 60 * 16000
+    assert long_samples == 30 * 60 * 16000
+    # 30 min decoded as float32 is ~115 MB; streaming must stay within a few windows of the short run
+    assert long_rss - short_rss < 20 * 1024
@@ -0,0 +1,62 @@
+import urllib.request
+
+import pytest
+
+import telemetry
+from agents.graph import StageGraph
+from telemetry import Metrics, count, span, trace
+
+
+def test_spans_from_graph_threads_land_in_the_job_trace():
+    def analysis():
+        with span("llm", provider="fake"):
+            pass
+        count("llm_tokens_total", 10, direction="prompt")
+        return {}
+
+    graph = StageGraph(max_workers=2)
+    graph.add("analysis", analysis)
+    graph.add("tts", lambda analysis: "audio", deps=["analysis"])
+    with trace("job1") as t:
+        graph.run()
+    report = t.report(caches={"llm": {"hit_rate": 0.5}})
+
+    assert set(report["stages"]) == {"analysis", "tts", "llm"}
+    assert report["counters"] == {"llm_tokens_total{direction=prompt}": 10}
+    assert report["caches"]["llm"]["hit_rate"] == 0.5
+    assert telemetry.current_trace() is None
+
+
+def test_failed_span_is_marked_and_reraised():
+    with trace("job2") as t:
+        with pytest.raises(ValueError):
+            with span("decode"):
+                raise ValueError("bad file")
+    assert t.spans[0]["name"] == "decode" and t.spans[0]["error"] == "ValueError"
+
+
+def test_prometheus_text_format():
+    m = Metrics(buckets=(0.1, 1.0))
+    m.inc("llm_requests_total", provider="stub", cached="false")
+    m.observe("stage_seconds", 0.5, stage="tts")
+    m.register_collector(lambda: [("cache_hit_ratio", {"cache": "llm"}, 0.25)])
+    text = m.render()
+
+    assert 'meeting_llm_requests_total{cached="false",provider="stub"} 1' in text
+    assert 'meeting_stage_seconds_bucket{stage="tts",le="0.1"} 0' in text
+    assert 'meeting_stage_seconds_bucket{stage="tts",le="1"} 1' in text
+    assert 'meeting_stage_seconds_count{stage="tts"} 1' in text
+    assert 'meeting_cache_hit_ratio{cache="llm"} 0.25' in text
+    assert "# TYPE meeting_stage_seconds histogram" in text
+
+
+def test_metrics_endpoint():
+    server = telemetry.serve(0)
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as resp:
+            assert resp.headers["Content-Type"].startswith("text/plain")
+            assert "meeting_process_peak_rss_bytes" in resp.read().decode()
+    finally:
+        server.shutdown()
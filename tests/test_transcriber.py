@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from agents.transcriber import _segments_from_tokens
+
+
+class StubTokenizer:
+    """Token ids below eot are words, ids from timestamp_begin on are <|t|> in 0.02 s steps."""
+    eot = 900
+    timestamp_begin = 1000
+    words = {1: "hello", 2: "team", 3: "next", 4: "item", 5: "bye"}
+
+    def decode(self, tokens):
+        return " " + " ".join(self.words[t] for t in tokens)
+
+
+def ts(seconds):
+    return StubTokenizer.timestamp_begin + round(seconds / 0.02)
+
+
+def test_paired_timestamps():
+    tokens = [ts(0), 1, 2, ts(2.0), ts(2.0), 3, 4, ts(5.5), StubTokenizer.eot]
+    assert _segments_from_tokens(tokens, StubTokenizer(), offset=60.0) == [
+        {"start": 60.0, "end": 62.0, "text": "hello team"},
+        {"start": 62.0, "end": 65.5, "text": "next item"},
+    ]
+
+
+def test_text_after_a_single_timestamp_is_its_own_segment():
+    tokens = [ts(0), 1, 2, ts(2.0), 3, 4, ts(4.0), 5, ts(6.0)]
+    segments = _segments_from_tokens(tokens, StubTokenizer(), offset=0.0)
+    assert [(s["start"], s["end"], s["text"]) for s in segments] == [
+        (0.0, 2.0, "hello team"), (2.0, 4.0, "next item"), (4.0, 6.0, "bye")]
+
+
+def test_unclosed_last_segment_ends_with_the_window():
+    # a 12 s final window: neither the open segment nor a stray timestamp may run past it
+    tokens = [ts(0), 1, 2, ts(3.0), ts(3.0), 3, 4]
+    assert _segments_from_tokens(tokens, StubTokenizer(), offset=30.0, duration=12.0)[-1] == {
+        "start": 33.0, "end": 42.0, "text": "next item"}
+    tokens = [ts(10.0), 5, ts(20.0)]
+    assert _segments_from_tokens(tokens, StubTokenizer(), offset=0.0, duration=12.0) == [
+        {"start": 10.0, "end": 12.0, "text": "bye"}]
+    # no timestamps at all: the whole window
+    assert _segments_from_tokens([1, 2], StubTokenizer(), offset=0.0, duration=7.5) == [
+        {"start": 0.0, "end": 7.5, "text": "hello team"}]
@@ -0,0 +1,43 @@
+import os
+
+from agents.cache import TranscriptCache
+
+
+def test_cache_roundtrip_and_stats(tmp_path):
+    cache = TranscriptCache(cache_dir=str(tmp_path))
+    key = TranscriptCache.make_key("digest", "base")
+    assert key != TranscriptCache.make_key("digest", "small")
+    assert key != TranscriptCache.make_key("digest", "base", language="fr")
+
+    assert cache.get(key) is None
+    value = {"text": "hello team", "language": "en", "segments": [{"start": 0.0, "end": 1.5, "text": "hello team"}]}
+    cache.put(key, value)
+    assert cache.get(key) == value
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = TranscriptCache(cache_dir=str(tmp_path), max_bytes=10_000)
+    blob = {"text": "x" * 4000, "language": "en", "segments": []}
+    for i, key in enumerate(["a", "b"]):
+        cache.put(key, blob)
+        os.utime(tmp_path / f"{key}.json", (1000 + i, 1000 + i))
+
+    cache.get("a")  # "a" becomes most recently used
+    cache.put("c", blob)  # over budget: "b" goes
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_file_digest_ignores_the_file_name(tmp_path):
+    from agents.audio import file_digest
+
+    (tmp_path / "a.wav").write_bytes(b"RIFF" + bytes(5_000_000))
+    (tmp_path / "copy of a.wav").write_bytes(b"RIFF" + bytes(5_000_000))
+    (tmp_path / "b.wav").write_bytes(b"RIFF" + bytes(5_000_000) + b"\x01")
+    assert file_digest(str(tmp_path / "a.wav")) == file_digest(str(tmp_path / "copy of a.wav"))
+    assert file_digest(str(tmp_path / "a.wav")) != file_digest(str(tmp_path / "b.wav"))
@@ -0,0 +1,45 @@
+import io
+import threading
+import wave
+
+from agents.tts import LocalToneBackend, SentenceCache, split_sentences, synthesize
+
+
+def test_split_sentences_never_cuts_words():
+    text = "First point. " + "word " * 200 + "end. Last one?"
+    parts = split_sentences(text, max_chars=100)
+    assert parts[0] == "First point." and parts[-1] == "Last one?"
+    assert all(len(p) <= 100 for p in parts)
+    assert " ".join(parts).split() == text.split()
+
+
+class CountingBackend(LocalToneBackend):
+    """Local backend whose calls all wait on a barrier: it only passes if they run at the same time."""
+
+    def __init__(self, parties):
+        self.calls = []
+        self.barrier = threading.Barrier(parties, timeout=5)
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, lang):
+        with self._lock:
+            self.calls.append(text)
+        self.barrier.wait()
+        return super().synthesize(text, lang)
+
+
+def test_parallel_cached_synthesis_with_local_backend():
+    backend, cache = CountingBackend(parties=8), SentenceCache()
+    text = " ".join(f"Sentence number {i} of the summary." for i in range(8))
+
+    # all 8 sentences are in flight at once, or the barrier breaks
+    audio = synthesize(text, backend=backend, max_workers=8, cache=cache)
+    assert sorted(backend.calls) == sorted(split_sentences(text))
+
+    with wave.open(io.BytesIO(audio)) as w:
+        assert w.getframerate() == 16000 and w.getnframes() > 0
+
+    # the second run is served from the cache without calling the backend
+    assert synthesize(text, backend=backend, max_workers=8, cache=cache) == audio
+    assert len(backend.calls) == 8
+    assert cache.hits == 8
@@ -0,0 +1,46 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agents.vad import segment_stream, stitch_transcripts
+
+SR = 16000
+rng = np.random.default_rng(0)
+
+
+def _speech(sec):
+    return (0.3 * rng.standard_normal(int(sec * SR))).astype(np.float32)
+
+
+def _silence(sec):
+    return (0.0005 * rng.standard_normal(int(sec * SR))).astype(np.float32)
+
+
+def test_segment_stream_skips_silence_and_keeps_timestamps():
+    audio = np.concatenate([_silence(10), _speech(5), _silence(20), _speech(70), _silence(5)])
+    windows = [audio[i:i + 7 * SR] for i in range(0, len(audio), 7 * SR)]
+    chunks = list(segment_stream(windows, max_chunk_s=30))
+
+    assert all(c.duration <= 30 for c in chunks)
+    # leading silence dropped, first chunk starts near the first speech at 10 s
+    assert 9 < chunks[0].start < 10
+    assert chunks[0].duration < 7
+    # 75 s of speech in 110 s of audio: most of the silence never reaches the model
+    assert sum(c.duration for c in chunks) < 85
+    # the long 70 s region is split with a small overlap between consecutive chunks
+    long_chunks = [c for c in chunks if c.start > 30]
+    for a, b in zip(long_chunks, long_chunks[1:]):
+        assert b.start < a.start + a.duration
+
+
+def test_stitch_shifts_segments_and_dedupes_overlap():
+    parts = [
+        (10.0, {"text": "we agreed to ship the", "segments": [{"start": 0.0, "end": 4.0, "text": "we agreed to ship the"}]}),
+        (13.5, {"text": "ship the release on Friday.", "segments": [
+            {"start": 0.0, "end": 0.4, "text": "ship the"},
+            {"start": 0.5, "end": 3.0, "text": "release on Friday."},
+        ]}),
+    ]
+    merged = stitch_transcripts(parts)
+    assert merged["text"] == "we agreed to ship the release on Friday."
+    assert [(s["start"], s["end"]) for s in merged["segments"]] == [(10.0, 14.0), (14.0, 16.5)]